@@ -0,0 +1,240 @@
+import argparse
+import json
+import os
+import random
+import subprocess
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+from config import (SEMANA, CONFLICT_MODE, CONFLICT_BUILD, BRANCH_AND_BOUND,
+                    SEARCH_ENGINE, ROOM_SYMMETRY, CANDIDATE_STREAMING)
+from data_processor import DataProcessor
+from graph_builder import GraphBuilder
+from conflict_builder import ConflictBuilder, ConflictOracle, ConflictBitsets
+from room_symmetry import RoomSymmetry
+from solver import ConflictGraphSolver
+from profiling import RunProfiler
+
+
+# Parâmetros de cada tamanho; o número de salas acompanha a carga total
+# para que as instâncias continuem viáveis. "dias" (opcional) limita os
+# horários aos primeiros dias da SEMANA
+TAMANHOS: Dict[str, Dict] = {
+    'pequena': dict(cursos=1, periodos=2, disciplinas_por_periodo=3,
+                    professores=4, salas=2),
+    'media': dict(cursos=2, periodos=4, disciplinas_por_periodo=4,
+                  professores=10, salas=5),
+    'grande': dict(cursos=3, periodos=5, disciplinas_por_periodo=5,
+                   professores=18, salas=12),
+    'enorme': dict(cursos=4, periodos=6, disciplinas_por_periodo=5,
+                   professores=30, salas=20),
+}
+
+
+def generate_instance(cursos: int = 2,
+                      periodos: int = 4,
+                      disciplinas_por_periodo: int = 4,
+                      professores: int = 10,
+                      salas: int = 5,
+                      optativas: int = 2,
+                      densidade: float = 0.1,
+                      seed: int = 0) -> Tuple[List[Dict], Dict[str, str], Dict[str, str]]:
+    """
+    Gera materias, professores e salas no mesmo formato dos arquivos de dados.
+    """
+    rng = random.Random(seed)
+    prof_ids = [str(i + 1) for i in range(professores)]
+    extras = round(densidade * (professores - 1))
+
+    def responsaveis(k: int) -> str:
+        principal = prof_ids[k % professores]
+        outros = rng.sample([p for p in prof_ids if p != principal], extras)
+        return ",".join([principal] + outros)
+
+    materias: List[Dict] = []
+    for c in range(cursos):
+        curso = f"C{c + 1:02d}"
+        for periodo in range(1, periodos + 1):
+            for d in range(disciplinas_por_periodo):
+                materias.append({
+                    'curso': curso, 'ppc': '-', 'periodo': periodo,
+                    'sigla': f"{curso}P{periodo}D{d + 1}",
+                    'nome': f"Disciplina {d + 1} do {periodo}º período de {curso}",
+                    'turmas': 1, 'ch': rng.choice((2, 4, 4, 4)), 'semestre': 1,
+                    'prof_responsavel': responsaveis(len(materias)),
+                })
+    for o in range(optativas):
+        materias.append({
+            'curso': 'optativa', 'ppc': '-', 'periodo': None,
+            'sigla': f"OPT{o + 1}", 'nome': f"Optativa {o + 1}",
+            'turmas': 1, 'ch': 4, 'semestre': 1,
+            'prof_responsavel': responsaveis(len(materias)),
+        })
+
+    profs = {pid: f"Professor {pid}" for pid in prof_ids}
+    salas_raw = {f"S{i + 1:03d}": f"Sala de Aula S{i + 1:03d}" for i in range(salas)}
+    return materias, profs, salas_raw
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        saida = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, timeout=5
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return saida.stdout.strip() or None
+
+
+def run_instance(nome: str,
+                 parametros: Dict,
+                 modo: str = CONFLICT_MODE,
+                 time_limit: int = 10,
+                 memoria: bool = True,
+                 seed: int = 0,
+                 engine: str = SEARCH_ENGINE) -> Dict:
+    """
+    Roda o pipeline numa instância e devolve o registro do benchmark.
+    """
+    profiler = RunProfiler(ativo=True, memoria=memoria)
+    geracao = dict(parametros)
+    dias = list(SEMANA)[:geracao.pop('dias', len(SEMANA))]
+    materias, profs_raw, salas_raw = generate_instance(seed=seed, **geracao)
+
+    with profiler.stage("build_disciplinas") as etapa:
+        disciplinas = DataProcessor.build_disciplinas(materias)
+        salas_obj = DataProcessor.build_salas(salas_raw)
+        slots = [s for s in DataProcessor.build_slots() if int(s.id.split('_')[0]) in dias]
+        professores_obj = DataProcessor.build_professores(profs_raw, disciplinas)
+        etapa['disciplinas'] = len(disciplinas)
+        etapa['slots'] = len(slots)
+
+    with profiler.stage("split_disciplinas") as etapa:
+        partes = DataProcessor.split_disciplinas_em_partes(disciplinas)
+        etapa['partes'] = len(partes)
+
+    graph_builder = GraphBuilder(streaming=CANDIDATE_STREAMING)
+    with profiler.stage("add_nodes") as etapa:
+        graph_builder.add_nodes(partes, professores_obj, salas_obj, slots)
+        etapa['nos'] = graph_builder.get_graph().number_of_nodes()
+    with profiler.stage("add_edges") as etapa:
+        graph_builder.add_edges(partes, professores_obj, salas_obj, slots)
+        etapa['arestas'] = graph_builder.get_graph().number_of_edges()
+    with profiler.stage("generate_candidates") as etapa:
+        graph_builder.generate_candidates(partes, strict_mode=True)
+        etapa['candidatos'] = len(graph_builder.candidate_info)
+
+    graph = graph_builder.get_graph()
+    store = graph_builder.candidate_info
+    candidatos = graph_builder.candidatos_por_parte
+    conflict_graph = conflict_oracle = conflict_bitsets = room_symmetry = None
+
+    with tempfile.TemporaryDirectory(prefix="bench-") as tmp:
+        with profiler.stage("conflict_build") as etapa:
+            if modo == "grafo":
+                conflict_graph = ConflictBuilder(graph, store).build(
+                    strict_mode=True, metodo=CONFLICT_BUILD
+                )
+                etapa['arestas'] = conflict_graph.number_of_edges()
+            elif modo == "mmap":
+                conflict_graph = ConflictBuilder(graph, store).build_mapped(
+                    os.path.join(tmp, "conflitos.csr"), strict_mode=True,
+                    metodo=CONFLICT_BUILD
+                )
+                etapa['arestas'] = conflict_graph.number_of_edges()
+            elif modo == "bitset":
+                conflict_bitsets = ConflictBitsets(graph, store, strict_mode=True)
+            else:
+                if ROOM_SYMMETRY:
+                    room_symmetry = RoomSymmetry(graph, store, candidatos, strict_mode=True)
+                conflict_oracle = ConflictOracle(
+                    graph, store, strict_mode=True, room_symmetry=room_symmetry
+                )
+
+        solver = ConflictGraphSolver(
+            candidatos, store, conflict_graph, graph,
+            conflict_oracle=conflict_oracle,
+            conflict_bitsets=conflict_bitsets,
+            branch_and_bound=BRANCH_AND_BOUND,
+            engine=engine,
+            room_symmetry=room_symmetry
+        )
+        with profiler.stage("solve") as etapa:
+            encontrou = solver.solve(verbose=False, time_limit=time_limit)
+            etapa['nos_explorados'] = solver.nodes_explored
+            etapa['score'] = solver.best_score
+
+        if modo == "mmap":
+            conflict_graph.close()
+
+    return {
+        'instancia': nome,
+        'parametros': dict(parametros, seed=seed),
+        'modo': modo,
+        'engine': engine,
+        'encontrou': encontrou,
+        'time_limit': time_limit,
+        'revisao': _git_revision(),
+        **profiler.report(),
+    }
+
+
+def save_results(caminho: str, registros: List[Dict]) -> None:
+    """
+    Acrescenta os registros ao arquivo (lista JSON), mantendo os antigos.
+    """
+    anteriores: List[Dict] = []
+    if os.path.exists(caminho):
+        with open(caminho, encoding="utf-8") as f:
+            anteriores = json.load(f)
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump(anteriores + registros, f, ensure_ascii=False, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark com instâncias sintéticas")
+    parser.add_argument("tamanhos", nargs="*",
+                        help=f"tamanhos a rodar, entre {', '.join(TAMANHOS)} (padrão: todos)")
+    parser.add_argument("--modo", default=CONFLICT_MODE,
+                        choices=["grafo", "mmap", "oraculo", "bitset"])
+    parser.add_argument("--engine", default=SEARCH_ENGINE,
+                        choices=["iterativo", "recursivo"])
+    parser.add_argument("--time-limit", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--sem-memoria", action="store_true",
+                        help="não usa tracemalloc (tempos mais próximos do real)")
+    parser.add_argument("--saida", default="benchmark_results.json")
+    args = parser.parse_args()
+    desconhecidos = [t for t in args.tamanhos if t not in TAMANHOS]
+    if desconhecidos:
+        parser.error(f"tamanho(s) desconhecido(s): {', '.join(desconhecidos)}")
+
+    registros = []
+    for nome in args.tamanhos or list(TAMANHOS):
+        print(f"\n📏 Instância {nome}: {TAMANHOS[nome]}")
+        inicio = time.perf_counter()
+        registro = run_instance(
+            nome, TAMANHOS[nome], modo=args.modo, time_limit=args.time_limit,
+            memoria=not args.sem_memoria, seed=args.seed, engine=args.engine
+        )
+        registros.append(registro)
+        for etapa in registro['etapas']:
+            linha = f"   {etapa['etapa']:<22} {etapa['tempo_s']:>9.3f}s"
+            if 'pico_memoria_mb' in etapa:
+                linha += f" {etapa['pico_memoria_mb']:>9.1f} MB"
+            for chave in RunProfiler.TAXAS.values():
+                if chave in etapa:
+                    linha += f"  {etapa[chave]} {chave}"
+            print(linha)
+        print(f"   encontrou={registro['encontrou']} score={registro['etapas'][-1].get('score')} "
+              f"({time.perf_counter() - inicio:.1f}s)")
+
+    save_results(args.saida, registros)
+    print(f"\nResultados acrescentados a {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+from array import array
+from bisect import bisect_right
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+class CandidateStore(Mapping):
+    """
+    Tabela colunar de candidatos de alocação.
+
+    Cada candidato é um inteiro (0..N-1) e seus campos ficam em arrays
+    contíguos de índices para parte, professor, sala e slot. O acesso por
+    índice devolve a mesma tupla (disc, prof, sala, slot) de nós do grafo
+    que candidate_info sempre devolveu; o ID em string só é montado sob
+    demanda por cand_id().
+    """
+
+    def __init__(self):
+        self.part_nodes: List[str] = []
+        self.part_sub_ids: List[str] = []
+        self.prof_nodes: List[str] = []
+        self.sala_nodes: List[str] = []
+        self.slot_nodes: List[str] = []
+        self._part_idx: Dict[str, int] = {}
+        self._prof_idx: Dict[str, int] = {}
+        self._sala_idx: Dict[str, int] = {}
+        self._slot_idx: Dict[str, int] = {}
+
+        self.parte = array('i')
+        self.prof = array('i')
+        self.sala = array('i')
+        self.slot = array('i')
+
+    @staticmethod
+    def _intern(node: str, nodes: List[str], index: Dict[str, int]) -> int:
+        idx = index.get(node)
+        if idx is None:
+            idx = len(nodes)
+            index[node] = idx
+            nodes.append(node)
+        return idx
+
+    def part_index(self, disc_node: str, sub_id: str) -> int:
+        idx = self._part_idx.get(disc_node)
+        if idx is None:
+            idx = self._intern(disc_node, self.part_nodes, self._part_idx)
+            self.part_sub_ids.append(sub_id)
+        return idx
+
+    def prof_index(self, prof_node: str) -> int:
+        return self._intern(prof_node, self.prof_nodes, self._prof_idx)
+
+    def sala_index(self, sala_node: str) -> int:
+        return self._intern(sala_node, self.sala_nodes, self._sala_idx)
+
+    def slot_index(self, slot_node: str) -> int:
+        return self._intern(slot_node, self.slot_nodes, self._slot_idx)
+
+    def add(self, parte: int, prof: int, sala: int, slot: int) -> int:
+        """
+        Acrescenta um candidato a partir dos índices já internados.
+        """
+        self.parte.append(parte)
+        self.prof.append(prof)
+        self.sala.append(sala)
+        self.slot.append(slot)
+        return len(self.parte) - 1
+
+    def rows(self) -> Iterator[Tuple[int, int, int, int]]:
+        """
+        Percorre (parte, prof, sala, slot) de todos os candidatos em ordem.
+        """
+        return zip(self.parte, self.prof, self.sala, self.slot)
+
+    def cand_id(self, cid: int) -> str:
+        """
+        ID textual do candidato, no mesmo formato usado antes da tabela.
+        """
+        return (
+            f"assign_{self.part_sub_ids[self.parte[cid]]}__"
+            f"{self.prof_nodes[self.prof[cid]]}__"
+            f"{self.sala_nodes[self.sala[cid]]}__"
+            f"{self.slot_nodes[self.slot[cid]]}"
+        )
+
+    def __getitem__(self, cid: int) -> Tuple[str, str, str, str]:
+        if not isinstance(cid, int) or not 0 <= cid < len(self.parte):
+            raise KeyError(cid)
+        return (
+            self.part_nodes[self.parte[cid]],
+            self.prof_nodes[self.prof[cid]],
+            self.sala_nodes[self.sala[cid]],
+            self.slot_nodes[self.slot[cid]]
+        )
+
+    def __contains__(self, cid) -> bool:
+        return isinstance(cid, int) and 0 <= cid < len(self.parte)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(range(len(self.parte)))
+
+    def __len__(self) -> int:
+        return len(self.parte)
+
+
+class _BlockColumn:
+    """
+    Coluna somente leitura da LazyCandidateStore: o valor é calculado a
+    partir do bloco do candidato, sem array por candidato.
+    """
+
+    __slots__ = ('_store', '_campo')
+
+    def __init__(self, store: 'LazyCandidateStore', campo: int):
+        self._store = store
+        self._campo = campo
+
+    def __getitem__(self, cid: int) -> int:
+        return self._store.decode(cid)[self._campo]
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    def __iter__(self) -> Iterator[int]:
+        campo = self._campo
+        for linha in self._store.rows():
+            yield linha[campo]
+
+
+class LazyCandidateStore(CandidateStore):
+    """
+    CandidateStore em modo streaming.
+
+    Cada parte guarda apenas os seus domínios (professores, salas, slots)
+    e os candidatos são o produto cartesiano deles, numerados de forma
+    contígua. Os campos de um candidato são decodificados aritmeticamente
+    quando consultados, então a memória cresce com o número de partes e
+    não com o número de candidatos. parte/prof/sala/slot continuam
+    indexáveis como as colunas da CandidateStore.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._inicios = array('i')
+        self._blocos: List[Tuple[int, array, array, array]] = []
+        self._total = 0
+        self._bloco_da_parte: Dict[int, int] = {}
+        self._posicoes: List[Tuple[Dict[int, int], Dict[int, int], Dict[int, int]]] = []
+
+        self.parte = _BlockColumn(self, 0)
+        self.prof = _BlockColumn(self, 1)
+        self.sala = _BlockColumn(self, 2)
+        self.slot = _BlockColumn(self, 3)
+
+    def add(self, parte: int, prof: int, sala: int, slot: int) -> int:
+        raise TypeError("LazyCandidateStore só aceita blocos (add_block)")
+
+    def add_block(self,
+                  parte: int,
+                  profs: List[int],
+                  salas: List[int],
+                  slots: List[int]) -> range:
+        """
+        Registra os domínios de uma parte e devolve o intervalo de IDs dos
+        seus candidatos, na ordem professor → sala → slot.
+        """
+        inicio = self._total
+        n = len(profs) * len(salas) * len(slots)
+        if n:
+            self._bloco_da_parte[parte] = len(self._blocos)
+            self._inicios.append(inicio)
+            self._blocos.append((parte, array('i', profs), array('i', salas), array('i', slots)))
+            self._posicoes.append(tuple(
+                {v: i for i, v in enumerate(valores)} for valores in (profs, salas, slots)
+            ))
+            self._total += n
+        return range(inicio, self._total)
+
+    def decode(self, cid: int) -> Tuple[int, int, int, int]:
+        """
+        (parte, prof, sala, slot) em índices internados.
+        """
+        if not isinstance(cid, int) or not 0 <= cid < self._total:
+            raise KeyError(cid)
+        b = bisect_right(self._inicios, cid) - 1
+        parte, profs, salas, slots = self._blocos[b]
+        off = cid - self._inicios[b]
+        nh = len(slots)
+        off, i_slot = divmod(off, nh)
+        i_prof, i_sala = divmod(off, len(salas))
+        return parte, profs[i_prof], salas[i_sala], slots[i_slot]
+
+    def find(self, parte: int, prof: int, sala: int, slot: int) -> Optional[int]:
+        """
+        ID do candidato com esses índices, ou None se ele não existe.
+        """
+        b = self._bloco_da_parte.get(parte)
+        if b is None:
+            return None
+        pos_prof, pos_sala, pos_slot = self._posicoes[b]
+        i_prof = pos_prof.get(prof)
+        i_sala = pos_sala.get(sala)
+        i_slot = pos_slot.get(slot)
+        if i_prof is None or i_sala is None or i_slot is None:
+            return None
+        _, _, salas, slots = self._blocos[b]
+        return self._inicios[b] + (i_prof * len(salas) + i_sala) * len(slots) + i_slot
+
+    def domains(self, parte: int) -> Tuple[array, array, array]:
+        """
+        Domínios (profs, salas, slots) registrados para a parte.
+        """
+        b = self._bloco_da_parte.get(parte)
+        if b is None:
+            return array('i'), array('i'), array('i')
+        return self._blocos[b][1:]
+
+    def rows(self) -> Iterator[Tuple[int, int, int, int]]:
+        """
+        Percorre todos os candidatos em ordem de ID sem decodificar um a um.
+        """
+        for parte, profs, salas, slots in self._blocos:
+            for prof in profs:
+                for sala in salas:
+                    for slot in slots:
+                        yield parte, prof, sala, slot
+
+    def cand_id(self, cid: int) -> str:
+        parte, prof, sala, slot = self.decode(cid)
+        return (
+            f"assign_{self.part_sub_ids[parte]}__"
+            f"{self.prof_nodes[prof]}__"
+            f"{self.sala_nodes[sala]}__"
+            f"{self.slot_nodes[slot]}"
+        )
+
+    def __getitem__(self, cid: int) -> Tuple[str, str, str, str]:
+        parte, prof, sala, slot = self.decode(cid)
+        return (
+            self.part_nodes[parte],
+            self.prof_nodes[prof],
+            self.sala_nodes[sala],
+            self.slot_nodes[slot]
+        )
+
+    def __contains__(self, cid) -> bool:
+        return isinstance(cid, int) and 0 <= cid < self._total
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(range(self._total))
+
+    def __len__(self) -> int:
+        return self._total
@@ -1,3 +1,4 @@
+import os
 from typing import Dict, List
 
 SEMANA: Dict[int, str] = {
@@ -27,4 +28,78 @@ HORARIOS_NOTURNOS: List[int] = [5, 6, 7]
 SLOTS_VALIDOS: List[int] = [i for i in HORARIOS.keys() if i not in [0, 8]]
 
 PDF_FILENAME: str = "grade_completa.pdf"
-LOG_STEP: int = 10000
\ No newline at end of file
+LOG_STEP: int = 10000
+
+# "grafo": materializa o grafo de conflitos (ConflictBuilder.build)
+# "mmap": grafo de conflitos em CSR num arquivo mapeado em memória
+#         (ConflictBuilder.build_mapped), fora do heap do Python
+# "oraculo": consulta conflitos sob demanda via tabelas de ocupação
+# "bitset": domínios como bitsets com forward checking e MRV dinâmico
+CONFLICT_MODE: str = "oraculo"
+
+# Construção do grafo de conflitos nos modos "grafo" e "mmap":
+# "baldes" (Python puro) ou "numpy" (regras vetorizadas, requer numpy)
+CONFLICT_BUILD: str = "baldes"
+
+# Mantém o score de gaps durante a busca e poda ramos que não superam a
+# melhor solução já encontrada (em vez de comparar as 50 primeiras)
+BRANCH_AND_BOUND: bool = True
+
+# Acima de 1, resolve com um portfólio de processos (PortfolioSolver)
+# que compartilham o melhor score encontrado; só nos modos "oraculo" e
+# "bitset"
+SOLVER_WORKERS: int = 1
+
+# "iterativo" (pilha explícita) ou "recursivo" (uma chamada por parte),
+# também no modo "bitset"; os dois visitam os mesmos nós na mesma ordem
+SEARCH_ENGINE: str = "iterativo"
+
+# Segundos de busca local (simulated annealing) após o solve; 0 desativa
+LOCAL_SEARCH_TIME: float = 0.0
+# Semente fixa da busca local, para a saída ser reproduzível
+LOCAL_SEARCH_SEED: int = 0
+
+# "backtracking" (ConflictGraphSolver / PortfolioSolver) ou "cpsat"
+# (CPSatSolver, requer o pacote opcional ortools)
+SOLVER_BACKEND: str = "backtracking"
+
+# Trata salas da mesma classe como intercambiáveis durante a busca
+# (modo "oraculo"); as salas concretas são atribuídas no final
+ROOM_SYMMETRY: bool = False
+
+# Gera os candidatos sob demanda (LazyCandidateStore): guarda só os
+# domínios de cada parte em vez de uma linha por candidato
+CANDIDATE_STREAMING: bool = False
+
+# Cache em disco do grafo, dos candidatos e do grafo de conflitos,
+# reaproveitado enquanto entradas, horários, CONFLICT_BUILD e filtros
+# não mudarem (as opções do solver não entram na chave)
+# (CACHE_DIR fica no diretório de trabalho e está no .gitignore)
+USE_CACHE: bool = False
+CACHE_DIR: str = ".cache"
+
+# Relatório JSON com tempo, pico de memória (tracemalloc, que deixa a
+# execução mais lenta) e contadores de cada etapa do pipeline
+PROFILE: bool = False
+PROFILE_MEMORY: bool = True
+PROFILE_REPORT: str = "run_report.json"
+# Arquivo para o cProfile da busca (ex.: "solver.prof"); vazio desativa
+PROFILE_SOLVER: str = ""
+
+# Verificações rápidas de inviabilidade (turmas, professores, salas e
+# emparelhamento partes → horários) antes de iniciar a busca
+FEASIBILITY_CHECK: bool = True
+
+# Resolve separadamente os grupos de partes que não dividem professor,
+# turma nem disciplina, reconciliando as salas no final (DecomposedSolver
+# com SOLVER_WORKERS processos; com 1, tudo no processo principal)
+DECOMPOSE: bool = False
+
+# Processos para gerar os PDFs e imagens de saída em paralelo
+# (ReportExporter); 1 gera um de cada vez no processo principal
+EXPORT_WORKERS: int = min(4, os.cpu_count() or 1)
+
+# Acima deste número de nós, as imagens do grafo e da solução agrupam as
+# partes por disciplina, as salas por classe e os horários por dia (com a
+# contagem no rótulo)
+GRAPH_SUMMARY_NODES: int = 150
@@ -1,17 +1,155 @@
-from typing import Dict, List, Tuple, Set
+from typing import Dict, List, Mapping, Optional, Tuple, Set
 import networkx as nx
+from layered_graph import LayeredGraph
+from candidate_store import CandidateStore, LazyCandidateStore
+from conflict_store import MappedConflictGraph
+from room_symmetry import RoomSymmetry
+
+try:
+    import numpy as np
+except ImportError:  # dependência opcional (método "numpy")
+    np = None
+
+# Pares avaliados por vez no método "numpy"
+_PARES_POR_BLOCO = 1 << 21
 
 
 class ConflictBuilder:
 
     def __init__(self,
-                 graph: nx.MultiGraph,
-                 candidate_info: Dict[str, Tuple]):
+                 graph: LayeredGraph,
+                 candidate_info: Mapping[int, Tuple]):
 
         self.graph = graph
         self.candidate_info = candidate_info
+        # Índice de update(): grafo indexado, strict_mode, atributos e
+        # baldes (chave -> cids) dos candidatos do grafo
+        self._indice: Optional[Tuple] = None
+
+    def build(self, strict_mode: bool = True, metodo: str = "baldes") -> nx.Graph:
+        """
+        Constrói o grafo de conflitos comparando apenas candidatos que
+        compartilham algum "balde" (disciplina, prof/horário, sala/horário,
+        curso/período/horário, prof/dia, disciplina/dia). Pares fora dos
+        baldes nunca violam as regras 1–7, então o resultado é idêntico ao
+        de build_pairwise.
 
-    def build(self, strict_mode: bool = True) -> nx.Graph:
+        metodo="numpy" avalia as regras em blocos de pares com arrays
+        NumPy (requer numpy); o conjunto de arestas é o mesmo.
+        """
+        A = nx.Graph()
+        cids = list(self.candidate_info.keys())
+        A.add_nodes_from(cids)
+        A.add_edges_from(self._conflicts(cids, strict_mode, metodo))
+        return A
+
+    def build_mapped(self, path: str, strict_mode: bool = True,
+                     metodo: str = "baldes") -> MappedConflictGraph:
+        """
+        Mesmas arestas de build(), gravadas em CSR no arquivo path e
+        abertas com mmap, sem passar pelo heap como nx.Graph.
+        """
+        if not isinstance(self.candidate_info, CandidateStore):
+            raise TypeError("build_mapped requer uma CandidateStore")
+        cids = list(self.candidate_info.keys())
+        if metodo == "numpy":
+            return MappedConflictGraph.write_blocks(
+                path, len(cids), self._iter_conflict_blocks_numpy(cids, strict_mode)
+            )
+        return MappedConflictGraph.write(
+            path, len(cids), self._conflicts(cids, strict_mode, metodo)
+        )
+
+    def update(self,
+               conflict_graph: nx.Graph,
+               removidos: List[int],
+               novos: List[int],
+               strict_mode: bool = True) -> None:
+        """
+        Atualiza um grafo de conflitos já construído: tira os candidatos
+        removidos e liga os novos aos candidatos existentes. O índice de
+        baldes é montado na primeira chamada (O(n)) e mantido entre as
+        chamadas; depois disso cada alteração só lê os atributos dos
+        candidatos novos e percorre os baldes que eles tocam.
+        """
+        indice = self._indice
+        if indice is not None and (indice[0] is not conflict_graph or indice[1] != strict_mode):
+            indice = None
+        if indice is not None:
+            _, _, attrs, baldes, limite = indice
+            for cid in removidos:
+                a = attrs.pop(cid, None)
+                if a is None:
+                    continue
+                for chave in self._chaves(a, strict_mode, limite):
+                    baldes[chave].discard(cid)
+        conflict_graph.remove_nodes_from(removidos)
+
+        novos_attrs = self._candidate_attrs(novos) if novos else []
+        if indice is not None and self._limite_regra5(novos_attrs) < limite:
+            # Duração maior que as indexadas: o balde da regra 5 muda
+            indice = None
+        if indice is None:
+            cids = list(conflict_graph.nodes())
+            attrs = dict(zip(cids, self._candidate_attrs(cids)))
+            limite = min(self._limite_regra5(attrs.values()),
+                         self._limite_regra5(novos_attrs))
+            baldes: Dict[Tuple, Set[int]] = {}
+            for cid, a in attrs.items():
+                for chave in self._chaves(a, strict_mode, limite):
+                    baldes.setdefault(chave, set()).add(cid)
+            indice = self._indice = (conflict_graph, strict_mode, attrs, baldes, limite)
+        if not novos:
+            return
+
+        conflict_graph.add_nodes_from(novos)
+        first_rule = self._first_rule
+        for cid, x in zip(novos, novos_attrs):
+            attrs[cid] = x
+            for chave in self._chaves(x, strict_mode, limite):
+                balde = baldes.setdefault(chave, set())
+                regra = chave[0]
+                # Os novos entram no balde depois de comparados, então
+                # cada par entre dois novos é visto uma vez só
+                for outro in balde:
+                    if first_rule(x, attrs[outro], strict_mode) == regra:
+                        conflict_graph.add_edge(cid, outro)
+                balde.add(cid)
+
+    @staticmethod
+    def _limite_regra5(attrs) -> int:
+        """
+        Duração até a qual um candidato nunca viola a regra 5 (8h do
+        professor no dia): nem somada à maior duração passa de 8.
+        """
+        return 8 - max((a[8] for a in attrs), default=0)
+
+    @staticmethod
+    def _chaves(a: Tuple, strict_mode: bool, limite_regra5: int) -> List[Tuple]:
+        """
+        Baldes de um candidato, com o número da regra na frente da chave.
+        """
+        d, p, s, h, disc_id, turma, dia, _, dur = a
+        chaves = [(1, d), (2, p, h), (3, s, h), (6, disc_id, dia)]
+        if dur > limite_regra5:
+            chaves.append((5, p, dia))
+        if turma is not None:
+            chaves.append((4, turma, h))
+        if strict_mode:
+            chaves.append((7, disc_id))
+        return chaves
+
+    def _conflicts(self, cids: List[int], strict_mode: bool, metodo: str):
+        if metodo == "baldes":
+            return self._iter_conflicts(cids, strict_mode)
+        if metodo == "numpy":
+            return self._iter_conflicts_numpy(cids, strict_mode)
+        raise ValueError(f"Método de construção inválido: {metodo}")
+
+    def build_pairwise(self, strict_mode: bool = True) -> nx.Graph:
+        """
+        Implementação de referência: compara todos os pares (O(n²)).
+        """
         A = nx.Graph()
         cids = list(self.candidate_info.keys())
         A.add_nodes_from(cids)
@@ -24,7 +162,290 @@ class ConflictBuilder:
 
         return A
 
-    def _has_conflict(self, ci: str, cj: str, strict_mode: bool) -> bool:
+    def _candidate_attrs(self, cids: List[int]) -> List[Tuple]:
+        """
+        Lê uma única vez os atributos de cada candidato usados pelas regras.
+        """
+        if isinstance(self.candidate_info, CandidateStore):
+            return self._store_attrs(cids)
+
+        nodes = self.graph.nodes
+        attrs = []
+        for cid in cids:
+            d, p, s, h = self.candidate_info[cid]
+            d_data = nodes[d]
+            h_data = nodes[h]
+            curso = d_data.get('curso')
+            periodo = d_data.get('periodo')
+            turma = None
+            if curso and periodo:
+                turma = (str(curso), int(periodo))
+            attrs.append((
+                d, p, s, h,
+                d_data.get('id'),
+                turma,
+                h_data.get('dia'),
+                h_data.get('hora_id'),
+                h_data.get('duracao', 1)
+            ))
+        return attrs
+
+    def _store_tables(self) -> Tuple[List[Tuple], List[Tuple]]:
+        """
+        Atributos das regras lidos uma vez por parte e por slot da
+        CandidateStore: (id da disciplina, turma) e (dia, hora_id, duração).
+        """
+        store = self.candidate_info
+        nodes = self.graph.nodes
+
+        por_parte = []
+        for d in store.part_nodes:
+            d_data = nodes[d]
+            curso = d_data.get('curso')
+            periodo = d_data.get('periodo')
+            turma = None
+            if curso and periodo:
+                turma = (str(curso), int(periodo))
+            por_parte.append((d_data.get('id'), turma))
+
+        por_slot = []
+        for h in store.slot_nodes:
+            h_data = nodes[h]
+            por_slot.append((
+                h_data.get('dia'),
+                h_data.get('hora_id'),
+                h_data.get('duracao', 1)
+            ))
+        return por_parte, por_slot
+
+    def _store_attrs(self, cids: List[int]) -> List[Tuple]:
+        """
+        Versão colunar: os atributos de disciplina e horário são lidos uma
+        vez por parte/slot, e disciplina, professor, sala e slot viram
+        códigos inteiros da CandidateStore.
+        """
+        store = self.candidate_info
+        por_parte, por_slot = self._store_tables()
+
+        if len(cids) == len(store) and all(a == b for a, b in zip(cids, range(len(store)))):
+            # Todos os candidatos: percorre a store uma vez, sem indexar
+            linhas = store.rows()
+        else:
+            parte, prof, sala, slot = store.parte, store.prof, store.sala, store.slot
+            linhas = ((parte[cid], prof[cid], sala[cid], slot[cid]) for cid in cids)
+
+        return [
+            (d, p, s, h) + por_parte[d] + por_slot[h]
+            for d, p, s, h in linhas
+        ]
+
+    def attr_view(self, classe_da_sala: Optional[Dict[int, int]] = None) -> 'StoreAttrView':
+        """
+        Atributos decodificados sob demanda (LazyCandidateStore), sem
+        lista com uma tupla por candidato.
+        """
+        por_parte, por_slot = self._store_tables()
+        return StoreAttrView(self.candidate_info, por_parte, por_slot, classe_da_sala)
+
+    @staticmethod
+    def _first_rule(x: Tuple, y: Tuple, strict_mode: bool) -> int:
+        """
+        Mesma lógica de _has_conflict sobre atributos pré-carregados.
+        Retorna o número da primeira regra violada (0 se não há conflito).
+        """
+        if x[0] == y[0]:
+            return 1
+        if x[1] == y[1] and x[3] == y[3]:
+            return 2
+        if x[2] == y[2] and x[3] == y[3]:
+            return 3
+        if (x[3] == y[3] and x[5] is not None and
+                x[5] == y[5] and x[4] != y[4]):
+            return 4
+        if x[1] == y[1] and x[6] == y[6] and (x[8] + y[8]) > 8:
+            return 5
+        if x[4] == y[4] and x[6] == y[6] and abs(x[7] - y[7]) == 1:
+            return 6
+        if strict_mode and x[4] == y[4] and x[2] != y[2]:
+            return 7
+        return 0
+
+    def _iter_conflicts(self, cids: List[int], strict_mode: bool):
+        attrs = self._candidate_attrs(cids)
+
+        # Cada regra só pode ser violada por pares que compartilham a chave
+        # do seu balde. No balde da regra 5 só entram candidatos longos o
+        # bastante para passar de 8h com outro (com aulas de 1–2h, nenhum).
+        limite = self._limite_regra5(attrs)
+        baldes: List[Dict] = [{} for _ in range(7)]
+        for k, (d, p, s, h, disc_id, turma, dia, _, dur) in enumerate(attrs):
+            baldes[0].setdefault(d, []).append(k)
+            baldes[1].setdefault((p, h), []).append(k)
+            baldes[2].setdefault((s, h), []).append(k)
+            if turma is not None:
+                baldes[3].setdefault((turma, h), []).append(k)
+            if dur > limite:
+                baldes[4].setdefault((p, dia), []).append(k)
+            baldes[5].setdefault((disc_id, dia), []).append(k)
+            if strict_mode:
+                baldes[6].setdefault(disc_id, []).append(k)
+
+        first_rule = self._first_rule
+        for regra, grupos in enumerate(baldes, start=1):
+            for bucket in grupos.values():
+                for a in range(len(bucket)):
+                    i = bucket[a]
+                    x = attrs[i]
+                    for b in range(a + 1, len(bucket)):
+                        j = bucket[b]
+                        # O par é emitido apenas no balde da primeira regra
+                        # que ele viola, evitando arestas duplicadas.
+                        if first_rule(x, attrs[j], strict_mode) == regra:
+                            yield cids[i], cids[j]
+
+    def _attr_arrays(self, cids: List[int]) -> Dict[str, "np.ndarray"]:
+        """
+        Atributos das regras como arrays de inteiros: identificadores
+        (parte, prof, sala, slot, disciplina, turma, dia) viram códigos
+        densos; hora_id e duração mantêm o valor. Turma ausente vira -1.
+        """
+        attrs = self._candidate_attrs(cids)
+        n = len(attrs)
+
+        def codigos(k: int, nulo_negativo: bool = False) -> "np.ndarray":
+            tabela: Dict = {}
+            if nulo_negativo:
+                return np.fromiter(
+                    (-1 if a[k] is None else tabela.setdefault(a[k], len(tabela)) for a in attrs),
+                    dtype=np.int64, count=n
+                )
+            return np.fromiter(
+                (tabela.setdefault(a[k], len(tabela)) for a in attrs),
+                dtype=np.int64, count=n
+            )
+
+        return {
+            'd': codigos(0),
+            'p': codigos(1),
+            's': codigos(2),
+            'h': codigos(3),
+            'disc': codigos(4),
+            'turma': codigos(5, nulo_negativo=True),
+            'dia': codigos(6),
+            'hora': np.fromiter((a[7] for a in attrs), dtype=np.int64, count=n),
+            'dur': np.fromiter((a[8] for a in attrs), dtype=np.int64, count=n),
+        }
+
+    @staticmethod
+    def _rules_numpy(col: Dict[str, "np.ndarray"], I: "np.ndarray", J: "np.ndarray",
+                     strict_mode: bool) -> List["np.ndarray"]:
+        """
+        Máscaras das regras 1–7 para os pares (I[k], J[k]), na mesma
+        ordem e com a mesma lógica de _first_rule.
+        """
+        mesma = lambda nome: col[nome][I] == col[nome][J]
+        mesmo_h = mesma('h')
+        mesmo_p = mesma('p')
+        mesma_sala = mesma('s')
+        mesma_disc = mesma('disc')
+        mesmo_dia = mesma('dia')
+        turma = col['turma']
+        regras = [
+            mesma('d'),
+            mesmo_p & mesmo_h,
+            mesma_sala & mesmo_h,
+            mesmo_h & (turma[I] >= 0) & (turma[I] == turma[J]) & ~mesma_disc,
+            mesmo_p & mesmo_dia & (col['dur'][I] + col['dur'][J] > 8),
+            mesma_disc & mesmo_dia & (np.abs(col['hora'][I] - col['hora'][J]) == 1),
+        ]
+        if strict_mode:
+            regras.append(mesma_disc & ~mesma_sala)
+        else:
+            regras.append(np.zeros(len(I), dtype=bool))
+        return regras
+
+    @staticmethod
+    def _group_pairs(idx: "np.ndarray"):
+        """
+        Todos os pares (i < j) de um balde, em blocos de linhas para
+        limitar a memória de cada bloco a ~_PARES_POR_BLOCO pares.
+        """
+        g = len(idx)
+        colunas = np.arange(g)
+        a = 0
+        while a < g - 1:
+            linhas = max(1, min(g - 1 - a, _PARES_POR_BLOCO // g))
+            r, c = np.nonzero(colunas[None, :] > np.arange(a, a + linhas)[:, None])
+            yield idx[r + a], idx[c]
+            a += linhas
+
+    def _iter_conflicts_numpy(self, cids: List[int], strict_mode: bool):
+        """
+        Pares (ci, cj) de _iter_conflict_blocks_numpy, um a um.
+        """
+        ids = cids if isinstance(self.candidate_info, CandidateStore) else None
+        for I, J in self._iter_conflict_blocks_numpy(cids, strict_mode):
+            I, J = I.tolist(), J.tolist()
+            if ids is not None:
+                yield from zip(I, J)
+            else:
+                yield from ((cids[i], cids[j]) for i, j in zip(I, J))
+
+    def _iter_conflict_blocks_numpy(self, cids: List[int], strict_mode: bool):
+        """
+        Versão vetorizada de _iter_conflicts: os baldes saem de uma
+        ordenação das chaves codificadas e cada bloco de pares de um balde
+        é filtrado de uma vez pelas máscaras das regras. Produz blocos
+        (I, J) de posições em cids.
+        """
+        if np is None:
+            raise ImportError("O método \"numpy\" requer o NumPy: pip install numpy")
+
+        col = self._attr_arrays(cids)
+        n = len(cids)
+        if n == 0:
+            return
+
+        def chave(*nomes: str) -> "np.ndarray":
+            k = np.zeros(n, dtype=np.int64)
+            for nome in nomes:
+                v = col[nome]
+                k = k * (int(v.max()) + 2) + (v + 1)
+            return k
+
+        baldes = [
+            (chave('d'), None),
+            (chave('p', 'h'), None),
+            (chave('s', 'h'), None),
+            (chave('turma', 'h'), col['turma'] >= 0),
+            (chave('p', 'dia'), col['dur'] > 8 - int(col['dur'].max())),
+            (chave('disc', 'dia'), None),
+        ]
+        if strict_mode:
+            baldes.append((chave('disc'), None))
+
+        for regra, (k, filtro) in enumerate(baldes, start=1):
+            sel = np.arange(n) if filtro is None else np.nonzero(filtro)[0]
+            if len(sel) < 2:
+                continue
+            ordem = sel[np.argsort(k[sel], kind='stable')]
+            ks = k[ordem]
+            cortes = np.flatnonzero(ks[1:] != ks[:-1]) + 1
+            inicios = np.concatenate(([0], cortes))
+            fins = np.concatenate((cortes, [len(ordem)]))
+            for ini, fim in zip(inicios.tolist(), fins.tolist()):
+                if fim - ini < 2:
+                    continue
+                for I, J in self._group_pairs(ordem[ini:fim]):
+                    regras = self._rules_numpy(col, I, J, strict_mode)
+                    # O par é emitido apenas no balde da primeira regra
+                    manter = regras[regra - 1]
+                    for anterior in regras[:regra - 1]:
+                        manter &= ~anterior
+                    if manter.any():
+                        yield I[manter], J[manter]
+
+    def _has_conflict(self, ci: int, cj: int, strict_mode: bool) -> bool:
 
         di, pi, si, hi = self.candidate_info[ci]   # disciplina, prof, sala, slot
         dj, pj, sj, hj = self.candidate_info[cj]
@@ -96,3 +517,252 @@ class ConflictBuilder:
             return True
 
         return False
+
+
+class StoreAttrView:
+    """
+    Sequência somente leitura com a mesma tupla de _candidate_attrs,
+    calculada a cada acesso a partir da LazyCandidateStore. Com
+    classe_da_sala, a sala é trocada pela sua classe (RoomSymmetry).
+    """
+
+    def __init__(self,
+                 store: LazyCandidateStore,
+                 por_parte: List[Tuple],
+                 por_slot: List[Tuple],
+                 classe_da_sala: Optional[Dict[int, int]] = None):
+        self._decode = store.decode
+        self._len = len(store)
+        self.por_parte = por_parte
+        self.por_slot = por_slot
+        self.classe_da_sala = classe_da_sala
+
+    def __getitem__(self, cid: int) -> Tuple:
+        d, p, s, h = self._decode(cid)
+        if self.classe_da_sala is not None:
+            s = self.classe_da_sala[s]
+        return (d, p, s, h) + self.por_parte[d] + self.por_slot[h]
+
+    def __len__(self) -> int:
+        return self._len
+
+
+class ConflictOracle:
+    """
+    Verifica conflitos sob demanda, sem materializar o grafo de conflitos.
+    Mantém tabelas de ocupação dos candidatos escolhidos; a memória cresce
+    com o número de candidatos, não com o número de arestas.
+
+    Com room_symmetry, a sala de cada candidato é trocada pela sua classe:
+    a regra 3 vira uma capacidade por (classe, horário) e, no strict mode,
+    a regra 7 exige a mesma classe e proíbe a mesma disciplina duas vezes
+    no mesmo horário. As salas concretas ficam para RoomSymmetry.assign().
+    """
+
+    def __init__(self,
+                 graph: LayeredGraph,
+                 candidate_info: Mapping[int, Tuple],
+                 strict_mode: bool = True,
+                 room_symmetry: Optional[RoomSymmetry] = None):
+
+        self.strict_mode = strict_mode
+        self.room_symmetry = room_symmetry
+        self.capacidade: Optional[List[int]] = None
+        if room_symmetry is not None:
+            self.capacidade = room_symmetry.capacidade
+        builder = ConflictBuilder(graph, candidate_info)
+
+        if isinstance(candidate_info, LazyCandidateStore):
+            # Streaming: nada é materializado por candidato
+            classe = room_symmetry.classe_da_sala if room_symmetry is not None else None
+            self.attrs = builder.attr_view(classe)
+            self._duracoes = sorted({dur for _, _, dur in self.attrs.por_slot})
+        else:
+            cids = list(candidate_info.keys())
+            attrs = builder._candidate_attrs(cids)
+            if room_symmetry is not None:
+                classe = room_symmetry.classe_da_sala
+                attrs = [a[:2] + (classe[a[2]],) + a[3:] for a in attrs]
+            if isinstance(candidate_info, CandidateStore):
+                # IDs inteiros 0..N-1: a própria lista serve de índice
+                self.attrs = attrs
+            else:
+                self.attrs = dict(zip(cids, attrs))
+            self._duracoes = sorted({a[8] for a in attrs})
+        self._builder = builder
+        self.ocupacao: Dict[Tuple, int] = {}
+
+    def extend(self) -> List[int]:
+        """
+        Lê os atributos dos candidatos acrescentados à CandidateStore
+        depois da construção do oráculo (IDs em sequência no fim da
+        tabela) e devolve esses IDs.
+        """
+        if not isinstance(self.attrs, list) or self.room_symmetry is not None:
+            raise TypeError("extend() exige CandidateStore e oráculo sem room_symmetry")
+        store = self._builder.candidate_info
+        novos = list(range(len(self.attrs), len(store)))
+        if novos:
+            attrs = self._builder._candidate_attrs(novos)
+            self.attrs.extend(attrs)
+            self._duracoes = sorted(set(self._duracoes) | {a[8] for a in attrs})
+        return novos
+
+    def _inc(self, key: Tuple, delta: int) -> None:
+        total = self.ocupacao.get(key, 0) + delta
+        if total:
+            self.ocupacao[key] = total
+        else:
+            del self.ocupacao[key]
+
+    def _keys(self, cid: int) -> List[Tuple]:
+        d, p, s, h, disc_id, turma, dia, hora_id, dur = self.attrs[cid]
+        keys = [
+            ('disc', d),
+            ('prof_slot', p, h),
+            ('sala_slot', s, h),
+            ('prof_dia', p, dia, dur),
+            ('disc_hora', disc_id, dia, hora_id),
+        ]
+        if turma is not None:
+            keys.append(('turma_slot', turma, h))
+            keys.append(('turma_slot_disc', turma, h, disc_id))
+        if self.strict_mode:
+            keys.append(('disc_id', disc_id))
+            keys.append(('disc_sala', disc_id, s))
+            if self.capacidade is not None:
+                keys.append(('disc_slot', disc_id, h))
+        return keys
+
+    def compatible(self, cid: int) -> bool:
+        """
+        True se o candidato não conflita com nenhum candidato escolhido.
+        """
+        occ = self.ocupacao
+        d, p, s, h, disc_id, turma, dia, hora_id, dur = self.attrs[cid]
+
+        # Regras 1, 2 e 3
+        if ('disc', d) in occ or ('prof_slot', p, h) in occ:
+            return False
+        if self.capacidade is None:
+            if ('sala_slot', s, h) in occ:
+                return False
+        elif occ.get(('sala_slot', s, h), 0) >= self.capacidade[s]:
+            return False
+
+        # Regra 4 – outra disciplina da mesma turma no horário
+        if turma is not None:
+            na_turma = occ.get(('turma_slot', turma, h), 0)
+            if na_turma - occ.get(('turma_slot_disc', turma, h, disc_id), 0) > 0:
+                return False
+
+        # Regra 5 – máximo de 8h do professor no dia
+        for outra in self._duracoes:
+            if dur + outra > 8 and ('prof_dia', p, dia, outra) in occ:
+                return False
+
+        # Regra 6 – duplas adjacentes da mesma disciplina
+        if (('disc_hora', disc_id, dia, hora_id - 1) in occ or
+                ('disc_hora', disc_id, dia, hora_id + 1) in occ):
+            return False
+
+        # Regra 7 – strict mode, mesma disciplina em outra sala
+        if self.strict_mode:
+            if occ.get(('disc_id', disc_id), 0) - occ.get(('disc_sala', disc_id, s), 0) > 0:
+                return False
+            # Com salas por classe: mesma sala no mesmo horário (regra 3)
+            if self.capacidade is not None and ('disc_slot', disc_id, h) in occ:
+                return False
+
+        return True
+
+    def push(self, cid: int) -> None:
+        for key in self._keys(cid):
+            self._inc(key, 1)
+
+    def pop(self, cid: int) -> None:
+        for key in self._keys(cid):
+            self._inc(key, -1)
+
+
+class ConflictBitsets:
+    """
+    Linhas do grafo de conflitos como bitsets (int do Python), montadas a
+    partir de máscaras por balde. Exige uma CandidateStore, pois o bit i
+    corresponde ao candidato i.
+    """
+
+    def __init__(self,
+                 graph: LayeredGraph,
+                 candidate_info: CandidateStore,
+                 strict_mode: bool = True):
+
+        if not isinstance(candidate_info, CandidateStore):
+            raise TypeError("ConflictBitsets requer uma CandidateStore")
+
+        self.strict_mode = strict_mode
+        self.size = len(candidate_info)
+        cids = list(candidate_info.keys())
+        self.attrs = ConflictBuilder(graph, candidate_info)._candidate_attrs(cids)
+        self._duracoes = sorted({a[8] for a in self.attrs})
+
+        indices: Dict[Tuple, List[int]] = {}
+        for cid, (d, p, s, h, disc_id, turma, dia, hora_id, dur) in enumerate(self.attrs):
+            keys = [
+                ('disc', d),
+                ('prof_slot', p, h),
+                ('sala_slot', s, h),
+                ('prof_dia', p, dia, dur),
+                ('disc_hora', disc_id, dia, hora_id),
+            ]
+            if turma is not None:
+                keys.append(('turma_slot', turma, h))
+                keys.append(('turma_slot_disc', turma, h, disc_id))
+            if strict_mode:
+                keys.append(('disc_id', disc_id))
+                keys.append(('disc_sala', disc_id, s))
+            for key in keys:
+                indices.setdefault(key, []).append(cid)
+
+        self.masks: Dict[Tuple, int] = {
+            key: self.mask_of(cands) for key, cands in indices.items()
+        }
+
+    def mask_of(self, cands) -> int:
+        """
+        Bitset com os bits dos candidatos informados.
+        """
+        buf = bytearray((self.size + 7) // 8)
+        for c in cands:
+            buf[c >> 3] |= 1 << (c & 7)
+        return int.from_bytes(buf, 'little')
+
+    def row(self, cid: int) -> int:
+        """
+        Conjunto de candidatos que conflitam com cid (inclui o próprio cid).
+        """
+        masks = self.masks
+        get = masks.get
+        d, p, s, h, disc_id, turma, dia, hora_id, dur = self.attrs[cid]
+
+        # Regras 1, 2 e 3
+        row = masks[('disc', d)] | masks[('prof_slot', p, h)] | masks[('sala_slot', s, h)]
+
+        # Regra 4
+        if turma is not None:
+            row |= masks[('turma_slot', turma, h)] & ~masks[('turma_slot_disc', turma, h, disc_id)]
+
+        # Regra 5
+        for outra in self._duracoes:
+            if dur + outra > 8:
+                row |= get(('prof_dia', p, dia, outra), 0)
+
+        # Regra 6
+        row |= get(('disc_hora', disc_id, dia, hora_id - 1), 0)
+        row |= get(('disc_hora', disc_id, dia, hora_id + 1), 0)
+
+        # Regra 7
+        if self.strict_mode:
+            row |= masks[('disc_id', disc_id)] & ~masks[('disc_sala', disc_id, s)]
+
+        return row
@@ -0,0 +1,191 @@
+import mmap
+import os
+import struct
+import tempfile
+from array import array
+from typing import Iterable, Tuple
+
+MAGIC = b"CSR1"
+# magic, número de nós, número de arestas (alinhado em 8 bytes)
+_HEADER = struct.Struct("<4s4xqq")
+_BLOCO = 1 << 20
+
+
+class MappedConflictGraph:
+    """
+    Grafo de conflitos em formato CSR num arquivo, aberto com mmap.
+
+    Layout: cabeçalho, offsets int64 (N+1) e vizinhos int32 (2E, cada
+    aresta aparece nas duas linhas). As consultas leem direto das páginas
+    mapeadas, então quem guarda a adjacência é o page cache do sistema
+    operacional e não o heap do Python. Exige candidatos numerados 0..N-1
+    (CandidateStore).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        tamanho = os.fstat(self._file.fileno()).st_size
+        if tamanho < _HEADER.size:
+            self._file.close()
+            raise ValueError(f"Arquivo de conflitos inválido: {path}")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.n_nodes, self.n_edges = _HEADER.unpack_from(self._mm, 0)
+        inicio_viz = _HEADER.size + 8 * (self.n_nodes + 1)
+        if magic != MAGIC or tamanho != inicio_viz + 8 * self.n_edges:
+            self.close()
+            raise ValueError(f"Arquivo de conflitos inválido: {path}")
+        self._view = memoryview(self._mm)
+        self.offsets = self._view[_HEADER.size:inicio_viz].cast('q')
+        self.vizinhos = self._view[inicio_viz:].cast('i')
+
+    @classmethod
+    def write(cls, path: str, n_nodes: int,
+              pares: Iterable[Tuple[int, int]]) -> 'MappedConflictGraph':
+        """
+        Grava o CSR a partir de um iterador de arestas (i, j) e devolve o
+        grafo aberto. As arestas passam por um arquivo temporário, então a
+        memória usada é O(N) mesmo com dezenas de milhões de arestas.
+        """
+        grau = array('q', bytes(8 * n_nodes))
+        diretorio = os.path.dirname(os.path.abspath(path))
+        os.makedirs(diretorio, exist_ok=True)
+
+        with tempfile.TemporaryFile(dir=diretorio) as spill:
+            n_edges = 0
+            buf = array('i')
+            for i, j in pares:
+                buf.append(i)
+                buf.append(j)
+                grau[i] += 1
+                grau[j] += 1
+                if len(buf) >= _BLOCO:
+                    buf.tofile(spill)
+                    n_edges += len(buf) // 2
+                    del buf[:]
+            buf.tofile(spill)
+            n_edges += len(buf) // 2
+            del buf
+
+            offsets = array('q', [0])
+            for g in grau:
+                offsets.append(offsets[-1] + g)
+            del grau
+
+            inicio_viz = _HEADER.size + 8 * (n_nodes + 1)
+            tmp = path + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(_HEADER.pack(MAGIC, n_nodes, n_edges))
+                offsets.tofile(f)
+                f.truncate(inicio_viz + 8 * n_edges)
+
+            # Distribui as arestas nas linhas escrevendo no arquivo mapeado
+            pos = array('q', offsets[:-1])
+            with open(tmp, "r+b") as f:
+                mm = mmap.mmap(f.fileno(), 0)
+                try:
+                    viz = memoryview(mm)[inicio_viz:].cast('i')
+                    spill.seek(0)
+                    while True:
+                        bloco = array('i')
+                        try:
+                            bloco.fromfile(spill, _BLOCO)
+                        except EOFError:
+                            pass
+                        if not bloco:
+                            break
+                        for k in range(0, len(bloco), 2):
+                            i, j = bloco[k], bloco[k + 1]
+                            viz[pos[i]] = j
+                            pos[i] += 1
+                            viz[pos[j]] = i
+                            pos[j] += 1
+                    viz.release()
+                    mm.flush()
+                finally:
+                    mm.close()
+            os.replace(tmp, path)
+
+        return cls(path)
+
+    @classmethod
+    def write_blocks(cls, path: str, n_nodes: int, blocos) -> 'MappedConflictGraph':
+        """
+        Igual a write(), mas recebendo blocos (I, J) de arrays NumPy: a
+        contagem de graus e a distribuição nas linhas são vetorizadas.
+        """
+        import numpy as np
+
+        grau = np.zeros(n_nodes, dtype=np.int64)
+        diretorio = os.path.dirname(os.path.abspath(path))
+        os.makedirs(diretorio, exist_ok=True)
+
+        with tempfile.TemporaryFile(dir=diretorio) as spill:
+            n_edges = 0
+            for I, J in blocos:
+                par = np.empty((len(I), 2), dtype=np.int32)
+                par[:, 0] = I
+                par[:, 1] = J
+                spill.write(par.tobytes())
+                grau += np.bincount(I, minlength=n_nodes)
+                grau += np.bincount(J, minlength=n_nodes)
+                n_edges += len(I)
+
+            offsets = np.zeros(n_nodes + 1, dtype=np.int64)
+            np.cumsum(grau, out=offsets[1:])
+            inicio_viz = _HEADER.size + 8 * (n_nodes + 1)
+            tmp = path + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(_HEADER.pack(MAGIC, n_nodes, n_edges))
+                f.write(offsets.tobytes())
+                f.truncate(inicio_viz + 8 * n_edges)
+
+            cursor = offsets[:-1].copy()
+            if n_edges:
+                viz = np.memmap(tmp, dtype=np.int32, mode="r+",
+                                offset=inicio_viz, shape=(2 * n_edges,))
+                spill.seek(0)
+                while True:
+                    dados = spill.read(8 * _BLOCO)
+                    if not dados:
+                        break
+                    par = np.frombuffer(dados, dtype=np.int32).reshape(-1, 2)
+                    origem = np.concatenate((par[:, 0], par[:, 1]))
+                    destino = np.concatenate((par[:, 1], par[:, 0]))
+                    # Posição = cursor da linha + ordem dentro do bloco
+                    ordem = np.argsort(origem, kind='stable')
+                    origem, destino = origem[ordem], destino[ordem]
+                    inicio_grupo = np.concatenate(([True], origem[1:] != origem[:-1]))
+                    primeiro = np.maximum.accumulate(
+                        np.where(inicio_grupo, np.arange(len(origem)), 0)
+                    )
+                    viz[cursor[origem] + np.arange(len(origem)) - primeiro] = destino
+                    cursor += np.bincount(origem, minlength=n_nodes)
+                viz.flush()
+                del viz
+            os.replace(tmp, path)
+
+        return cls(path)
+
+    def neighbors(self, cid: int) -> memoryview:
+        return self.vizinhos[self.offsets[cid]:self.offsets[cid + 1]]
+
+    def degree(self, cid: int) -> int:
+        return self.offsets[cid + 1] - self.offsets[cid]
+
+    def nodes(self) -> range:
+        return range(self.n_nodes)
+
+    def number_of_nodes(self) -> int:
+        return self.n_nodes
+
+    def number_of_edges(self) -> int:
+        return self.n_edges
+
+    def close(self) -> None:
+        for nome in ('offsets', 'vizinhos', '_view'):
+            view = getattr(self, nome, None)
+            if view is not None:
+                view.release()
+        self._mm.close()
+        self._file.close()
@@ -0,0 +1,191 @@
+import time
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+from conflict_builder import ConflictBuilder
+from layered_graph import LayeredGraph
+
+try:
+    from ortools.sat.python import cp_model
+except ImportError:  # dependência opcional
+    cp_model = None
+
+
+class CPSatSolver:
+    """
+    Backend alternativo ao ConflictGraphSolver usando o CP-SAT do OR-Tools.
+
+    Mesmas entradas (candidatos_por_parte, candidate_info, original_graph)
+    e o mesmo contrato de solve()/get_solution(). Cada candidato vira uma
+    variável booleana; cada parte recebe exatamente um candidato e as regras
+    1–7 do ConflictBuilder viram restrições "no máximo um" por balde. O
+    objetivo é o score de gaps de calculate_gap_score.
+    """
+
+    def __init__(self,
+                 candidatos_por_parte: Dict[str, Sequence[int]],
+                 candidate_info: Mapping[int, Tuple],
+                 original_graph: LayeredGraph,
+                 strict_mode: bool = True,
+                 workers: int = 8):
+
+        if cp_model is None:
+            raise ImportError(
+                "O backend CP-SAT requer o OR-Tools: pip install ortools"
+            )
+
+        self.candidatos_por_parte = candidatos_por_parte
+        self.candidate_info = candidate_info
+        self.original_graph = original_graph
+        self.strict_mode = strict_mode
+        self.workers = workers
+
+        self.best_solution: Optional[List[int]] = None
+        self.best_score: Optional[int] = None
+        self.status: Optional[str] = None
+
+    def _build_model(self):
+        model = cp_model.CpModel()
+        nodes = self.original_graph.nodes
+
+        cids = [cid for cands in self.candidatos_por_parte.values() for cid in cands]
+        attrs = ConflictBuilder(self.original_graph, self.candidate_info)._candidate_attrs(cids)
+        x = {cid: model.NewBoolVar(f"x{cid}") for cid in cids}
+
+        def ou(nome: str, membros: List[int]):
+            """Variável igual ao OU lógico dos candidatos."""
+            var = model.NewBoolVar(nome)
+            model.AddMaxEquality(var, [x[c] for c in membros])
+            return var
+
+        # Exatamente um candidato por parte (cobre a regra 1)
+        for cands in self.candidatos_por_parte.values():
+            model.AddExactlyOne(x[c] for c in cands)
+
+        baldes: Dict[Tuple, List[int]] = {}
+        for cid, (d, p, s, h, disc_id, turma, dia, hora_id, dur) in zip(cids, attrs):
+            baldes.setdefault(('prof_slot', p, h), []).append(cid)
+            baldes.setdefault(('sala_slot', s, h), []).append(cid)
+            if turma is not None:
+                baldes.setdefault(('turma_slot', turma, h, disc_id), []).append(cid)
+            baldes.setdefault(('prof_dia', p, dia, dur), []).append(cid)
+            baldes.setdefault(('disc_hora', disc_id, dia, hora_id), []).append(cid)
+            if self.strict_mode:
+                baldes.setdefault(('disc_sala', disc_id, s), []).append(cid)
+
+        turma_slot: Dict[Tuple, List] = {}
+        prof_dia: Dict[Tuple, Dict] = {}
+        disc_hora: Dict[Tuple, Dict] = {}
+        disc_sala: Dict[str, List] = {}
+        for key, membros in baldes.items():
+            tipo = key[0]
+            if tipo in ('prof_slot', 'sala_slot'):
+                # Regras 2 e 3
+                if len(membros) > 1:
+                    model.AddAtMostOne(x[c] for c in membros)
+            elif tipo == 'turma_slot':
+                turma_slot.setdefault(key[1:3], []).append(membros)
+            elif tipo == 'prof_dia':
+                prof_dia.setdefault(key[1:3], {})[key[3]] = membros
+            elif tipo == 'disc_hora':
+                disc_hora.setdefault(key[1:3], {})[key[3]] = membros
+            else:
+                disc_sala.setdefault(key[1], []).append(membros)
+
+        # Regra 4 – no máximo uma disciplina por turma e horário
+        for k, grupos in enumerate(turma_slot.values()):
+            if len(grupos) > 1:
+                model.AddAtMostOne(ou(f"t{k}_{i}", g) for i, g in enumerate(grupos))
+
+        # Regra 5 – pares do mesmo professor/dia acima de 8h
+        for k, por_dur in enumerate(prof_dia.values()):
+            duracoes = sorted(por_dur)
+            usa = {}
+            for i, a in enumerate(duracoes):
+                for b in duracoes[i:]:
+                    if a + b <= 8:
+                        continue
+                    if a == b:
+                        model.AddAtMostOne(x[c] for c in por_dur[a])
+                        continue
+                    for dur in (a, b):
+                        if dur not in usa:
+                            usa[dur] = ou(f"pd{k}_{dur}", por_dur[dur])
+                    model.AddBoolOr([usa[a].Not(), usa[b].Not()])
+
+        # Regra 6 – horários adjacentes da mesma disciplina no mesmo dia
+        for k, por_hora in enumerate(disc_hora.values()):
+            ocupa = {h: ou(f"dh{k}_{h}", m) for h, m in por_hora.items()}
+            for h, var in ocupa.items():
+                if h + 1 in ocupa:
+                    model.AddBoolOr([var.Not(), ocupa[h + 1].Not()])
+
+        # Regra 7 – strict mode, uma única sala por disciplina
+        for k, grupos in enumerate(disc_sala.values()):
+            if len(grupos) > 1:
+                model.AddAtMostOne(ou(f"ds{k}_{i}", g) for i, g in enumerate(grupos))
+
+        # Objetivo: gaps por curso + período + dia (penalidade quadrática)
+        por_dia: Dict[Tuple, Dict[int, List[int]]] = {}
+        for cid in cids:
+            d_node, _, _, h_node = self.candidate_info[cid]
+            d_data = nodes[d_node]
+            curso = d_data.get('curso')
+            periodo = d_data.get('periodo')
+            if not curso or not periodo:
+                continue
+            h_data = nodes[h_node]
+            key = (curso, periodo, h_data['dia'])
+            por_dia.setdefault(key, {}).setdefault(h_data['hora_id'], []).append(cid)
+
+        penalidades = []
+        for k, por_hora in enumerate(por_dia.values()):
+            horas = sorted(por_hora)
+            ocupa = {h: ou(f"o{k}_{h}", por_hora[h]) for h in horas}
+            for i, h1 in enumerate(horas):
+                for j in range(i + 1, len(horas)):
+                    h2 = horas[j]
+                    gap = h2 - h1 - 1
+                    if gap <= 0:
+                        continue
+                    # w = 1 quando h1 e h2 estão ocupados sem aula entre eles
+                    w = model.NewBoolVar(f"w{k}_{h1}_{h2}")
+                    entre = [ocupa[h] for h in horas[i + 1:j]]
+                    model.Add(w >= ocupa[h1] + ocupa[h2] - 1 - sum(entre))
+                    penalidades.append(gap * gap * w)
+
+        model.Minimize(sum(penalidades))
+        return model, x
+
+    def solve(self, verbose: bool = True, time_limit: int = 15) -> bool:
+        start = time.time()
+        self.best_solution = None
+        self.best_score = None
+
+        model, x = self._build_model()
+        if verbose:
+            print(f"Modelo CP-SAT com {len(x)} variáveis de alocação "
+                  f"(limite de {time_limit}s)...")
+
+        solver = cp_model.CpSolver()
+        solver.parameters.max_time_in_seconds = time_limit
+        solver.parameters.num_workers = self.workers
+        status = solver.Solve(model)
+        self.status = solver.StatusName(status)
+
+        if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            self.best_solution = [cid for cid, var in x.items() if solver.Value(var)]
+            self.best_score = int(round(solver.ObjectiveValue()))
+
+        if verbose:
+            elapsed = time.time() - start
+            print(f"\n{'='*50}")
+            print(f"CP-SAT finalizado: {self.status}")
+            print(f"Tempo: {elapsed:.2f}s | Score de Gaps: {self.best_score}")
+            print(f"{'='*50}\n")
+
+        return self.best_solution is not None
+
+    def get_solution(self) -> Optional[List[Tuple]]:
+        if self.best_solution is None:
+            return None
+        return [self.candidate_info[cid] for cid in self.best_solution]
@@ -49,7 +49,12 @@ class DataProcessor:
 
     @staticmethod
     def build_salas(raw_salas: Dict[str, str]) -> List[Sala]:
-        return [Sala(id=sid, nome=nome) for sid, nome in raw_salas.items()]
+        # Salas com o mesmo nome a menos do código são intercambiáveis
+        # (ex.: "Laboratório de Informática A101" e "... B202")
+        return [
+            Sala(id=sid, nome=nome, classe=nome.replace(sid, '').strip())
+            for sid, nome in raw_salas.items()
+        ]
 
     @staticmethod
     def build_slots() -> List[Slot]:
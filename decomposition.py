@@ -0,0 +1,374 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Mapping, Optional, Sequence, Set, Tuple
+
+from candidate_store import CandidateStore, LazyCandidateStore
+from conflict_builder import ConflictOracle
+from layered_graph import LayeredGraph
+from solver import ConflictGraphSolver
+from room_symmetry import RoomSymmetry
+
+
+# Passos máximos do backtracking da reconciliação de salas antes de
+# desistir e resolver a instância inteira
+_LIMITE_RECOLORACAO = 200000
+
+
+def find_clusters(candidatos_por_parte: Dict[str, Sequence[int]],
+                  candidate_info: CandidateStore,
+                  graph: LayeredGraph) -> List[List[str]]:
+    """
+    Agrupa as partes que podem interagir: mesma disciplina (regras 1, 6 e
+    7), mesma turma (regra 4) ou algum professor em comum no domínio
+    (regras 2 e 5). Salas não entram: todas as partes disputam as mesmas
+    salas e isso é resolvido depois da busca. Devolve os grupos do maior
+    para o menor.
+    """
+    store = candidate_info
+    nodes = graph.nodes
+    lazy = isinstance(store, LazyCandidateStore)
+    pai: Dict[str, str] = {part: part for part in candidatos_por_parte}
+
+    def raiz(part: str) -> str:
+        while pai[part] != part:
+            pai[part] = pai[pai[part]]
+            part = pai[part]
+        return part
+
+    dono: Dict[Tuple, str] = {}
+    for part, cands in candidatos_por_parte.items():
+        if not cands:
+            continue
+        parte = store.parte[cands[0]]
+        data = nodes[store.part_nodes[parte]]
+        chaves: List[Tuple] = [('disc', data.get('id'))]
+        if data.get('curso') and data.get('periodo'):
+            chaves.append(('turma', str(data['curso']), int(data['periodo'])))
+        if lazy:
+            profs = set(store.domains(parte)[0])
+        elif isinstance(cands, range) and cands.step == 1:
+            profs = set(store.prof[cands.start:cands.stop])
+        else:
+            profs = {store.prof[c] for c in cands}
+        chaves.extend(('prof', p) for p in profs)
+
+        for chave in chaves:
+            outra = dono.setdefault(chave, part)
+            a, b = raiz(part), raiz(outra)
+            if a != b:
+                pai[a] = b
+
+    grupos: Dict[str, List[str]] = {}
+    for part in candidatos_por_parte:
+        grupos.setdefault(raiz(part), []).append(part)
+    return sorted(grupos.values(), key=len, reverse=True)
+
+
+_worker_state: Dict = {}
+
+
+def _init_worker(candidatos_por_parte, candidate_info, original_graph,
+                 strict_mode, room_symmetry) -> None:
+    _worker_state.clear()
+    _worker_state.update(
+        candidatos_por_parte=candidatos_por_parte,
+        candidate_info=candidate_info,
+        original_graph=original_graph,
+        strict_mode=strict_mode,
+        room_symmetry=room_symmetry
+    )
+
+
+def _oracle(fixos: Sequence[int] = ()) -> ConflictOracle:
+    """
+    Oráculo do processo (montado uma vez) com apenas os candidatos fixos
+    ocupando as tabelas.
+    """
+    st = _worker_state
+    if 'oraculo' not in st:
+        simetria = None
+        if st['room_symmetry']:
+            simetria = RoomSymmetry(
+                st['original_graph'], st['candidate_info'],
+                st['candidatos_por_parte'], st['strict_mode']
+            )
+        st['simetria'] = simetria
+        st['oraculo'] = ConflictOracle(
+            st['original_graph'], st['candidate_info'], st['strict_mode'],
+            room_symmetry=simetria
+        )
+    oraculo = st['oraculo']
+    oraculo.ocupacao.clear()
+    for cid in fixos:
+        oraculo.push(cid)
+    return oraculo
+
+
+def _solve_cluster(indice: int, partes: List[str], time_limit: float,
+                   fixos: Sequence[int] = ()) -> Tuple:
+    """
+    Resolve um grupo com as salas ocupadas pelos candidatos fixos de
+    outros grupos (os demais recursos desses candidatos nunca coincidem
+    com os do grupo).
+    """
+    st = _worker_state
+    oraculo = _oracle(fixos)
+    todos = st['candidatos_por_parte']
+    solver = ConflictGraphSolver(
+        {part: todos[part] for part in partes},
+        st['candidate_info'],
+        None,
+        st['original_graph'],
+        conflict_oracle=oraculo,
+        branch_and_bound=True,
+        room_symmetry=st['simetria']
+    )
+    solver.solve(verbose=False, time_limit=max(0.0, time_limit))
+    return indice, solver.best_score, solver.best_solution, solver.nodes_explored, solver.timed_out
+
+
+def _fits(solucao: List[int], fixos: Sequence[int]) -> bool:
+    """
+    True se a solução de um grupo não disputa sala e horário com os fixos.
+    """
+    oraculo = _oracle(fixos)
+    for cid in solucao:
+        if not oraculo.compatible(cid):
+            return False
+        oraculo.push(cid)
+    return True
+
+
+class DecomposedSolver:
+    """
+    Divide as partes em grupos independentes (find_clusters) e resolve os
+    grupos em paralelo, um por processo. Como os grupos não dividem
+    professor, turma nem disciplina, o score de gaps total é a soma dos
+    scores dos grupos; o único recurso em comum são as salas:
+
+    1. com mais de um processo, os grupos são resolvidos de forma
+       independente com metade do tempo;
+    2. em seguida, do maior para o menor, cada solução é conferida contra
+       as salas já ocupadas pelos grupos anteriores e, se colidir, o grupo
+       é resolvido de novo com essas salas ocupadas no oráculo (com um só
+       processo, a fase 1 é pulada e todos passam por aqui);
+    3. por fim, reconcile_rooms() troca salas concretas que ainda colidam
+       (com quebra de simetria, cada grupo escolhe as salas da classe sem
+       ver os outros).
+
+    Se algo disso falhar, a instância inteira é resolvida de uma vez com o
+    tempo restante. Mesmo contrato de solve()/get_solution() do solver
+    simples; a verificação de conflitos é sempre pelo ConflictOracle.
+    """
+
+    def __init__(self,
+                 candidatos_por_parte: Dict[str, Sequence[int]],
+                 candidate_info: Mapping[int, Tuple],
+                 original_graph: LayeredGraph,
+                 strict_mode: bool = True,
+                 workers: Optional[int] = None,
+                 room_symmetry: bool = False):
+
+        if not isinstance(candidate_info, CandidateStore):
+            raise TypeError("DecomposedSolver requer uma CandidateStore")
+        self.candidatos_por_parte = candidatos_por_parte
+        self.candidate_info = candidate_info
+        self.original_graph = original_graph
+        self.strict_mode = strict_mode
+        self.room_symmetry = room_symmetry
+        self.workers = workers or os.cpu_count() or 1
+
+        self.clusters = find_clusters(candidatos_por_parte, candidate_info, original_graph)
+        self.best_solution: Optional[List[int]] = None
+        self.best_score: Optional[int] = None
+        self.nodes_explored = 0
+        self.timed_out = False
+
+    def solve(self, verbose: bool = True, time_limit: int = 15) -> bool:
+        inicio = time.time()
+        prazo = inicio + time_limit
+        self.best_solution = None
+        self.best_score = None
+        self.nodes_explored = 0
+        self.timed_out = False
+
+        n = len(self.clusters)
+        if verbose:
+            maior = len(self.clusters[0]) if self.clusters else 0
+            print(f"Decomposição: {n} grupo(s) independente(s), "
+                  f"maior com {maior} de {len(self.candidatos_por_parte)} parte(s)")
+
+        initargs = (self.candidatos_por_parte, self.candidate_info,
+                    self.original_graph, self.strict_mode, self.room_symmetry)
+        _init_worker(*initargs)
+
+        independentes: Dict[int, Tuple[Optional[int], List[int]]] = {}
+        workers = min(self.workers, n)
+        if workers > 1:
+            # Fase 1: metade do tempo, dividida entre as rodadas da fila
+            rodadas = -(-n // workers)
+            fatia = time_limit / 2 / rodadas
+            with ProcessPoolExecutor(max_workers=workers,
+                                     initializer=_init_worker,
+                                     initargs=initargs) as pool:
+                futures = [pool.submit(_solve_cluster, i, partes, fatia)
+                           for i, partes in enumerate(self.clusters)]
+                for future in futures:
+                    indice, score, solucao, nos, _ = future.result()
+                    self.nodes_explored += nos
+                    if solucao is not None:
+                        independentes[indice] = (score, solucao)
+                    if verbose:
+                        print(f"> Grupo {indice} ({len(self.clusters[indice])} partes): "
+                              f"score={score}, nós={nos}")
+
+        # Fase 2: grupos na ordem, disputando as salas com os anteriores
+        fixos: List[int] = []
+        score_total = 0
+        for indice, partes in enumerate(self.clusters):
+            anterior = independentes.get(indice)
+            if anterior is not None and _fits(anterior[1], fixos):
+                score, solucao = anterior
+            else:
+                fatia = (prazo - time.time()) / (n - indice)
+                _, score, solucao, nos, timed_out = _solve_cluster(indice, partes, fatia, fixos)
+                self.nodes_explored += nos
+                if verbose:
+                    print(f"> Grupo {indice} ({len(partes)} partes) com as salas dos "
+                          f"anteriores: score={score}, nós={nos}")
+                if solucao is None:
+                    # Pode ser só efeito das salas escolhidas pelos grupos
+                    # anteriores: tenta a instância inteira
+                    if verbose:
+                        print(f"Grupo {indice} sem solução com as salas dos anteriores; "
+                              "resolvendo a instância inteira...")
+                    return self._solve_whole(verbose, prazo - time.time())
+            fixos.extend(solucao)
+            score_total += score or 0
+
+        solucao = self.reconcile_rooms(fixos)
+        if solucao is None:
+            if verbose:
+                print("Salas não reconciliáveis entre os grupos; resolvendo a instância inteira...")
+            return self._solve_whole(verbose, prazo - time.time())
+
+        self.best_solution = solucao
+        self.best_score = score_total
+        if verbose:
+            print(f"\n{'='*50}")
+            print(f"Decomposição finalizada.")
+            print(f"Tempo: {time.time() - inicio:.2f}s | Nós explorados: {self.nodes_explored}")
+            print(f"Score de gaps: {self.best_score}")
+            print(f"{'='*50}\n")
+        return True
+
+    def _room_domains(self, part: str) -> Set[int]:
+        store = self.candidate_info
+        cands = self.candidatos_por_parte[part]
+        if isinstance(store, LazyCandidateStore):
+            return set(store.domains(store.parte[cands[0]])[1])
+        if isinstance(cands, range) and cands.step == 1:
+            return set(store.sala[cands.start:cands.stop])
+        return {store.sala[c] for c in cands}
+
+    def reconcile_rooms(self, escolhidos: List[int]) -> Optional[List[int]]:
+        """
+        Reatribui salas para que nenhum par (sala, horário) se repita,
+        mantendo professor e horário de cada parte. No strict mode a
+        unidade é a disciplina (uma sala para todas as partes); sem ele,
+        cada parte. Unidades que dividem horário recebem salas distintas:
+        uma coloração por backtracking que tenta primeiro a sala atual.
+        """
+        store = self.candidate_info
+        sub_ids = store.part_sub_ids
+        nodes = self.original_graph.nodes
+
+        def unidade(cid: int):
+            if self.strict_mode:
+                return nodes[store.part_nodes[store.parte[cid]]].get('id')
+            return store.parte[cid]
+
+        permitidas: Dict = {}
+        atual: Dict = {}
+        por_slot: Dict[int, List] = {}
+        for cid in escolhidos:
+            u = unidade(cid)
+            salas = self._room_domains(sub_ids[store.parte[cid]])
+            permitidas[u] = permitidas[u] & salas if u in permitidas else salas
+            atual.setdefault(u, store.sala[cid])
+            por_slot.setdefault(store.slot[cid], []).append(u)
+
+        vizinhos: Dict = {u: set() for u in permitidas}
+        for unidades in por_slot.values():
+            for a in unidades:
+                for b in unidades:
+                    if a != b:
+                        vizinhos[a].add(b)
+
+        # Sem colisão nenhuma, a solução dos grupos já serve
+        if all(atual[a] != atual[b] for a in vizinhos for b in vizinhos[a]):
+            return list(escolhidos)
+
+        ordem = sorted(vizinhos, key=lambda u: (len(permitidas[u]), -len(vizinhos[u])))
+        opcoes = {
+            u: [atual[u]] + sorted(permitidas[u] - {atual[u]})
+            for u in vizinhos
+        }
+        sala_de: Dict = {}
+        passos = [0]
+
+        def colorir(i: int) -> bool:
+            if i == len(ordem):
+                return True
+            passos[0] += 1
+            if passos[0] > _LIMITE_RECOLORACAO:
+                return False
+            u = ordem[i]
+            usadas = {sala_de[v] for v in vizinhos[u] if v in sala_de}
+            for sala in opcoes[u]:
+                if sala in usadas:
+                    continue
+                sala_de[u] = sala
+                if colorir(i + 1):
+                    return True
+                del sala_de[u]
+            return False
+
+        if not colorir(0):
+            return None
+
+        solucao = []
+        for cid in escolhidos:
+            sala = sala_de[unidade(cid)]
+            if sala == store.sala[cid]:
+                solucao.append(cid)
+                continue
+            chave = (store.parte[cid], store.prof[cid], sala, store.slot[cid])
+            if isinstance(store, LazyCandidateStore):
+                novo = store.find(*chave)
+            else:
+                novo = next(
+                    (c for c in self.candidatos_por_parte[sub_ids[chave[0]]]
+                     if (store.parte[c], store.prof[c], store.sala[c], store.slot[c]) == chave),
+                    None
+                )
+            if novo is None:
+                return None
+            solucao.append(novo)
+        return solucao
+
+    def _solve_whole(self, verbose: bool, time_limit: float) -> bool:
+        _, score, solucao, nos, timed_out = _solve_cluster(
+            0, list(self.candidatos_por_parte), time_limit
+        )
+        self.nodes_explored += nos
+        self.timed_out = timed_out
+        self.best_solution = solucao
+        self.best_score = score
+        return solucao is not None
+
+    def get_solution(self) -> Optional[List[Tuple]]:
+        if self.best_solution is None:
+            return None
+        return [self.candidate_info[cid] for cid in self.best_solution]
@@ -0,0 +1,229 @@
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Mapping, Optional, Sequence, Set, Tuple
+
+from candidate_store import CandidateStore, LazyCandidateStore
+from layered_graph import LayeredGraph
+
+
+@dataclass
+class Violacao:
+    regra: str
+    grupo: str
+    demanda: int
+    oferta: int
+    partes: List[str] = field(default_factory=list)
+
+    def __str__(self) -> str:
+        exemplo = ", ".join(self.partes[:5])
+        if len(self.partes) > 5:
+            exemplo += f", ... (+{len(self.partes) - 5})"
+        return (f"[{self.regra}] {self.grupo}: {self.demanda} parte(s) para "
+                f"{self.oferta} vaga(s) — {exemplo}")
+
+
+@dataclass
+class FeasibilityReport:
+    violacoes: List[Violacao]
+    tempo: float
+
+    @property
+    def viavel(self) -> bool:
+        return not self.violacoes
+
+    def summary(self) -> List[str]:
+        return [str(v) for v in self.violacoes]
+
+
+class FeasibilityChecker:
+    """
+    Verificações rápidas de inviabilidade, antes da busca, a partir dos
+    domínios (professores, salas, horários) de cada parte:
+
+    - turma: as partes de uma turma (curso, período) não podem dividir
+      horário (regra 4; no strict mode também as da mesma disciplina), então
+      precisam de horários distintos;
+    - professor: partes cujo único professor é o mesmo também (regra 2);
+    - disciplina (strict mode): partes da mesma disciplina sem turma;
+    - salas: cada horário comporta no máximo uma parte por sala (regra 3).
+
+    Cada grupo passa primeiro pela contagem (partes x horários da união dos
+    domínios) e depois por um emparelhamento bipartido partes → horários
+    (com capacidade = número de salas no caso das salas). São condições
+    necessárias: um relatório sem violações não garante que exista grade.
+    """
+
+    def __init__(self,
+                 candidatos_por_parte: Dict[str, Sequence[int]],
+                 candidate_info: CandidateStore,
+                 graph: LayeredGraph,
+                 strict_mode: bool = True):
+
+        if not isinstance(candidate_info, CandidateStore):
+            raise TypeError("FeasibilityChecker requer uma CandidateStore")
+        self.candidatos_por_parte = candidatos_por_parte
+        self.store = candidate_info
+        self.graph = graph
+        self.strict_mode = strict_mode
+
+    def _domains(self) -> Dict[str, Tuple[Set[int], Set[int], Set[int]]]:
+        """
+        (profs, salas, slots) de cada parte, lidos da store. Intervalos
+        contíguos são fatiados direto das colunas.
+        """
+        store = self.store
+        lazy = isinstance(store, LazyCandidateStore)
+        dominios = {}
+        for part, cands in self.candidatos_por_parte.items():
+            if not cands:
+                dominios[part] = (set(), set(), set())
+            elif lazy:
+                profs, salas, slots = store.domains(store.parte[cands[0]])
+                dominios[part] = (set(profs), set(salas), set(slots))
+            elif isinstance(cands, range) and cands.step == 1:
+                fatia = slice(cands.start, cands.stop)
+                dominios[part] = (set(store.prof[fatia]), set(store.sala[fatia]),
+                                  set(store.slot[fatia]))
+            else:
+                dominios[part] = (
+                    {store.prof[c] for c in cands},
+                    {store.sala[c] for c in cands},
+                    {store.slot[c] for c in cands},
+                )
+        return dominios
+
+    @staticmethod
+    def _match(partes: List[str],
+               slots: Mapping[str, Set[int]],
+               capacidade: int = 1) -> List[str]:
+        """
+        Emparelhamento partes → horários por caminhos aumentantes (Kuhn),
+        cada horário aceitando até capacidade partes. Devolve as partes
+        que ficaram sem horário.
+        """
+        donos: Dict[int, List[str]] = {}
+        visitados: Set[int] = set()
+
+        def opcoes(part: str):
+            # (horário, posição do ocupante a deslocar), ou (horário, None)
+            # quando o horário ainda tem vaga
+            for h in slots[part]:
+                if h in visitados:
+                    continue
+                visitados.add(h)
+                ocupantes = donos.setdefault(h, [])
+                if len(ocupantes) < capacidade:
+                    yield h, None
+                    return
+                for k in range(len(ocupantes)):
+                    yield h, k
+
+        def aumenta(part: str) -> bool:
+            # Busca em profundidade com pilha explícita: o caminho
+            # aumentante pode ter o tamanho do grupo, além do limite de
+            # recursão do Python. pilha[i] fica com a vaga caminho[i].
+            visitados.clear()
+            pilha = [(part, opcoes(part))]
+            caminho: List[Tuple[int, int]] = []
+            while pilha:
+                atual, it = pilha[-1]
+                escolha = next(it, None)
+                if escolha is None:
+                    pilha.pop()
+                    if caminho:
+                        caminho.pop()
+                    continue
+                h, k = escolha
+                if k is None:
+                    donos[h].append(atual)
+                    for (hh, kk), (dono, _) in zip(caminho, pilha):
+                        donos[hh][kk] = dono
+                    return True
+                caminho.append((h, k))
+                outra = donos[h][k]
+                pilha.append((outra, opcoes(outra)))
+            return False
+
+        sobras = []
+        for part in sorted(partes, key=lambda p: len(slots[p])):
+            if not aumenta(part):
+                sobras.append(part)
+        return sobras
+
+    def _check_group(self, regra: str, grupo: str, partes: List[str],
+                     slots: Mapping[str, Set[int]], capacidade: int = 1) -> Optional[Violacao]:
+        if len(partes) < 2 and capacidade == 1:
+            return None
+        oferta = len(set().union(*(slots[p] for p in partes))) * capacidade
+        if len(partes) > oferta:
+            return Violacao(regra, grupo, len(partes), oferta, sorted(partes))
+        sobras = self._match(partes, slots, capacidade)
+        if sobras:
+            return Violacao(regra, grupo, len(partes), len(partes) - len(sobras), sobras)
+        return None
+
+    def check(self) -> FeasibilityReport:
+        inicio = time.perf_counter()
+        store = self.store
+        nodes = self.graph.nodes
+        dominios = self._domains()
+        slots = {part: d[2] for part, d in dominios.items()}
+        violacoes: List[Violacao] = []
+
+        for part, (profs, salas, hs) in dominios.items():
+            if not profs or not salas or not hs:
+                violacoes.append(Violacao("dominio", part, 1, 0, [part]))
+
+        disc_da_parte: Dict[str, str] = {}
+        turmas: Dict[Tuple[str, int], List[str]] = {}
+        disciplinas: Dict[str, List[str]] = {}
+        for part, cands in self.candidatos_por_parte.items():
+            if not cands:
+                continue
+            data = nodes[store.part_nodes[store.parte[cands[0]]]]
+            disc_da_parte[part] = data.get('id')
+            disciplinas.setdefault(data.get('id'), []).append(part)
+            if data.get('curso') and data.get('periodo'):
+                turma = (str(data['curso']), int(data['periodo']))
+                turmas.setdefault(turma, []).append(part)
+
+        for turma, partes in turmas.items():
+            if not self.strict_mode:
+                # Sem strict mode, partes da mesma disciplina podem dividir
+                # horário: fica a de menor domínio de cada disciplina
+                por_disc: Dict[str, str] = {}
+                for part in partes:
+                    atual = por_disc.get(disc_da_parte[part])
+                    if atual is None or len(slots[part]) < len(slots[atual]):
+                        por_disc[disc_da_parte[part]] = part
+                partes = list(por_disc.values())
+            v = self._check_group("turma", f"{turma[0]} {turma[1]}º período", partes, slots)
+            if v is not None:
+                violacoes.append(v)
+
+        fixas: Dict[int, List[str]] = {}
+        for part, (profs, _, _) in dominios.items():
+            if len(profs) == 1:
+                fixas.setdefault(next(iter(profs)), []).append(part)
+        for prof, partes in fixas.items():
+            v = self._check_group("professor", store.prof_nodes[prof], partes, slots)
+            if v is not None:
+                violacoes.append(v)
+
+        if self.strict_mode:
+            com_turma = {p for partes in turmas.values() for p in partes}
+            for disc_id, partes in disciplinas.items():
+                if any(p in com_turma for p in partes):
+                    continue
+                v = self._check_group("disciplina", str(disc_id), partes, slots)
+                if v is not None:
+                    violacoes.append(v)
+
+        todas_salas = set().union(*(d[1] for d in dominios.values())) if dominios else set()
+        v = self._check_group("salas", f"{len(todas_salas)} sala(s)",
+                              [p for p in dominios if slots[p]], slots,
+                              capacidade=max(1, len(todas_salas)))
+        if v is not None:
+            violacoes.append(v)
+
+        return FeasibilityReport(violacoes, time.perf_counter() - inicio)
@@ -1,15 +1,22 @@
 from typing import Dict, List, Set, Tuple
-import networkx as nx
 from models import DisciplinaParte, Professor, Sala, Slot
 from config import HORARIOS_NOTURNOS
+from candidate_store import CandidateStore, LazyCandidateStore
+from layered_graph import LayeredGraph
 
 
 class GraphBuilder:
 
-    def __init__(self):
-        self.G = nx.MultiGraph()
-        self.candidatos_por_parte: Dict[str, List[str]] = {}
-        self.candidate_info: Dict[str, Tuple] = {}
+    def __init__(self, streaming: bool = False):
+        self.G = LayeredGraph()
+        self.profs_aptos: Dict[str, List[str]] = {}
+        self.candidatos_por_parte: Dict[str, range] = {}
+        # Em streaming só os domínios de cada parte são guardados e os
+        # candidatos são decodificados quando a busca chega até eles
+        self.streaming = streaming
+        self.candidate_info: CandidateStore = (
+            LazyCandidateStore() if streaming else CandidateStore()
+        )
 
     def add_nodes(self, 
                   disciplinas_partes: List[DisciplinaParte],
@@ -45,7 +52,8 @@ class GraphBuilder:
                 f"sala_{sala.id}",
                 layer="sala",
                 id=sala.id,
-                nome=sala.nome
+                nome=sala.nome,
+                classe=sala.classe or sala.nome
             )
         for slot in slots:
             self.G.add_node(
@@ -62,11 +70,17 @@ class GraphBuilder:
                   professores: List[Professor],
                   salas: List[Sala],
                   slots: List[Slot]) -> None:
+        # Índice de elegibilidade: disciplina -> professores aptos (na ordem
+        # da lista de professores), montado uma vez em vez de testar
+        # "id in disciplinas_aptas" para cada parte × professor
+        self.profs_aptos: Dict[str, List[str]] = {}
+        for prof in professores:
+            for disc_id in dict.fromkeys(prof.disciplinas_aptas):
+                self.profs_aptos.setdefault(disc_id, []).append(f"prof_{prof.id}")
         for disc_parte in disciplinas_partes:
             disc_node = f"disc_{disc_parte.sub_id}"
-            for prof in professores:
-                if disc_parte.id in prof.disciplinas_aptas:
-                    self.G.add_edge(disc_node, f"prof_{prof.id}", camada="disc-prof")
+            for prof_node in self.profs_aptos.get(disc_parte.id, []):
+                self.G.add_edge(disc_node, prof_node, camada="disc-prof")
         for disc_parte in disciplinas_partes:
             disc_node = f"disc_{disc_parte.sub_id}"
             for sala in salas:
@@ -90,26 +104,258 @@ class GraphBuilder:
                 )
 
     def generate_candidates(self,
-                           disciplinas_partes: List[DisciplinaParte]) -> None:
+                           disciplinas_partes: List[DisciplinaParte],
+                           strict_mode: bool = True,
+                           podar: bool = True) -> None:
+        dominios: Dict[str, Tuple[List[str], List[str], List[str]]] = {}
         for disc_parte in disciplinas_partes:
             disc_node = f"disc_{disc_parte.sub_id}"
-            self.candidatos_por_parte[disc_parte.sub_id] = []
-            profs_validos = [n for n in self.G.neighbors(disc_node) if n.startswith("prof_")]
-            salas_validas = [n for n in self.G.neighbors(disc_node) if n.startswith("sala_")]
-            slots_validos = [n for n in self.G.neighbors(disc_node) if n.startswith("slot_")]
-            for prof in profs_validos:
-                for sala in salas_validas:
-                    for slot in slots_validos:
-                        cand_id = self._make_cand_id(disc_parte.sub_id, prof, sala, slot)
-                        self.candidatos_por_parte[disc_parte.sub_id].append(cand_id)
-                        self.candidate_info[cand_id] = (disc_node, prof, sala, slot)
+            profs_validos = self.G.neighbors_in(disc_node, "professor")
+            salas_validas = self.G.neighbors_in(disc_node, "sala")
+            slots_validos = self.G.neighbors_in(disc_node, "horario")
+            dominios[disc_parte.sub_id] = (profs_validos, salas_validas, slots_validos)
+
+        self.podados = 0
+        if podar:
+            antes = sum(len(p) * len(s) * len(h) for p, s, h in dominios.values())
+            self._prune_domains(disciplinas_partes, dominios, strict_mode)
+            depois = sum(len(p) * len(s) * len(h) for p, s, h in dominios.values())
+            self.podados = antes - depois
+
+        store = self.candidate_info
+        for disc_parte in disciplinas_partes:
+            disc_node = f"disc_{disc_parte.sub_id}"
+            profs_validos, salas_validas, slots_validos = dominios[disc_parte.sub_id]
+            parte = store.part_index(disc_node, disc_parte.sub_id)
+            profs = [store.prof_index(n) for n in profs_validos]
+            salas = [store.sala_index(n) for n in salas_validas]
+            slots = [store.slot_index(n) for n in slots_validos]
+            if self.streaming:
+                self.candidatos_por_parte[disc_parte.sub_id] = store.add_block(
+                    parte, profs, salas, slots
+                )
+                continue
+            inicio = len(store)
+            for prof in profs:
+                for sala in salas:
+                    for slot in slots:
+                        store.add(parte, prof, sala, slot)
+            # Os candidatos de uma parte são contíguos na tabela
+            self.candidatos_por_parte[disc_parte.sub_id] = range(inicio, len(store))
         for sub_id, cands in self.candidatos_por_parte.items():
             if not cands:
                 raise ValueError(f"Disciplina {sub_id} não possui candidatos válidos")
 
-    @staticmethod
-    def _make_cand_id(dsub: str, prof_node: str, sala_node: str, slot_node: str) -> str:
-        return f"assign_{dsub}__{prof_node}__{sala_node}__{slot_node}"
+    def _prune_domains(self,
+                       disciplinas_partes: List[DisciplinaParte],
+                       dominios: Dict[str, Tuple[List[str], List[str], List[str]]],
+                       strict_mode: bool) -> None:
+        """
+        Reduções no estilo arc-consistency, aplicadas até o ponto fixo:
+
+        - strict mode: partes da mesma disciplina ficam na mesma sala, então
+          o domínio de salas de cada parte é a interseção com o das irmãs;
+        - uma parte com professor e horário fixos (domínios unitários)
+          ocupa esse horário: ele sai das partes cujo único professor é o
+          mesmo (regra 2), das outras disciplinas da mesma turma (regra 4)
+          e os horários adjacentes saem das irmãs no mesmo dia (regra 6;
+          no strict mode o próprio horário também sai);
+          com sala também fixa, o horário sai das partes presas à mesma
+          sala (regra 3).
+        """
+        nodes = self.G.nodes
+        partes = {p.sub_id: p for p in disciplinas_partes}
+
+        def turma(disc_parte: DisciplinaParte):
+            if disc_parte.curso and disc_parte.periodo:
+                return (str(disc_parte.curso), int(disc_parte.periodo))
+            return None
+
+        slots_por_dia: Dict[Tuple[str, int], str] = {}
+        for n in self.G.layer_nodes("horario"):
+            data = nodes[n]
+            slots_por_dia[(data['dia'], data['hora_id'])] = n
+
+        irmas: Dict[str, List[str]] = {}
+        for disc_parte in disciplinas_partes:
+            irmas.setdefault(disc_parte.id, []).append(disc_parte.sub_id)
+
+        def remover_slots(sub_id: str, proibidos: Set[str]) -> bool:
+            profs, salas, slots = dominios[sub_id]
+            restantes = [h for h in slots if h not in proibidos]
+            if len(restantes) == len(slots):
+                return False
+            dominios[sub_id] = (profs, salas, restantes)
+            return True
+
+        alterou = True
+        while alterou:
+            alterou = False
+
+            if strict_mode:
+                for subs in irmas.values():
+                    comuns = set(dominios[subs[0]][1])
+                    for sub_id in subs[1:]:
+                        comuns &= set(dominios[sub_id][1])
+                    for sub_id in subs:
+                        profs, salas, slots = dominios[sub_id]
+                        if len(comuns) < len(salas):
+                            dominios[sub_id] = (profs, [s for s in salas if s in comuns], slots)
+                            alterou = True
+
+            for sub_id, (profs, salas, slots) in list(dominios.items()):
+                if len(profs) != 1 or len(slots) != 1:
+                    continue
+                prof, slot = profs[0], slots[0]
+                fixa = partes[sub_id]
+                dia = nodes[slot]['dia']
+                hora_id = nodes[slot]['hora_id']
+                adjacentes = {
+                    slots_por_dia[(dia, h)] for h in (hora_id - 1, hora_id + 1)
+                    if (dia, h) in slots_por_dia
+                }
+
+                for outro_id, (o_profs, o_salas, _) in list(dominios.items()):
+                    if outro_id == sub_id:
+                        continue
+                    outra = partes[outro_id]
+                    proibidos: Set[str] = set()
+                    if o_profs == [prof]:
+                        proibidos.add(slot)
+                    if len(salas) == 1 and o_salas == salas:
+                        proibidos.add(slot)
+                    if (turma(fixa) is not None and turma(fixa) == turma(outra) and
+                            fixa.id != outra.id):
+                        proibidos.add(slot)
+                    if fixa.id == outra.id:
+                        proibidos |= adjacentes
+                        # strict mode: mesma disciplina no mesmo horário
+                        # viola a regra 3 (mesma sala) ou a 7 (outra sala)
+                        if strict_mode:
+                            proibidos.add(slot)
+                    if proibidos and remover_slots(outro_id, proibidos):
+                        alterou = True
+
+            for sub_id, (profs, salas, slots) in dominios.items():
+                if not profs or not salas or not slots:
+                    # Domínio vazio: nenhum candidato possível para a parte
+                    return
+
+    def _check_deltas(self) -> None:
+        if self.streaming:
+            raise TypeError("Alterações incrementais exigem CandidateStore (sem streaming)")
+
+    def _filter_candidates(self, partes: List[str], coluna: str, idx: int) -> List[int]:
+        """
+        Tira dos domínios das partes os candidatos cujo campo coluna vale
+        idx e devolve os removidos. Nada é alterado se alguma parte ficar
+        sem candidatos.
+        """
+        valores = getattr(self.candidate_info, coluna)
+        novos: Dict[str, List[int]] = {}
+        removidos: List[int] = []
+        for sub_id in partes:
+            cands = self.candidatos_por_parte[sub_id]
+            manter = [c for c in cands if valores[c] != idx]
+            if len(manter) == len(cands):
+                continue
+            if not manter:
+                raise ValueError(f"Disciplina {sub_id} não possui candidatos válidos")
+            removidos.extend(c for c in cands if valores[c] == idx)
+            novos[sub_id] = manter
+        self.candidatos_por_parte.update(novos)
+        return removidos
+
+    def remove_professor(self, prof_id: str) -> List[int]:
+        """
+        Professor indisponível: some do grafo e dos domínios das partes que
+        ele podia lecionar. Devolve os candidatos removidos.
+        """
+        self._check_deltas()
+        prof_node = f"prof_{prof_id}"
+        if prof_node not in self.G.nodes:
+            raise ValueError(f"Professor {prof_id} não está no grafo")
+        store = self.candidate_info
+        nodes = self.G.nodes
+        partes = [
+            sub_id for sub_id in self.candidatos_por_parte
+            if prof_node in self.profs_aptos.get(nodes[f"disc_{sub_id}"]['id'], [])
+        ]
+        removidos: List[int] = []
+        if prof_node in store._prof_idx:
+            removidos = self._filter_candidates(partes, 'prof', store._prof_idx[prof_node])
+        self.G.isolate(prof_node)
+        for aptos in self.profs_aptos.values():
+            if prof_node in aptos:
+                aptos.remove(prof_node)
+        return removidos
+
+    def block_slot(self, slot_id: str) -> List[int]:
+        """
+        Horário bloqueado para todas as partes. Devolve os candidatos
+        removidos.
+        """
+        self._check_deltas()
+        slot_node = f"slot_{slot_id}"
+        if slot_node not in self.G.nodes:
+            raise ValueError(f"Horário {slot_id} não está no grafo")
+        store = self.candidate_info
+        removidos: List[int] = []
+        if slot_node in store._slot_idx:
+            removidos = self._filter_candidates(
+                list(self.candidatos_por_parte), 'slot', store._slot_idx[slot_node]
+            )
+        self.G.isolate(slot_node)
+        return removidos
+
+    def remove_room(self, sala_id: str) -> List[int]:
+        """
+        Sala fechada para todas as partes. Devolve os candidatos removidos.
+        """
+        self._check_deltas()
+        sala_node = f"sala_{sala_id}"
+        if sala_node not in self.G.nodes:
+            raise ValueError(f"Sala {sala_id} não está no grafo")
+        store = self.candidate_info
+        removidos: List[int] = []
+        if sala_node in store._sala_idx:
+            removidos = self._filter_candidates(
+                list(self.candidatos_por_parte), 'sala', store._sala_idx[sala_node]
+            )
+        self.G.isolate(sala_node)
+        return removidos
+
+    def add_room(self, sala: Sala) -> List[int]:
+        """
+        Sala nova disponível para todas as partes: para cada parte, um
+        candidato por par (professor, horário) que ela já tem. Devolve os
+        candidatos novos (IDs no fim da CandidateStore).
+        """
+        self._check_deltas()
+        sala_node = f"sala_{sala.id}"
+        if sala_node in self.G.nodes:
+            raise ValueError(f"Sala {sala.id} já está no grafo")
+        self.G.add_node(
+            sala_node,
+            layer="sala",
+            id=sala.id,
+            nome=sala.nome,
+            classe=sala.classe or sala.nome
+        )
+        store = self.candidate_info
+        s = store.sala_index(sala_node)
+        novos: List[int] = []
+        for sub_id, cands in self.candidatos_por_parte.items():
+            disc_node = f"disc_{sub_id}"
+            self.G.add_edge(disc_node, sala_node, camada="disc-sala")
+            parte = store.part_index(disc_node, sub_id)
+            pares = dict.fromkeys((store.prof[c], store.slot[c]) for c in cands)
+            inicio = len(store)
+            for prof, slot in pares:
+                store.add(parte, prof, s, slot)
+            self.candidatos_por_parte[sub_id] = list(cands) + list(range(inicio, len(store)))
+            novos.extend(range(inicio, len(store)))
+        return novos
 
-    def get_graph(self) -> nx.MultiGraph:
+    def get_graph(self) -> LayeredGraph:
         return self.G
\ No newline at end of file
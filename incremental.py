@@ -0,0 +1,186 @@
+import time
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import networkx as nx
+
+from models import Sala
+from graph_builder import GraphBuilder
+from conflict_builder import ConflictBuilder, ConflictOracle
+from solver import ConflictGraphSolver
+
+
+class IncrementalScheduler:
+    """
+    Re-resolução incremental sobre um GraphBuilder que já tem candidatos.
+
+    Cada alteração (professor indisponível, sala nova ou fechada, horário
+    bloqueado) mexe só nos candidatos afetados: os removidos saem dos
+    domínios e do grafo de conflitos, os novos entram no fim da
+    CandidateStore e só as arestas deles são calculadas
+    (ConflictBuilder.update, com o índice de baldes mantido). No modo
+    "oraculo" o ConflictOracle apenas lê os atributos dos candidatos novos.
+
+    solve() parte da melhor solução anterior: as partes cujo candidato
+    continua válido ficam presas a ele e só as afetadas são decididas de
+    novo. Se isso não tem solução, libera também as partes que dividem
+    professor, turma ou disciplina com as afetadas e, por último, todas.
+    """
+
+    def __init__(self,
+                 graph_builder: GraphBuilder,
+                 strict_mode: bool = True,
+                 conflict_mode: str = "oraculo",
+                 branch_and_bound: bool = True):
+
+        if graph_builder.streaming:
+            raise TypeError("IncrementalScheduler requer uma CandidateStore (sem streaming)")
+        if conflict_mode not in ("oraculo", "grafo"):
+            raise ValueError(f"Modo de conflitos inválido para re-resolução: {conflict_mode}")
+
+        self.builder = graph_builder
+        self.graph = graph_builder.get_graph()
+        self.store = graph_builder.candidate_info
+        self.strict_mode = strict_mode
+        self.branch_and_bound = branch_and_bound
+
+        self.conflict_graph: Optional[nx.Graph] = None
+        self.conflict_oracle: Optional[ConflictOracle] = None
+        # O mesmo ConflictBuilder em todas as alterações: ele mantém o
+        # índice de baldes entre as chamadas de update()
+        self.conflict_builder = ConflictBuilder(self.graph, self.store)
+        if conflict_mode == "grafo":
+            self.conflict_graph = self.conflict_builder.build(strict_mode)
+        else:
+            self.conflict_oracle = ConflictOracle(self.graph, self.store, strict_mode)
+
+        self.solver: Optional[ConflictGraphSolver] = None
+        self.best_solution: Optional[List[int]] = None
+        self.best_score: Optional[int] = None
+        # Candidatos removidos desde a última solução
+        self._removidos: Set[int] = set()
+
+    def remove_professor(self, prof_id: str) -> List[str]:
+        """
+        Retorna as partes que precisam ser decididas de novo.
+        """
+        self._apply(self.builder.remove_professor(prof_id), [])
+        return self.affected_parts()
+
+    def block_slot(self, slot_id: str) -> List[str]:
+        self._apply(self.builder.block_slot(slot_id), [])
+        return self.affected_parts()
+
+    def remove_room(self, sala_id: str) -> List[str]:
+        self._apply(self.builder.remove_room(sala_id), [])
+        return self.affected_parts()
+
+    def add_room(self, sala: Sala) -> List[str]:
+        self._apply([], self.builder.add_room(sala))
+        return self.affected_parts()
+
+    def _apply(self, removidos: List[int], novos: List[int]) -> None:
+        self._removidos.update(removidos)
+        if self.conflict_graph is not None:
+            self.conflict_builder.update(
+                self.conflict_graph, removidos, novos, self.strict_mode
+            )
+        elif novos:
+            self.conflict_oracle.extend()
+
+    def _previous(self) -> Dict[str, int]:
+        if self.best_solution is None:
+            return {}
+        sub_ids = self.store.part_sub_ids
+        return {sub_ids[self.store.parte[cid]]: cid for cid in self.best_solution}
+
+    def affected_parts(self) -> List[str]:
+        """
+        Partes cujo candidato na solução anterior foi removido.
+        """
+        return [part for part, cid in self._previous().items() if cid in self._removidos]
+
+    def _neighbors(self, afetadas: Set[str], anterior: Dict[str, int]) -> Set[str]:
+        """
+        Afetadas mais as partes que dividem com elas o professor anterior,
+        a turma ou a disciplina.
+        """
+        nodes = self.graph.nodes
+        prof = self.store.prof
+
+        def chaves(part: str) -> Tuple:
+            data = nodes[f"disc_{part}"]
+            turma = None
+            if data.get('curso') and data.get('periodo'):
+                turma = (str(data['curso']), int(data['periodo']))
+            return data.get('id'), turma
+
+        profs = {prof[anterior[p]] for p in afetadas}
+        discs, turmas = set(), set()
+        for part in afetadas:
+            disc_id, turma = chaves(part)
+            discs.add(disc_id)
+            if turma is not None:
+                turmas.add(turma)
+
+        livres = set(afetadas)
+        for part, cid in anterior.items():
+            disc_id, turma = chaves(part)
+            if prof[cid] in profs or disc_id in discs or turma in turmas:
+                livres.add(part)
+        return livres
+
+    def solve(self, verbose: bool = True, time_limit: int = 15) -> bool:
+        """
+        Primeira chamada: busca completa. Depois de alterações, reaproveita
+        a solução anterior (ver docstring da classe); o time_limit vale
+        para todas as etapas juntas.
+        """
+        candidatos = self.builder.candidatos_por_parte
+        anterior = self._previous()
+        if not anterior:
+            return self._run(candidatos, verbose, time_limit)
+
+        afetadas = set(self.affected_parts())
+        if not afetadas:
+            # A solução anterior continua viável
+            self._removidos.clear()
+            return True
+
+        inicio = time.time()
+        etapas = [afetadas, self._neighbors(afetadas, anterior), set(candidatos)]
+        for livres in etapas:
+            if verbose:
+                print(f"Re-decidindo {len(livres)} de {len(candidatos)} parte(s)...")
+            dominios: Dict[str, Sequence[int]] = {
+                part: cands if part in livres else [anterior[part]]
+                for part, cands in candidatos.items()
+            }
+            restante = max(0.0, time_limit - (time.time() - inicio))
+            if self._run(dominios, verbose, restante):
+                return True
+        return False
+
+    def _run(self, dominios: Dict[str, Sequence[int]], verbose: bool, time_limit: float) -> bool:
+        if self.conflict_oracle is not None:
+            # Uma busca interrompida pelo timeout deixa escolhas no oráculo
+            self.conflict_oracle.ocupacao.clear()
+        solver = ConflictGraphSolver(
+            dominios,
+            self.store,
+            self.conflict_graph,
+            self.graph,
+            conflict_oracle=self.conflict_oracle,
+            branch_and_bound=self.branch_and_bound
+        )
+        if not solver.solve(verbose=verbose, time_limit=time_limit):
+            return False
+        self.solver = solver
+        self.best_solution = solver.best_solution
+        self.best_score = solver.best_score
+        self._removidos.clear()
+        return True
+
+    def get_solution(self) -> Optional[List[Tuple]]:
+        if self.solver is None:
+            return None
+        return self.solver.get_solution()
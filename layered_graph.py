@@ -0,0 +1,199 @@
+from array import array
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import networkx as nx
+
+
+class _NodeView:
+    """
+    Acesso aos nós no estilo de G.nodes do networkx: G.nodes[n] devolve o
+    dicionário de atributos e G.nodes(data=True) itera pares (nó, dados).
+    """
+
+    __slots__ = ('_graph',)
+
+    def __init__(self, graph: 'LayeredGraph'):
+        self._graph = graph
+
+    def __getitem__(self, node: str) -> Dict:
+        return self._graph._attrs[node]
+
+    def __call__(self, data: bool = False):
+        if data:
+            return iter(self._graph._attrs.items())
+        return iter(self._graph._attrs)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._graph._attrs)
+
+    def __contains__(self, node) -> bool:
+        return node in self._graph._attrs
+
+    def __len__(self) -> int:
+        return len(self._graph._attrs)
+
+
+class LayeredGraph:
+    """
+    Grafo multilayer leve (disciplina, professor, sala, horário).
+
+    Cada nó recebe um índice inteiro dentro da sua camada e as arestas
+    ficam em arrays de inteiros por par de camadas, sempre da camada mais
+    baixa para a mais alta (disc → prof, disc → sala, disc → horário).
+    Atributos de aresta além de "camada" ficam em colunas paralelas às
+    arrays. Mantém a parte da API do networkx usada pelo projeto
+    (nodes[...], nodes(data=True), neighbors(), add_node(), add_edge(),
+    number_of_nodes/edges()); to_networkx() exporta um nx.MultiGraph para
+    visualização.
+    """
+
+    CAMADAS = ("disciplina", "professor", "sala", "horario")
+
+    def __init__(self):
+        self._attrs: Dict[str, Dict] = {}
+        self._pos: Dict[str, Tuple[int, int]] = {}
+        self._nomes: List[List[str]] = [[] for _ in self.CAMADAS]
+        # (camada_u, camada_v) -> lista (por nó de u) de arrays de índices de v
+        self._adj: Dict[Tuple[int, int], List[array]] = {}
+        self._rotulo: Dict[Tuple[int, int], str] = {}
+        self._colunas: Dict[Tuple[int, int], Dict[str, List[List]]] = {}
+        self._n_edges = 0
+        self.nodes = _NodeView(self)
+
+    def add_node(self, node: str, layer: str, **attrs) -> None:
+        if node in self._attrs:
+            self._attrs[node].update(attrs)
+            return
+        camada = self.CAMADAS.index(layer)
+        self._pos[node] = (camada, len(self._nomes[camada]))
+        self._nomes[camada].append(node)
+        attrs['layer'] = layer
+        self._attrs[node] = attrs
+
+    def _linhas(self, par: Tuple[int, int]) -> List[array]:
+        linhas = self._adj.get(par)
+        if linhas is None:
+            linhas = self._adj[par] = []
+        faltam = len(self._nomes[par[0]]) - len(linhas)
+        if faltam > 0:
+            linhas.extend(array('i') for _ in range(faltam))
+        return linhas
+
+    def add_edge(self, u: str, v: str, camada: Optional[str] = None, **attrs) -> None:
+        lu, iu = self._pos[u]
+        lv, iv = self._pos[v]
+        if lu > lv:
+            lu, iu, lv, iv = lv, iv, lu, iu
+        par = (lu, lv)
+        linhas = self._linhas(par)
+        if camada is not None:
+            self._rotulo[par] = camada
+
+        colunas = self._colunas.setdefault(par, {})
+        for nome in attrs.keys() - colunas.keys():
+            # Coluna nova: arestas anteriores ficam sem o atributo (None)
+            colunas[nome] = [[None] * len(linha) for linha in linhas]
+        for nome, coluna in colunas.items():
+            faltam = len(linhas) - len(coluna)
+            if faltam > 0:
+                coluna.extend([] for _ in range(faltam))
+            coluna[iu].append(attrs.get(nome))
+        linhas[iu].append(iv)
+        self._n_edges += 1
+
+    def isolate(self, node: str) -> int:
+        """
+        Remove todas as arestas de node (o nó e seus atributos continuam no
+        grafo) e devolve quantas foram removidas.
+        """
+        camada, idx = self._pos[node]
+        removidas = 0
+        for par, linhas in self._adj.items():
+            colunas = self._colunas.get(par, {})
+            if par[0] == camada:
+                if idx < len(linhas):
+                    removidas += len(linhas[idx])
+                    linhas[idx] = array('i')
+                    for coluna in colunas.values():
+                        if idx < len(coluna):
+                            coluna[idx] = []
+            elif par[1] == camada:
+                for i, linha in enumerate(linhas):
+                    if idx not in linha:
+                        continue
+                    manter = [k for k, j in enumerate(linha) if j != idx]
+                    removidas += len(linha) - len(manter)
+                    linhas[i] = array('i', (linha[k] for k in manter))
+                    for coluna in colunas.values():
+                        if i < len(coluna):
+                            coluna[i] = [coluna[i][k] for k in manter]
+        self._n_edges -= removidas
+        return removidas
+
+    def neighbors(self, node: str) -> Iterator[str]:
+        camada, idx = self._pos[node]
+        for (lu, lv), linhas in self._adj.items():
+            if lu == camada and idx < len(linhas):
+                nomes = self._nomes[lv]
+                for j in linhas[idx]:
+                    yield nomes[j]
+            elif lv == camada:
+                # Sentido inverso (raro): varre as listas da outra camada
+                nomes = self._nomes[lu]
+                for i, linha in enumerate(linhas):
+                    if idx in linha:
+                        yield nomes[i]
+
+    def neighbors_in(self, node: str, layer: str) -> List[str]:
+        """
+        Vizinhos de node numa única camada, lidos direto da array do par de
+        camadas (sem varrer as demais nem filtrar por prefixo).
+        """
+        camada, idx = self._pos[node]
+        alvo = self.CAMADAS.index(layer)
+        if camada < alvo:
+            linhas = self._adj.get((camada, alvo))
+            if linhas is None or idx >= len(linhas):
+                return []
+            nomes = self._nomes[alvo]
+            return [nomes[j] for j in linhas[idx]]
+        return [n for n in self.neighbors(node) if self._pos[n][0] == alvo]
+
+    def layer_nodes(self, layer: str) -> List[str]:
+        """
+        Nós da camada, na ordem de inserção.
+        """
+        return list(self._nomes[self.CAMADAS.index(layer)])
+
+    def number_of_nodes(self) -> int:
+        return len(self._attrs)
+
+    def number_of_edges(self) -> int:
+        return self._n_edges
+
+    def edges(self) -> Iterator[Tuple[str, str]]:
+        """
+        Pares (u, v) de todas as arestas, sem atributos, da camada mais
+        baixa para a mais alta.
+        """
+        for (lu, lv), linhas in self._adj.items():
+            origem, destino = self._nomes[lu], self._nomes[lv]
+            for i, linha in enumerate(linhas):
+                for j in linha:
+                    yield origem[i], destino[j]
+
+    def to_networkx(self) -> nx.MultiGraph:
+        G = nx.MultiGraph()
+        G.add_nodes_from(self._attrs.items())
+        for par, linhas in self._adj.items():
+            origem, destino = self._nomes[par[0]], self._nomes[par[1]]
+            rotulo = self._rotulo.get(par)
+            colunas = self._colunas.get(par, {})
+            for i, linha in enumerate(linhas):
+                for k, j in enumerate(linha):
+                    dados = {nome: col[i][k] for nome, col in colunas.items()
+                             if i < len(col) and col[i][k] is not None}
+                    if rotulo is not None:
+                        dados['camada'] = rotulo
+                    G.add_edge(origem[i], destino[j], **dados)
+        return G
@@ -0,0 +1,218 @@
+import math
+import random
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from candidate_store import CandidateStore, LazyCandidateStore
+from layered_graph import LayeredGraph
+from conflict_builder import ConflictOracle
+from solver import GapTracker
+
+
+class LocalSearchImprover:
+    """
+    Fase de melhoria pós-solve: simulated annealing sobre uma grade viável.
+
+    Vizinhanças:
+      - troca de horário de uma parte (mesmo professor e sala);
+      - troca de sala de uma disciplina inteira (todas as partes juntas,
+        para respeitar a regra 7 do strict mode);
+      - troca dos horários de duas partes entre si.
+
+    A viabilidade é verificada pelo ConflictOracle e o score de gaps pelo
+    GapTracker, ambos incrementais: cada movimento custa apenas os
+    candidatos que entram e saem.
+    """
+
+    def __init__(self,
+                 candidatos_por_parte: Dict[str, Sequence[int]],
+                 candidate_info: CandidateStore,
+                 original_graph: LayeredGraph,
+                 strict_mode: bool = True,
+                 seed: Optional[int] = None):
+
+        if not isinstance(candidate_info, CandidateStore):
+            raise TypeError("LocalSearchImprover requer uma CandidateStore")
+
+        self.store = candidate_info
+        self.oracle = ConflictOracle(original_graph, candidate_info, strict_mode)
+        self.tracker = GapTracker(candidatos_por_parte, candidate_info, original_graph)
+        self.rng = random.Random(seed)
+
+        # Índice (prof, sala, slot) -> candidato, por parte da store. Na
+        # LazyCandidateStore o candidato é calculado por find() e os
+        # domínios vêm direto dos blocos.
+        self.lookup: Dict[int, Dict[Tuple[int, int, int], int]] = {}
+        self.slots_da_parte: Dict[int, List[int]] = {}
+        self.salas_da_parte: Dict[int, List[int]] = {}
+        self._lazy = isinstance(candidate_info, LazyCandidateStore)
+        for cands in candidatos_por_parte.values():
+            if self._lazy:
+                primeiro = next(iter(cands), None)
+                if primeiro is not None:
+                    parte = self.store.parte[primeiro]
+                    _, salas, slots = self.store.domains(parte)
+                    self.lookup[parte] = {}
+                    self.slots_da_parte[parte] = sorted(slots)
+                    self.salas_da_parte[parte] = sorted(salas)
+                continue
+            for cid in cands:
+                parte = self.store.parte[cid]
+                chave = (self.store.prof[cid], self.store.sala[cid], self.store.slot[cid])
+                self.lookup.setdefault(parte, {})[chave] = cid
+        for parte, tabela in self.lookup.items():
+            if not self._lazy:
+                self.slots_da_parte[parte] = sorted({h for _, _, h in tabela})
+                self.salas_da_parte[parte] = sorted({s for _, s, _ in tabela})
+
+        # Partes da mesma disciplina (mesmo id de disciplina)
+        nodes = original_graph.nodes
+        self.irmas: Dict[int, List[int]] = {}
+        por_disc: Dict[str, List[int]] = {}
+        for parte in self.lookup:
+            disc_id = nodes[self.store.part_nodes[parte]].get('id')
+            por_disc.setdefault(disc_id, []).append(parte)
+        for partes in por_disc.values():
+            for parte in partes:
+                self.irmas[parte] = partes
+
+        self.atual: Dict[int, int] = {}
+        self.best_score: Optional[int] = None
+        self.moves_tried = 0
+        self.moves_accepted = 0
+
+    def _candidate(self, parte: int, prof: int, sala: int, slot: int) -> Optional[int]:
+        if self._lazy:
+            return self.store.find(parte, prof, sala, slot)
+        return self.lookup[parte].get((prof, sala, slot))
+
+    def _apply(self, trocas: List[Tuple[int, int]]) -> bool:
+        """
+        Substitui candidatos (antigo, novo). Se algum novo conflitar, desfaz
+        tudo e devolve False.
+        """
+        for antigo, _ in trocas:
+            self.oracle.pop(antigo)
+            self.tracker.pop(antigo)
+        aplicados = []
+        for _, novo in trocas:
+            if not self.oracle.compatible(novo):
+                for cid in aplicados:
+                    self.oracle.pop(cid)
+                    self.tracker.pop(cid)
+                for antigo, _ in trocas:
+                    self.oracle.push(antigo)
+                    self.tracker.push(antigo)
+                return False
+            self.oracle.push(novo)
+            self.tracker.push(novo)
+            aplicados.append(novo)
+        for antigo, novo in trocas:
+            self.atual[self.store.parte[novo]] = novo
+        return True
+
+    def _revert(self, trocas: List[Tuple[int, int]]) -> None:
+        self._apply([(novo, antigo) for antigo, novo in trocas])
+
+    def _random_move(self) -> List[Tuple[int, int]]:
+        store = self.store
+        partes = list(self.atual)
+        tipo = self.rng.random()
+        parte = self.rng.choice(partes)
+        cid = self.atual[parte]
+        p, s, h = store.prof[cid], store.sala[cid], store.slot[cid]
+
+        if tipo < 0.5:
+            # Troca de horário
+            novo = self._candidate(parte, p, s, self.rng.choice(self.slots_da_parte[parte]))
+            return [(cid, novo)] if novo is not None and novo != cid else []
+
+        if tipo < 0.75:
+            # Troca de sala da disciplina inteira
+            sala = self.rng.choice(self.salas_da_parte[parte])
+            if sala == s:
+                return []
+            trocas = []
+            for irma in self.irmas[parte]:
+                antigo = self.atual[irma]
+                novo = self._candidate(irma, store.prof[antigo], sala, store.slot[antigo])
+                if novo is None:
+                    return []
+                trocas.append((antigo, novo))
+            return trocas
+
+        # Troca de horários entre duas partes
+        outra = self.rng.choice(partes)
+        if outra == parte:
+            return []
+        cid2 = self.atual[outra]
+        h2 = store.slot[cid2]
+        if h2 == h:
+            return []
+        novo1 = self._candidate(parte, p, s, h2)
+        novo2 = self._candidate(outra, store.prof[cid2], store.sala[cid2], h)
+        if novo1 is None or novo2 is None:
+            return []
+        return [(cid, novo1), (cid2, novo2)]
+
+    def improve(self,
+                solution: List[int],
+                time_limit: float = 5.0,
+                temperatura_inicial: float = 2.0,
+                resfriamento: float = 0.9995,
+                verbose: bool = True,
+                max_moves: Optional[int] = None) -> List[int]:
+        """
+        Executa o simulated annealing a partir de uma solução viável até
+        esgotar time_limit segundos (ou max_moves movimentos) e devolve a
+        melhor solução vista. Com seed e max_moves o resultado não depende
+        da velocidade da máquina.
+        """
+        for cid in list(self.atual.values()):
+            self.oracle.pop(cid)
+            self.tracker.pop(cid)
+        self.atual = {}
+        for cid in solution:
+            self.oracle.push(cid)
+            self.tracker.push(cid)
+            self.atual[self.store.parte[cid]] = cid
+
+        self.best_score = self.tracker.total
+        melhor = list(solution)
+        inicial = self.best_score
+        temperatura = temperatura_inicial
+        self.moves_tried = 0
+        self.moves_accepted = 0
+
+        start = time.time()
+        while self.best_score > 0:
+            if max_moves is not None and self.moves_tried >= max_moves:
+                break
+            if self.moves_tried % 200 == 0 and time.time() - start > time_limit:
+                break
+            self.moves_tried += 1
+
+            trocas = self._random_move()
+            if not trocas:
+                continue
+
+            antes = self.tracker.total
+            if not self._apply(trocas):
+                continue
+            delta = self.tracker.total - antes
+
+            if delta <= 0 or self.rng.random() < math.exp(-delta / max(temperatura, 1e-9)):
+                self.moves_accepted += 1
+                if self.tracker.total < self.best_score:
+                    self.best_score = self.tracker.total
+                    melhor = list(self.atual.values())
+            else:
+                self._revert(trocas)
+            temperatura *= resfriamento
+
+        if verbose:
+            print(f"Busca local: score de gaps {inicial} -> {self.best_score} "
+                  f"({self.moves_accepted}/{self.moves_tried} movimentos aceitos "
+                  f"em {time.time() - start:.1f}s)")
+
+        return melhor
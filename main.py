@@ -1,14 +1,31 @@
+import os
 import sys
 from typing import List, Optional
 
 
-from config import SEMANA, HORARIOS, HORARIOS_NOTURNOS
+from config import (SEMANA, HORARIOS, HORARIOS_NOTURNOS, CONFLICT_MODE,
+                    BRANCH_AND_BOUND, SOLVER_WORKERS, SEARCH_ENGINE,
+                    LOCAL_SEARCH_TIME, LOCAL_SEARCH_SEED, SOLVER_BACKEND, ROOM_SYMMETRY,
+                    CANDIDATE_STREAMING, USE_CACHE, CACHE_DIR,
+                    CONFLICT_BUILD, PROFILE, PROFILE_MEMORY, PROFILE_REPORT,
+                    PROFILE_SOLVER, FEASIBILITY_CHECK, DECOMPOSE,
+                    EXPORT_WORKERS)
 from models import Disciplina, Professor, Sala, Slot
 from data_processor import DataProcessor
 from graph_builder import GraphBuilder
-from conflict_builder import ConflictBuilder
+from conflict_builder import ConflictBuilder, ConflictOracle, ConflictBitsets
 from solver import ConflictGraphSolver
+from portfolio import PortfolioSolver
+from decomposition import DecomposedSolver
+from local_search import LocalSearchImprover
+from cp_solver import CPSatSolver
+from room_symmetry import RoomSymmetry
+from pipeline_cache import PipelineCache
+from feasibility import FeasibilityChecker
+from profiling import RunProfiler
+from schedule import ScheduleTable
 from output_formatter import OutputFormatter
+from report_exporter import ReportExporter
 from ui import UserInterface
 
 
@@ -18,14 +35,19 @@ from salas import salas
 
 
 def main():
+    profiler = RunProfiler(ativo=PROFILE, memoria=PROFILE_MEMORY)
+    exportador = ReportExporter(workers=EXPORT_WORKERS)
     try:
         print("\n📚 Carregando dados...")
 
-        disciplinas = DataProcessor.build_disciplinas(materias)
-        salas_obj = DataProcessor.build_salas(salas)
-        slots = DataProcessor.build_slots()
+        with profiler.stage("build_disciplinas") as etapa:
+            disciplinas = DataProcessor.build_disciplinas(materias)
+            salas_obj = DataProcessor.build_salas(salas)
+            slots = DataProcessor.build_slots()
 
-        professores_obj = DataProcessor.build_professores(professores, disciplinas)
+            professores_obj = DataProcessor.build_professores(professores, disciplinas)
+            etapa['disciplinas'] = len(disciplinas)
+            etapa['professores'] = len(professores_obj)
 
         UserInterface.print_summary(
             len(disciplinas),
@@ -56,109 +78,327 @@ def main():
             level="success"
         )
 
-        print("\n📖 Dividindo disciplinas em partes...")
-        disciplinas_partes = DataProcessor.split_disciplinas_em_partes(
-            disciplinas_filtradas
-        )
+        cache = PipelineCache(CACHE_DIR) if USE_CACHE else None
+        chave_cache = None
+        graph_builder = None
+        if cache is not None:
+            chave_cache = PipelineCache.key(
+                semestres, periodos, cursos,
+                strict_mode=True, streaming=CANDIDATE_STREAMING
+            )
+            with profiler.stage("cache_load") as etapa:
+                graph_builder = cache.load(chave_cache)
+                etapa['hit'] = graph_builder is not None
 
-        UserInterface.print_info(
-            f"{len(disciplinas_partes)} parte(s) de disciplinas para alocar",
-            level="success"
-        )
+        if graph_builder is not None:
+            graph = graph_builder.get_graph()
+            UserInterface.print_info(
+                f"Grafo e candidatos carregados do cache ({chave_cache[:8]})",
+                level="success"
+            )
+        else:
+            print("\n📖 Dividindo disciplinas em partes...")
+            with profiler.stage("split_disciplinas") as etapa:
+                disciplinas_partes = DataProcessor.split_disciplinas_em_partes(
+                    disciplinas_filtradas
+                )
+                etapa['partes'] = len(disciplinas_partes)
+
+            UserInterface.print_info(
+                f"{len(disciplinas_partes)} parte(s) de disciplinas para alocar",
+                level="success"
+            )
 
-        print("\n🌐 Construindo grafo multilayer...")
-        graph_builder = GraphBuilder()
-        graph_builder.add_nodes(disciplinas_partes, professores_obj, salas_obj, slots)
-        graph_builder.add_edges(disciplinas_partes, professores_obj, salas_obj, slots)
+            print("\n🌐 Construindo grafo multilayer...")
+            graph_builder = GraphBuilder(streaming=CANDIDATE_STREAMING)
+            with profiler.stage("add_nodes") as etapa:
+                graph_builder.add_nodes(disciplinas_partes, professores_obj, salas_obj, slots)
+                etapa['nos'] = graph_builder.get_graph().number_of_nodes()
+            with profiler.stage("add_edges") as etapa:
+                graph_builder.add_edges(disciplinas_partes, professores_obj, salas_obj, slots)
+                etapa['arestas'] = graph_builder.get_graph().number_of_edges()
+
+            graph = graph_builder.get_graph()
+
+            print("\n🎯 Gerando candidatos...")
+            try:
+                with profiler.stage("generate_candidates") as etapa:
+                    graph_builder.generate_candidates(disciplinas_partes, strict_mode=True)
+                    etapa['candidatos'] = len(graph_builder.candidate_info)
+                    etapa['podados'] = graph_builder.podados
+            except ValueError as e:
+                UserInterface.print_info(str(e), level="error")
+                sys.exit(1)
+
+            if cache is not None:
+                with profiler.stage("cache_save"):
+                    cache.save(chave_cache, graph_builder)
 
-        graph = graph_builder.get_graph()
         UserInterface.print_info(
             f"Grafo com {graph.number_of_nodes()} nós e {graph.number_of_edges()} arestas",
             level="success"
         )
-        OutputFormatter.generate_graph_pdf(graph, "graph_visualization.pdf")
-
-        print("\n🎯 Gerando candidatos...")
-        try:
-            graph_builder.generate_candidates(disciplinas_partes)
-        except ValueError as e:
-            UserInterface.print_info(str(e), level="error")
-            sys.exit(1)
+        # Renderizado em outro processo enquanto a busca roda
+        exportador.submit(graph, ['grafo'])
 
         total_candidatos = sum(len(c) for c in graph_builder.candidatos_por_parte.values())
         UserInterface.print_info(
-            f"{total_candidatos} candidatos gerados",
+            f"{total_candidatos} candidatos gerados "
+            f"({graph_builder.podados} descartados pela poda de domínios)",
             level="success"
         )
 
-        print("\n⚔️  Construindo grafo de conflitos...")
-        conflict_builder = ConflictBuilder(graph, graph_builder.candidate_info)
-        conflict_graph = conflict_builder.build(strict_mode=True)
-
-        UserInterface.print_info(
-            f"Grafo de conflitos com {conflict_graph.number_of_nodes()} nós "
-            f"e {conflict_graph.number_of_edges()} arestas (conflitos)",
-            level="success"
-        )
-
-        print("\n🔬 Resolvendo com backtracking + MRV (Otimizado)...")
-        solver = ConflictGraphSolver(
-            graph_builder.candidatos_por_parte,
-            graph_builder.candidate_info,
-            conflict_graph,
-            graph_builder.get_graph()
-        )
-
-        found = solver.solve(verbose=True, time_limit=30)
+        if FEASIBILITY_CHECK:
+            with profiler.stage("feasibility_check") as etapa:
+                relatorio = FeasibilityChecker(
+                    graph_builder.candidatos_por_parte,
+                    graph_builder.candidate_info,
+                    graph,
+                    strict_mode=True
+                ).check()
+                etapa['violacoes'] = len(relatorio.violacoes)
+            if not relatorio.viavel:
+                UserInterface.print_info(
+                    f"Instância inviável ({len(relatorio.violacoes)} problema(s) "
+                    f"encontrados em {relatorio.tempo * 1000:.0f} ms):",
+                    level="error"
+                )
+                for linha in relatorio.summary():
+                    print(f"   {linha}")
+                sys.exit(1)
+
+        if SOLVER_BACKEND == "cpsat":
+            print("\n🔬 Resolvendo com CP-SAT (OR-Tools)...")
+            solver = CPSatSolver(
+                graph_builder.candidatos_por_parte,
+                graph_builder.candidate_info,
+                graph_builder.get_graph(),
+                strict_mode=True
+            )
+        elif DECOMPOSE:
+            print("\n🔬 Resolvendo grupos independentes de partes em paralelo...")
+            solver = DecomposedSolver(
+                graph_builder.candidatos_por_parte,
+                graph_builder.candidate_info,
+                graph_builder.get_graph(),
+                strict_mode=True,
+                workers=SOLVER_WORKERS,
+                room_symmetry=ROOM_SYMMETRY
+            )
+            UserInterface.print_info(
+                f"{len(solver.clusters)} grupo(s) independente(s)",
+                level="success"
+            )
+        elif SOLVER_WORKERS > 1:
+            # Cada processo monta o seu próprio oráculo/bitsets
+            print(f"\n🔬 Resolvendo com portfólio de {SOLVER_WORKERS} processos...")
+            try:
+                solver = PortfolioSolver(
+                    graph_builder.candidatos_por_parte,
+                    graph_builder.candidate_info,
+                    graph_builder.get_graph(),
+                    modo=CONFLICT_MODE,
+                    strict_mode=True,
+                    workers=SOLVER_WORKERS,
+                    room_symmetry=ROOM_SYMMETRY,
+                    branch_and_bound=BRANCH_AND_BOUND,
+                    engine=SEARCH_ENGINE
+                )
+            except ValueError as e:
+                UserInterface.print_info(str(e), level="error")
+                sys.exit(1)
+        else:
+            conflict_graph = None
+            conflict_oracle = None
+            conflict_bitsets = None
+            room_symmetry = None
+            if CONFLICT_MODE == "grafo":
+                if cache is not None:
+                    conflict_graph = cache.load_conflicts(chave_cache)
+                if conflict_graph is None:
+                    print("\n⚔️  Construindo grafo de conflitos...")
+                    with profiler.stage("conflict_build") as etapa:
+                        conflict_builder = ConflictBuilder(graph, graph_builder.candidate_info)
+                        conflict_graph = conflict_builder.build(
+                            strict_mode=True, metodo=CONFLICT_BUILD
+                        )
+                        etapa['arestas'] = conflict_graph.number_of_edges()
+                    if cache is not None:
+                        cache.save_conflicts(chave_cache, conflict_graph)
+
+                UserInterface.print_info(
+                    f"Grafo de conflitos com {conflict_graph.number_of_nodes()} nós "
+                    f"e {conflict_graph.number_of_edges()} arestas (conflitos)",
+                    level="success"
+                )
+            elif CONFLICT_MODE == "mmap":
+                if cache is not None:
+                    conflict_graph = cache.load_mapped_conflicts(chave_cache)
+                    caminho = cache.mapped_conflicts_path(chave_cache)
+                else:
+                    caminho = os.path.join(CACHE_DIR, "conflitos.csr")
+                if conflict_graph is None:
+                    print("\n⚔️  Gravando grafo de conflitos em disco (CSR)...")
+                    with profiler.stage("conflict_build") as etapa:
+                        conflict_builder = ConflictBuilder(graph, graph_builder.candidate_info)
+                        conflict_graph = conflict_builder.build_mapped(
+                            caminho, strict_mode=True, metodo=CONFLICT_BUILD
+                        )
+                        etapa['arestas'] = conflict_graph.number_of_edges()
+
+                UserInterface.print_info(
+                    f"Grafo de conflitos mapeado com {conflict_graph.number_of_nodes()} nós "
+                    f"e {conflict_graph.number_of_edges()} arestas ({caminho})",
+                    level="success"
+                )
+            elif CONFLICT_MODE == "bitset":
+                print("\n⚔️  Montando bitsets de conflitos...")
+                with profiler.stage("conflict_build"):
+                    conflict_bitsets = ConflictBitsets(
+                        graph, graph_builder.candidate_info, strict_mode=True
+                    )
+                UserInterface.print_info(
+                    f"{len(conflict_bitsets.masks)} máscaras de conflito montadas",
+                    level="success"
+                )
+            else:
+                print("\n⚔️  Preparando oráculo de conflitos...")
+                with profiler.stage("conflict_build"):
+                    if ROOM_SYMMETRY:
+                        room_symmetry = RoomSymmetry(
+                            graph,
+                            graph_builder.candidate_info,
+                            graph_builder.candidatos_por_parte,
+                            strict_mode=True
+                        )
+                    conflict_oracle = ConflictOracle(
+                        graph, graph_builder.candidate_info, strict_mode=True,
+                        room_symmetry=room_symmetry
+                    )
+                if room_symmetry is not None:
+                    UserInterface.print_info(
+                        f"{len(room_symmetry.salas_da_classe)} classe(s) de salas equivalentes",
+                        level="success"
+                    )
+                UserInterface.print_info(
+                    "Conflitos verificados sob demanda (sem grafo materializado)",
+                    level="success"
+                )
+
+            print("\n🔬 Resolvendo com backtracking + MRV (Otimizado)...")
+            solver = ConflictGraphSolver(
+                graph_builder.candidatos_por_parte,
+                graph_builder.candidate_info,
+                conflict_graph,
+                graph_builder.get_graph(),
+                conflict_oracle=conflict_oracle,
+                conflict_bitsets=conflict_bitsets,
+                branch_and_bound=BRANCH_AND_BOUND,
+                engine=SEARCH_ENGINE,
+                room_symmetry=room_symmetry
+            )
 
+        # Uma única busca: com branch-and-bound, repeti-la refaria toda a
+        # otimização do zero
         print("\n🚦 Iniciando processo de busca...")
-        found = solver.solve(verbose=True)
+        with profiler.stage("solve") as etapa, profiler.cprofile(PROFILE_SOLVER):
+            found = solver.solve(verbose=True, time_limit=30)
+            etapa['nos_explorados'] = getattr(solver, 'nodes_explored', 0)
+            etapa['score'] = getattr(solver, 'best_score', None)
+            etapa['coloracoes_abandonadas'] = getattr(solver, 'coloring_aborted', 0)
         print("\n✅ Processo de busca concluído.")
 
         if not found:
-            UserInterface.print_info(
-                "Não foi possível encontrar uma alocação viável "
-                "que satisfaça todas as restrições rígidas.",
-                level="error"
-            )
+            if getattr(solver, 'timed_out', False):
+                mensagem = ("Tempo limite atingido sem encontrar uma alocação "
+                            "que satisfaça todas as restrições rígidas.")
+            elif getattr(solver, 'coloring_aborted', 0):
+                mensagem = ("Nenhuma alocação encontrada, mas a coloração de salas "
+                            "estourou o limite de passos: a inviabilidade não foi provada.")
+            else:
+                mensagem = ("Não foi possível encontrar uma alocação viável "
+                            "que satisfaça todas as restrições rígidas.")
+            UserInterface.print_info(mensagem, level="error")
             sys.exit(1)
 
+        if LOCAL_SEARCH_TIME > 0:
+            print("\n🔧 Melhorando a solução com busca local...")
+            with profiler.stage("local_search"):
+                improver = LocalSearchImprover(
+                    graph_builder.candidatos_por_parte,
+                    graph_builder.candidate_info,
+                    graph,
+                    strict_mode=True,
+                    seed=LOCAL_SEARCH_SEED
+                )
+                nova = improver.improve(solver.best_solution, time_limit=LOCAL_SEARCH_TIME)
+                # Só troca a solução se o score de gaps do solver melhorou
+                pontuar = getattr(solver, 'calculate_gap_score', None)
+                if pontuar is not None:
+                    score = pontuar(nova)
+                    if score < pontuar(solver.best_solution):
+                        solver.best_solution = nova
+                        solver.best_score = score
+                elif nova != solver.best_solution:
+                    solver.best_solution = nova
+                    solver.best_score = improver.best_score
+
         print("\n📋 Decodificando solução...")
         resultado = solver.get_solution()
-        print("\n📊 Gerando imagem do grafo da solução...")
-        OutputFormatter.generate_solution_graph_image(resultado, "solution_graph.png")
-        print("\n🖨️  Formatando resultados para saída...")
-
         if not resultado:
             UserInterface.print_info("Solução vazia", level="error")
             sys.exit(1)
 
+        with profiler.stage("decode_solution") as etapa:
+            tabela = ScheduleTable.from_solution(resultado, graph)
+            etapa['alocacoes'] = len(tabela)
+
         UserInterface.print_info(
-            f"Solução encontrada: {len(resultado)} alocações",
+            f"Solução encontrada: {len(tabela)} alocações",
             level="success"
         )
         print("\n📊 Exibindo resultados...")
-        OutputFormatter.print_terminal(resultado, graph)
-        print("\n📦 Gerando arquivo PDF com a solução...")
-
-        OutputFormatter.generate_pdf(resultado, graph)
+        with profiler.stage("export_terminal"):
+            OutputFormatter.print_terminal(tabela)
+
+        print("\n📦 Gerando arquivos de saída...")
+        with profiler.stage("export_files") as etapa:
+            exportador.submit(tabela, ['solucao', 'grade', 'carga'])
+            relatorio = exportador.wait()
+            for nome, registro in relatorio.items():
+                etapa[f"{nome}_s"] = registro['tempo_s']
+        falhas = 0
+        for nome, registro in relatorio.items():
+            if 'erro' in registro:
+                falhas += 1
+                UserInterface.print_info(
+                    f"{registro['arquivo']}: {registro['erro']}", level="error"
+                )
+            else:
+                print(f"   ✓ {registro['arquivo']:<32} {registro['tempo_s']:>7.2f}s")
+        if falhas:
+            sys.exit(1)
         UserInterface.print_info(
             "✨ Agendamento concluído com sucesso!",
             level="success"
         )
-        print("\n✨ Agendamento concluído com sucesso!")
 
-        OutputFormatter.generate_teacher_workload_pdf(resultado, graph)
-        UserInterface.print_info(
-            "✨ PDF de Carga Horária dos Professores gerado com sucesso!",
-            level="success"
-        )
+        if PROFILE:
+            print("\n⏱️  Tempo por etapa:")
+            for linha in profiler.summary():
+                print(f"   {linha}")
 
     except Exception as e:
         UserInterface.print_info(f"Erro inesperado: {str(e)}", level="error")
         import traceback
         traceback.print_exc()
         sys.exit(1)
+    finally:
+        exportador.close()
+        # Também nas saídas por erro, com as etapas que chegaram a rodar
+        if PROFILE:
+            profiler.save(PROFILE_REPORT)
+            print(f"Relatório de execução salvo em {PROFILE_REPORT}")
 
 
 if __name__ == "__main__":
@@ -43,6 +43,7 @@ class Professor:
 class Sala:
     id: str
     nome: str
+    classe: str = ""
 
 
 @dataclass
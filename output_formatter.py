@@ -1,5 +1,9 @@
-from typing import List, Dict, Tuple
+from collections import Counter
+from typing import Dict, Iterable, List, Tuple
 import networkx as nx
+from layered_graph import LayeredGraph
+from schedule import ScheduleTable
+from config import GRAPH_SUMMARY_NODES
 import matplotlib.pyplot as plt
 import matplotlib.pyplot as plt
 import random
@@ -17,46 +21,87 @@ DIAS_ORDENADOS = ["Segunda", "Terça", "Quarta", "Quinta", "Sexta"]
 
 class OutputFormatter:
 
+    # Cor de cada coluna (disciplina, professor, sala, horário)
+    CORES_CAMADAS = ("lightblue", "lightgreen", "orange", "plum")
 
     @staticmethod
-    def print_terminal(resultado: List[Tuple], graph: nx.MultiGraph) -> None:
+    def _layered_layout(camadas: List[List[str]]) -> Dict[str, Tuple[float, float]]:
+        """
+        Uma coluna por camada, nós espaçados igualmente de cima para baixo
+        na ordem dada. Determinístico e linear no número de nós (em vez do
+        spring_layout, que itera sobre todos os nós e arestas).
+        """
+        pos = {}
+        for x, nos in enumerate(camadas):
+            for k, no in enumerate(nos):
+                pos[no] = (float(x), 1.0 - (k + 0.5) / len(nos))
+        return pos
 
-        result_by_materia: Dict[str, List[Dict]] = {}
+    @staticmethod
+    def _aggregate(camadas: List[List[str]],
+                   arestas: Iterable[Tuple[str, str]],
+                   grupo: Dict[str, str]) -> Tuple[List[List[str]], Counter, Counter]:
+        """
+        Junta os nós mapeados em grupo num nó só (os demais ficam como
+        estão) e conta quantos nós e arestas cada nó/aresta resultante
+        representa. Uma passada pelos nós e uma pelas arestas.
+        """
+        novas = [list(dict.fromkeys(grupo.get(n, n) for n in nos)) for nos in camadas]
+        tamanhos = Counter(grupo.get(n, n) for nos in camadas for n in nos)
+        contagem = Counter((grupo.get(u, u), grupo.get(v, v)) for u, v in arestas)
+        return novas, contagem, tamanhos
 
-        for d_node, p_node, s_node, h_node in resultado:
-            d_info = graph.nodes[d_node]
-            p_info = graph.nodes[p_node]
-            s_info = graph.nodes[s_node]
-            h_info = graph.nodes[h_node]
+    @staticmethod
+    def _draw_layered(camadas: List[List[str]],
+                      contagem: Counter,
+                      tamanhos: Counter,
+                      figsize: Tuple[float, float],
+                      font_size: int = 7) -> None:
+        """
+        Desenha, na figura atual, as camadas em colunas. Nós agregados
+        mostram quantos nós representam e a espessura da aresta acompanha
+        quantas arestas ela agrupa.
+        """
+        pos = OutputFormatter._layered_layout(camadas)
+        G = nx.Graph()
+        G.add_nodes_from(pos)
+        arestas = list(contagem)
+        G.add_edges_from(arestas)
+        maior = max(contagem.values(), default=1)
+        larguras = [0.5 + 2.5 * (contagem[e] - 1) / max(1, maior - 1) for e in arestas]
+
+        # Nós menores quando alguma coluna é longa, para não se sobreporem
+        node_size = max(30, min(300, 12000 // max(1, max(map(len, camadas)))))
+
+        plt.figure(figsize=figsize)
+        nx.draw_networkx_edges(G, pos, edgelist=arestas, width=larguras, alpha=0.3)
+        for cor, nos in zip(OutputFormatter.CORES_CAMADAS, camadas):
+            nx.draw_networkx_nodes(G, pos, nodelist=nos, node_size=node_size, node_color=cor)
+        rotulos = {n: f"{n} ({tamanhos[n]})" if tamanhos[n] > 1 else n for n in pos}
+        nx.draw_networkx_labels(G, pos, labels=rotulos, font_size=font_size)
+        plt.axis("off")
 
-            chave = f"{d_info['nome']} ({d_info['sigla_real']})"
-            entry = {
-                "dia": h_info["dia"],
-                "hora": h_info["faixa"],
-                "prof": p_info["nome"],
-                "sala": s_info["nome"],
-                "parte": d_info["parte"]
-            }
 
-            result_by_materia.setdefault(chave, []).append(entry)
+    @staticmethod
+    def print_terminal(tabela: ScheduleTable) -> None:
 
         print("\n" + "=" * 60)
         print(" GRADE HORÁRIA GERADA")
         print("=" * 60)
 
-        for mat_nome in sorted(result_by_materia.keys()):
-            aulas = result_by_materia[mat_nome]
+        materias = {f"{nome} ({sigla})": aulas
+                    for (nome, sigla), aulas in tabela.por_disciplina.items()}
+        for mat_nome in sorted(materias):
             print(f"\n>> {mat_nome}")
-            for aula in sorted(aulas, key=lambda x: x["parte"]):
-                print(f" Parte {aula['parte']}: {aula['dia']} - {aula['hora']}")
-                print(f" Prof: {aula['prof']} | Sala: {aula['sala']}")
+            for aula in sorted(materias[mat_nome], key=lambda a: a.parte):
+                print(f" Parte {aula.parte}: {aula.dia} - {aula.faixa}")
+                print(f" Prof: {aula.prof_nome} | Sala: {aula.sala_nome}")
 
         print("\n" + "=" * 60 + "\n")
 
     @staticmethod
     def generate_pdf(
-        resultado: List[Tuple],
-        graph: nx.MultiGraph,
+        tabela: ScheduleTable,
         filename: str = "grade_completa.pdf"
     ) -> None:
 
@@ -77,26 +122,16 @@ class OutputFormatter:
 
         timetable: Dict[str, Dict[str, List[str]]] = {}
 
-        for d_node, p_node, s_node, h_node in resultado:
-            d = graph.nodes[d_node]
-            p = graph.nodes[p_node]
-            s = graph.nodes[s_node]
-            h = graph.nodes[h_node]
-
-            hora = h["faixa"]
-            dia = h["dia"]
-
+        for (dia, hora), aulas in tabela.por_slot.items():
             timetable.setdefault(hora, {d: [] for d in DIAS_ORDENADOS})
-
-            texto = (
-                f"<b>{d['nome']}</b> ({d['sigla_real']})<br/>"
-                f"Parte {d['parte']}<br/>"
-                f"{p['nome']}<br/>"
-                f"<font color='blue'>{s['nome']}</font>"
+            timetable[hora].setdefault(dia, []).extend(
+                f"<b>{a.nome}</b> ({a.sigla})<br/>"
+                f"Parte {a.parte}<br/>"
+                f"{a.prof_nome}<br/>"
+                f"<font color='blue'>{a.sala_nome}</font>"
+                for a in aulas
             )
 
-            timetable[hora][dia].append(texto)
-
         horarios_ordenados = sorted(timetable.keys())
 
 
@@ -132,21 +167,33 @@ class OutputFormatter:
         print(f"✓ PDF gerado com sucesso: {filename}")
 
     @staticmethod
-    def generate_graph_pdf(graph: nx.MultiGraph, filename="graph_visualization.pdf"):
+    def generate_graph_pdf(graph: LayeredGraph, filename="graph_visualization.pdf"):
 
         print("\nGerando imagem e PDF do grafo...")
 
 
         img_path = "graph_temp_image.png"
 
-        plt.figure(figsize=(20, 12))
-        pos = nx.spring_layout(graph, k=0.3, iterations=50)
-
-        nx.draw_networkx_nodes(graph, pos, node_size=500, node_color="lightblue")
-        nx.draw_networkx_edges(graph, pos, width=1)
-        nx.draw_networkx_labels(graph, pos, font_size=7)
-
-        plt.axis("off")
+        if isinstance(graph, LayeredGraph):
+            camadas = [graph.layer_nodes(c) for c in LayeredGraph.CAMADAS]
+        else:
+            camadas = [[n for n, d in graph.nodes(data=True) if d.get('layer') == c]
+                       for c in LayeredGraph.CAMADAS]
+        arestas = graph.edges()
+
+        # Grafos grandes: partes agrupadas por disciplina, salas por classe
+        # e horários por dia
+        grupo: Dict[str, str] = {}
+        if graph.number_of_nodes() > GRAPH_SUMMARY_NODES:
+            for no in camadas[0]:
+                grupo[no] = graph.nodes[no]['id']
+            for no in camadas[2]:
+                grupo[no] = f"Salas: {graph.nodes[no].get('classe') or graph.nodes[no]['nome']}"
+            for no in camadas[3]:
+                grupo[no] = graph.nodes[no]['dia']
+
+        camadas, contagem, tamanhos = OutputFormatter._aggregate(camadas, arestas, grupo)
+        OutputFormatter._draw_layered(camadas, contagem, tamanhos, figsize=(20, 12))
         plt.savefig(img_path, dpi=200, bbox_inches="tight")
         plt.close()
 
@@ -183,8 +230,7 @@ class OutputFormatter:
 
     @staticmethod
     def generate_teacher_workload_pdf(
-        resultado: List[Tuple],
-        graph: nx.MultiGraph,
+        tabela: ScheduleTable,
         filename: str = "carga_horaria_professores.pdf"
     ) -> None:
         print(f"\nGerando PDF de Carga Horária: {filename}...")
@@ -192,22 +238,13 @@ class OutputFormatter:
         workload = {}
         dias_validos = ["Segunda", "Terça", "Quarta", "Quinta", "Sexta"]
 
-        for d_node, p_node, s_node, h_node in resultado:
-            p_info = graph.nodes[p_node]
-            h_info = graph.nodes[h_node]
-            d_info = graph.nodes[d_node]
-
-            prof_nome = p_info['nome']
-            dia = h_info['dia']
-            carga = d_info.get('carga', 2)
-
-            if prof_nome not in workload:
-                workload[prof_nome] = {d: 0 for d in dias_validos}
-                workload[prof_nome]['Total'] = 0
-
-            if dia in dias_validos:
-                workload[prof_nome][dia] += carga
-                workload[prof_nome]['Total'] += carga
+        for prof_nome, aulas in tabela.por_professor.items():
+            workload[prof_nome] = {d: 0 for d in dias_validos}
+            workload[prof_nome]['Total'] = 0
+            for aula in aulas:
+                if aula.dia in dias_validos:
+                    workload[prof_nome][aula.dia] += aula.carga
+                    workload[prof_nome]['Total'] += aula.carga
 
 
         professores_ordenados = sorted(workload.keys())
@@ -256,20 +293,33 @@ class OutputFormatter:
 
 
 
-    def generate_solution_graph_image(solution: List[Tuple], filename: str) -> None:
-        plt.figure(figsize=(12, 8))
-        G = nx.Graph()
-        for d_node, p_node, s_node, h_node in solution:
-            G.add_node(d_node)
-            G.add_node(p_node)
-            G.add_node(s_node)
-            G.add_node(h_node)
-            G.add_edge(d_node, p_node)
-            G.add_edge(d_node, s_node)
-            G.add_edge(d_node, h_node)
-        pos = nx.spring_layout(G, k=0.15, iterations=20)
-        nx.draw(G, pos, with_labels=True, node_size=300, font_size=6)
-        plt.savefig(filename, dpi=200)
+    @staticmethod
+    def generate_solution_graph_image(tabela: ScheduleTable, filename: str) -> None:
+        camadas: List[Dict[str, Tuple]] = [{}, {}, {}, {}]
+        arestas = []
+        for aula in tabela:
+            d_node, p_node, s_node, h_node = aula.nos()
+            camadas[0][d_node] = (aula.nome, aula.parte)
+            camadas[1][p_node] = (aula.prof_nome,)
+            camadas[2][s_node] = (aula.sala_nome,)
+            camadas[3][h_node] = (DIAS_ORDENADOS.index(aula.dia)
+                                  if aula.dia in DIAS_ORDENADOS else len(DIAS_ORDENADOS),
+                                  aula.hora_id)
+            arestas += [(d_node, p_node), (d_node, s_node), (d_node, h_node)]
+        ordem = [sorted(c, key=c.__getitem__) for c in camadas]
+
+        # Soluções grandes: partes agrupadas por disciplina, salas por classe
+        # e horários por dia
+        grupo: Dict[str, str] = {}
+        if sum(len(c) for c in ordem) > GRAPH_SUMMARY_NODES:
+            for aula in tabela:
+                d_node, _, s_node, h_node = aula.nos()
+                grupo[d_node] = aula.disc_id
+                grupo[s_node] = f"Salas: {aula.sala_classe}"
+                grupo[h_node] = aula.dia
+
+        ordem, contagem, tamanhos = OutputFormatter._aggregate(ordem, arestas, grupo)
+        OutputFormatter._draw_layered(ordem, contagem, tamanhos, figsize=(12, 8), font_size=6)
+        plt.savefig(filename, dpi=200, bbox_inches="tight")
         plt.close()
         print(f"✓ Imagem do grafo da solução salva como: {filename}")
-
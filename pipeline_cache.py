@@ -0,0 +1,205 @@
+import hashlib
+import os
+import pickle
+import shutil
+import tempfile
+from array import array
+from typing import Dict, List, Optional
+
+import networkx as nx
+
+import config
+from candidate_store import CandidateStore, LazyCandidateStore
+from conflict_store import MappedConflictGraph
+from graph_builder import GraphBuilder
+
+
+# Arquivos cujo conteúdo entra na chave: dados de entrada e o código que
+# monta grafo, candidatos e conflitos
+ARQUIVOS_DA_CHAVE = [
+    "materias.py", "professores.py", "salas.py",
+    "models.py", "data_processor.py", "graph_builder.py", "layered_graph.py",
+    "candidate_store.py", "conflict_builder.py", "conflict_store.py",
+]
+
+# Constantes do config.py que mudam o grafo, os candidatos ou os
+# conflitos; as opções do solver e da saída ficam fora da chave
+CONSTANTES_DA_CHAVE = [
+    "SEMANA", "HORARIOS", "HORARIOS_NOTURNOS", "SLOTS_VALIDOS", "CONFLICT_BUILD",
+]
+
+VERSAO = 3
+
+
+class PipelineCache:
+    """
+    Cache em disco dos artefatos do pipeline (grafo multilayer, candidatos
+    e grafo de conflitos), um diretório por chave. A chave é um hash do
+    conteúdo das entradas, das constantes de construção do config.py
+    (CONSTANTES_DA_CHAVE), dos filtros escolhidos e do strict_mode, então
+    qualquer alteração nelas gera uma chave nova; mudar só as opções do
+    solver reaproveita a entrada.
+
+    As colunas da CandidateStore e as arestas de conflito são gravadas
+    como arrays binárias de int32 (array.tofile), lidas de volta com
+    array.fromfile; o restante (grafo, tabelas de nomes, domínios por
+    parte) vai num pickle pequeno. Domínios contíguos são gravados como
+    intervalos e os demais (podados, por exemplo) como arrays de IDs. No modo "mmap" o CSR de conflitos
+    também fica na entrada e é reaberto direto com mmap.
+    """
+
+    def __init__(self, diretorio: str = ".cache"):
+        self.diretorio = diretorio
+
+    @staticmethod
+    def key(semestres: Optional[List], periodos: Optional[List], cursos: Optional[List],
+            strict_mode: bool = True, streaming: bool = False) -> str:
+        base = os.path.dirname(os.path.abspath(__file__))
+        h = hashlib.sha256()
+        h.update(f"v{VERSAO}".encode())
+        for nome in ARQUIVOS_DA_CHAVE:
+            h.update(nome.encode())
+            with open(os.path.join(base, nome), "rb") as f:
+                h.update(f.read())
+        for nome in CONSTANTES_DA_CHAVE:
+            h.update(f"{nome}={getattr(config, nome)!r}".encode())
+        h.update(repr((semestres, periodos, cursos, strict_mode, streaming)).encode())
+        return h.hexdigest()[:32]
+
+    def _path(self, chave: str, nome: str) -> str:
+        return os.path.join(self.diretorio, chave, nome)
+
+    def load(self, chave: str) -> Optional[GraphBuilder]:
+        """
+        GraphBuilder com grafo e candidatos já gerados, ou None se a chave
+        não está no cache (ou os arquivos estão incompletos).
+        """
+        try:
+            with open(self._path(chave, "meta.pkl"), "rb") as f:
+                meta = pickle.load(f)
+
+            builder = GraphBuilder(streaming=meta['streaming'])
+            builder.G = meta['graph']
+            builder.profs_aptos = meta['profs_aptos']
+            builder.podados = meta['podados']
+            if meta['streaming']:
+                store = meta['store']
+            else:
+                # Reinterna os nomes na mesma ordem: os índices coincidem
+                store = CandidateStore()
+                for node, sub_id in zip(meta['part_nodes'], meta['part_sub_ids']):
+                    store.part_index(node, sub_id)
+                for node in meta['prof_nodes']:
+                    store.prof_index(node)
+                for node in meta['sala_nodes']:
+                    store.sala_index(node)
+                for node in meta['slot_nodes']:
+                    store.slot_index(node)
+                n = meta['n_candidatos']
+                with open(self._path(chave, "candidatos.bin"), "rb") as f:
+                    for coluna in ('parte', 'prof', 'sala', 'slot'):
+                        getattr(store, coluna).fromfile(f, n)
+            builder.candidate_info = store
+            builder.candidatos_por_parte = {
+                sub_id: cands if isinstance(cands, range) else list(cands)
+                for sub_id, cands in meta['dominios']
+            }
+            return builder
+        except (OSError, EOFError, KeyError, ValueError, pickle.UnpicklingError):
+            return None
+
+    def save(self, chave: str, builder: GraphBuilder) -> None:
+        store = builder.candidate_info
+        meta: Dict = {
+            'streaming': isinstance(store, LazyCandidateStore),
+            'graph': builder.G,
+            'profs_aptos': builder.profs_aptos,
+            'podados': builder.podados,
+            'dominios': [
+                (sub_id, cands if isinstance(cands, range) else array('i', cands))
+                for sub_id, cands in builder.candidatos_por_parte.items()
+            ],
+        }
+        if meta['streaming']:
+            meta['store'] = store
+        else:
+            for nome in ('part_nodes', 'part_sub_ids', 'prof_nodes', 'sala_nodes', 'slot_nodes'):
+                meta[nome] = getattr(store, nome)
+            meta['n_candidatos'] = len(store)
+
+        def escrever(tmp: str) -> None:
+            with open(os.path.join(tmp, "meta.pkl"), "wb") as f:
+                pickle.dump(meta, f, protocol=pickle.HIGHEST_PROTOCOL)
+            if not meta['streaming']:
+                with open(os.path.join(tmp, "candidatos.bin"), "wb") as f:
+                    for coluna in (store.parte, store.prof, store.sala, store.slot):
+                        coluna.tofile(f)
+
+        self._write_dir(chave, escrever)
+
+    def load_conflicts(self, chave: str) -> Optional[nx.Graph]:
+        """
+        Grafo de conflitos salvo para a chave, ou None.
+        """
+        try:
+            with open(self._path(chave, "conflitos.pkl"), "rb") as f:
+                n_nos, n_arestas = pickle.load(f)
+            u, v = array('i'), array('i')
+            with open(self._path(chave, "conflitos.bin"), "rb") as f:
+                u.fromfile(f, n_arestas)
+                v.fromfile(f, n_arestas)
+        except (OSError, EOFError, KeyError, ValueError, pickle.UnpicklingError):
+            return None
+        A = nx.Graph()
+        A.add_nodes_from(range(n_nos))
+        A.add_edges_from(zip(u, v))
+        return A
+
+    def save_conflicts(self, chave: str, conflict_graph: nx.Graph) -> None:
+        """
+        Acrescenta o grafo de conflitos (nós 0..N-1 da CandidateStore) a
+        uma chave já salva, como duas arrays de extremidades.
+        """
+        u, v = array('i'), array('i')
+        for a, b in conflict_graph.edges():
+            u.append(a)
+            v.append(b)
+        destino = os.path.join(self.diretorio, chave)
+        if not os.path.isdir(destino):
+            return
+        with open(self._path(chave, "conflitos.bin") + ".tmp", "wb") as f:
+            u.tofile(f)
+            v.tofile(f)
+        os.replace(self._path(chave, "conflitos.bin") + ".tmp", self._path(chave, "conflitos.bin"))
+        # O pickle é escrito por último: sem ele, o .bin é ignorado
+        with open(self._path(chave, "conflitos.pkl"), "wb") as f:
+            pickle.dump((conflict_graph.number_of_nodes(), len(u)), f)
+
+    def mapped_conflicts_path(self, chave: str) -> str:
+        """
+        Caminho do CSR de conflitos (modo "mmap") dentro da entrada.
+        """
+        return self._path(chave, "conflitos.csr")
+
+    def load_mapped_conflicts(self, chave: str) -> Optional[MappedConflictGraph]:
+        try:
+            return MappedConflictGraph(self.mapped_conflicts_path(chave))
+        except (OSError, ValueError):
+            return None
+
+    def _write_dir(self, chave: str, escrever) -> None:
+        """
+        Grava num diretório temporário e renomeia, para que uma execução
+        interrompida nunca deixe uma entrada pela metade.
+        """
+        os.makedirs(self.diretorio, exist_ok=True)
+        destino = os.path.join(self.diretorio, chave)
+        tmp = tempfile.mkdtemp(dir=self.diretorio, prefix=".tmp-")
+        try:
+            escrever(tmp)
+            if os.path.isdir(destino):
+                shutil.rmtree(destino)
+            os.replace(tmp, destino)
+        finally:
+            if os.path.isdir(tmp):
+                shutil.rmtree(tmp)
@@ -0,0 +1,180 @@
+import multiprocessing as mp
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+from conflict_builder import ConflictOracle, ConflictBitsets
+from layered_graph import LayeredGraph
+from solver import ConflictGraphSolver
+from room_symmetry import RoomSymmetry
+
+
+class SharedIncumbent:
+    """
+    Melhor score de gaps compartilhado entre processos (-1 = nenhum).
+    A leitura não trava; só a atualização usa o lock.
+    """
+
+    def __init__(self, value, lock):
+        self._value = value
+        self._lock = lock
+
+    def get(self) -> Optional[int]:
+        score = self._value.value
+        return None if score < 0 else score
+
+    def offer(self, score: int) -> None:
+        with self._lock:
+            atual = self._value.value
+            if atual < 0 or score < atual:
+                self._value.value = score
+
+
+_worker_state: Dict = {}
+
+
+def _init_worker(value, lock, candidatos_por_parte, candidate_info,
+                 original_graph, modo, strict_mode, room_symmetry,
+                 branch_and_bound, engine) -> None:
+    _worker_state.update(
+        incumbent=SharedIncumbent(value, lock),
+        candidatos_por_parte=candidatos_por_parte,
+        candidate_info=candidate_info,
+        original_graph=original_graph,
+        modo=modo,
+        strict_mode=strict_mode,
+        room_symmetry=room_symmetry,
+        branch_and_bound=branch_and_bound,
+        engine=engine
+    )
+
+
+def _run_worker(seed: Optional[int], time_limit: int) -> Tuple:
+    st = _worker_state
+    kwargs = {}
+    if st['modo'] == "bitset":
+        kwargs['conflict_bitsets'] = ConflictBitsets(
+            st['original_graph'], st['candidate_info'], st['strict_mode']
+        )
+    else:
+        simetria = None
+        if st['room_symmetry']:
+            simetria = RoomSymmetry(
+                st['original_graph'], st['candidate_info'],
+                st['candidatos_por_parte'], st['strict_mode']
+            )
+        kwargs['room_symmetry'] = simetria
+        kwargs['conflict_oracle'] = ConflictOracle(
+            st['original_graph'], st['candidate_info'], st['strict_mode'],
+            room_symmetry=simetria
+        )
+
+    solver = ConflictGraphSolver(
+        st['candidatos_por_parte'],
+        st['candidate_info'],
+        None,
+        st['original_graph'],
+        branch_and_bound=st['branch_and_bound'],
+        engine=st['engine'],
+        seed=seed,
+        incumbent=st['incumbent'],
+        **kwargs
+    )
+    solver.solve(verbose=False, time_limit=time_limit)
+    return (seed, solver.best_score, solver.best_solution, solver.nodes_explored,
+            solver.coloring_aborted)
+
+
+class PortfolioSolver:
+    """
+    Executa vários ConflictGraphSolver em paralelo (um por processo), cada
+    um com uma ordem de busca diferente. Os processos compartilham o melhor
+    score de gaps para podar contra ele (com branch_and_bound), e a melhor
+    solução global é devolvida. Mesmo contrato de solve()/get_solution()
+    do solver simples. Cada processo monta o próprio oráculo ou bitsets,
+    então só os modos em MODOS são aceitos.
+    """
+
+    MODOS = ("oraculo", "bitset")
+
+    def __init__(self,
+                 candidatos_por_parte: Dict[str, Sequence[int]],
+                 candidate_info: Mapping[int, Tuple],
+                 original_graph: LayeredGraph,
+                 modo: str = "oraculo",
+                 strict_mode: bool = True,
+                 workers: Optional[int] = None,
+                 room_symmetry: bool = False,
+                 branch_and_bound: bool = True,
+                 engine: str = "iterativo"):
+
+        if modo not in self.MODOS:
+            raise ValueError(
+                f"O portfólio não suporta o modo {modo!r} "
+                f"(use {' ou '.join(repr(m) for m in self.MODOS)})"
+            )
+        self.candidatos_por_parte = candidatos_por_parte
+        self.candidate_info = candidate_info
+        self.original_graph = original_graph
+        self.modo = modo
+        self.strict_mode = strict_mode
+        self.room_symmetry = room_symmetry
+        self.branch_and_bound = branch_and_bound
+        self.engine = engine
+        self.workers = workers or os.cpu_count() or 1
+
+        self.best_solution: Optional[List[int]] = None
+        self.best_score: Optional[int] = None
+        self.nodes_explored = 0
+        self.coloring_aborted = 0
+
+    def solve(self, verbose: bool = True, time_limit: int = 15) -> bool:
+        start = time.time()
+        self.best_solution = None
+        self.best_score = None
+        self.nodes_explored = 0
+        self.coloring_aborted = 0
+
+        if verbose:
+            print(f"Iniciando portfólio com {self.workers} processo(s) "
+                  f"e limite de {time_limit}s...")
+
+        value = mp.RawValue('i', -1)
+        lock = mp.Lock()
+        initargs = (value, lock, self.candidatos_por_parte, self.candidate_info,
+                    self.original_graph, self.modo, self.strict_mode,
+                    self.room_symmetry, self.branch_and_bound, self.engine)
+
+        # O processo 0 mantém a ordem determinística do solver simples
+        seeds = [None] + list(range(1, self.workers))
+        with ProcessPoolExecutor(max_workers=self.workers,
+                                 initializer=_init_worker,
+                                 initargs=initargs) as pool:
+            futures = [pool.submit(_run_worker, seed, time_limit) for seed in seeds]
+            for future in futures:
+                seed, score, solution, nodes, abandonadas = future.result()
+                self.nodes_explored += nodes
+                self.coloring_aborted += abandonadas
+                if verbose:
+                    print(f"> Processo seed={seed}: score={score}, nós={nodes}")
+                if solution is None:
+                    continue
+                if self.best_score is None or score < self.best_score:
+                    self.best_score = score
+                    self.best_solution = solution
+
+        if verbose:
+            elapsed = time.time() - start
+            print(f"\n{'='*50}")
+            print(f"Portfólio finalizado.")
+            print(f"Tempo: {elapsed:.2f}s | Nós explorados: {self.nodes_explored}")
+            print(f"Melhor score de gaps: {self.best_score}")
+            print(f"{'='*50}\n")
+
+        return self.best_solution is not None
+
+    def get_solution(self) -> Optional[List[Tuple]]:
+        if self.best_solution is None:
+            return None
+        return [self.candidate_info[cid] for cid in self.best_solution]
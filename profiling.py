@@ -0,0 +1,115 @@
+import cProfile
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+
+class RunProfiler:
+    """
+    Instrumentação das etapas do pipeline: tempo de parede, pico de
+    memória (tracemalloc) e contadores informados por cada etapa
+    (candidatos, arestas, nós explorados...). O resultado sai num
+    relatório JSON com uma entrada por etapa, na ordem de execução.
+
+    Desativado, stage() ainda entrega o dicionário de contadores mas não
+    mede nada, então main.py usa o mesmo código nos dois casos. O
+    tracemalloc deixa o Python bem mais lento; por isso a memória pode ser
+    desligada separadamente. As etapas não devem ser aninhadas: cada uma
+    zera o pico do tracemalloc.
+    """
+
+    # Contadores que também viram vazão (por segundo de etapa)
+    TAXAS = {
+        'nos_explorados': 'nos_por_segundo',
+        'candidatos': 'candidatos_por_segundo',
+        'arestas': 'arestas_por_segundo',
+    }
+
+    def __init__(self, ativo: bool = True, memoria: bool = True):
+        self.ativo = ativo
+        self.memoria = ativo and memoria
+        self.etapas: List[Dict] = []
+        self.inicio = time.time()
+        if self.memoria and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def stage(self, nome: str) -> Iterator[Dict]:
+        """
+        Mede o bloco. Os contadores colocados no dicionário entregue vão
+        para o relatório; os listados em TAXAS ganham também a vazão.
+        """
+        contadores: Dict = {}
+        if not self.ativo:
+            yield contadores
+            return
+
+        if self.memoria:
+            tracemalloc.reset_peak()
+            mem_inicio = tracemalloc.get_traced_memory()[0]
+        t0 = time.perf_counter()
+        try:
+            yield contadores
+        finally:
+            tempo = time.perf_counter() - t0
+            registro: Dict = {'etapa': nome, 'tempo_s': round(tempo, 6)}
+            if self.memoria:
+                atual, pico = tracemalloc.get_traced_memory()
+                registro['pico_memoria_mb'] = round((pico - mem_inicio) / 2**20, 3)
+                registro['memoria_retida_mb'] = round((atual - mem_inicio) / 2**20, 3)
+            registro.update(contadores)
+            if tempo > 0:
+                for chave, taxa in self.TAXAS.items():
+                    if isinstance(contadores.get(chave), int):
+                        registro[taxa] = round(contadores[chave] / tempo)
+            self.etapas.append(registro)
+
+    @contextmanager
+    def cprofile(self, caminho: Optional[str]) -> Iterator[None]:
+        """
+        Roda o bloco sob cProfile e grava as estatísticas em caminho
+        (legível com pstats ou snakeviz). Sem caminho, não faz nada.
+        """
+        if not caminho:
+            yield
+            return
+        perfil = cProfile.Profile()
+        perfil.enable()
+        try:
+            yield
+        finally:
+            perfil.disable()
+            perfil.dump_stats(caminho)
+
+    def report(self) -> Dict:
+        return {
+            'inicio': time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.inicio)),
+            'python': sys.version.split()[0],
+            'plataforma': platform.platform(),
+            'tempo_total_s': round(sum(e['tempo_s'] for e in self.etapas), 6),
+            'etapas': self.etapas,
+        }
+
+    def save(self, caminho: str) -> None:
+        diretorio = os.path.dirname(caminho)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+        with open(caminho, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, ensure_ascii=False, indent=2)
+
+    def summary(self) -> List[str]:
+        """
+        Uma linha por etapa, para imprimir no terminal.
+        """
+        linhas = []
+        for e in self.etapas:
+            linha = f"{e['etapa']:<28} {e['tempo_s']:>9.3f}s"
+            if 'pico_memoria_mb' in e:
+                linha += f" {e['pico_memoria_mb']:>9.1f} MB"
+            linhas.append(linha)
+        return linhas
@@ -0,0 +1,139 @@
+import os
+import pickle
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, Iterable, Optional, Tuple
+
+from config import PDF_FILENAME
+from output_formatter import OutputFormatter
+
+
+# Artefato -> (método do OutputFormatter, arquivo padrão). "grafo" recebe
+# o grafo multicamadas; os demais, a ScheduleTable
+ARTEFATOS: Dict[str, Tuple[str, str]] = {
+    'grafo': ('generate_graph_pdf', "graph_visualization.pdf"),
+    'solucao': ('generate_solution_graph_image', "solution_graph.png"),
+    'grade': ('generate_pdf', PDF_FILENAME),
+    'carga': ('generate_teacher_workload_pdf', "carga_horaria_professores.pdf"),
+}
+
+
+def _init_worker() -> None:
+    # Sem janela nos processos filhos: só salvamos arquivos. O backend do
+    # processo principal não é alterado
+    import matplotlib
+    matplotlib.use("Agg")
+
+
+def _render(nome: str, dados: bytes, filename: str) -> float:
+    """
+    Gera um artefato num processo de trabalho a partir da entrada
+    serializada e devolve o tempo gasto.
+    """
+    inicio = time.perf_counter()
+    entrada = pickle.loads(dados)
+    getattr(OutputFormatter, ARTEFATOS[nome][0])(entrada, filename)
+    return time.perf_counter() - inicio
+
+
+class ReportExporter:
+    """
+    Gera os arquivos de saída (PDFs e imagens) em processos separados, para
+    que o tempo total seja o da exportação mais lenta e não a soma de
+    todas. A entrada de cada artefato (grafo ou ScheduleTable) é
+    serializada uma vez só no processo principal e os bytes vão para os
+    processos de trabalho; assim o grafo pode ser enviado logo após a
+    construção e renderizado enquanto a busca roda.
+
+    wait() espera todos os artefatos enviados e devolve, por artefato, o
+    arquivo, o tempo de geração e o erro, se houve. Com workers <= 1 cada
+    artefato é gerado na hora, no próprio processo e sem serializar a
+    entrada, como antes.
+    """
+
+    def __init__(self, workers: int = 4):
+        self.workers = max(1, workers)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pendentes: Dict[str, Tuple[str, float, Future]] = {}
+        self._prontos: Dict[str, Dict] = {}
+
+    def submit(self, entrada, artefatos: Iterable[str],
+               arquivos: Optional[Dict[str, str]] = None) -> None:
+        """
+        Agenda os artefatos que usam a mesma entrada (serializada uma vez).
+        arquivos troca o nome padrão do arquivo de algum artefato.
+        """
+        artefatos = list(artefatos)
+        desconhecidos = [a for a in artefatos if a not in ARTEFATOS]
+        if desconhecidos:
+            raise ValueError(f"Artefato(s) desconhecido(s): {', '.join(desconhecidos)}")
+        dados: Optional[bytes] = None
+
+        for nome in artefatos:
+            filename = (arquivos or {}).get(nome, ARTEFATOS[nome][1])
+            if self.workers == 1:
+                # No próprio processo a entrada é usada direto, sem pickle
+                inicio = time.perf_counter()
+                try:
+                    getattr(OutputFormatter, ARTEFATOS[nome][0])(entrada, filename)
+                    erro = None
+                except Exception as e:
+                    erro = f"{type(e).__name__}: {e}"
+                self._prontos[nome] = self._registro(
+                    filename, time.perf_counter() - inicio, erro
+                )
+                continue
+            if dados is None:
+                dados = pickle.dumps(entrada, protocol=pickle.HIGHEST_PROTOCOL)
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=min(self.workers, len(ARTEFATOS), os.cpu_count() or 1),
+                    initializer=_init_worker
+                )
+            self._pendentes[nome] = (
+                filename, time.perf_counter(), self._pool.submit(_render, nome, dados, filename)
+            )
+
+    @staticmethod
+    def _registro(filename: str, tempo: float, erro: Optional[str]) -> Dict:
+        registro = {'arquivo': filename, 'tempo_s': round(tempo, 6)}
+        if erro is not None:
+            registro['erro'] = erro
+        return registro
+
+    def wait(self) -> Dict[str, Dict]:
+        """
+        Espera todos os artefatos enviados. tempo_s é o tempo de geração
+        no processo de trabalho; espera_s, do envio até o fim.
+        """
+        for nome, (filename, enviado, futuro) in self._pendentes.items():
+            try:
+                tempo = futuro.result()
+                erro = None
+            except Exception as e:
+                tempo = time.perf_counter() - enviado
+                erro = f"{type(e).__name__}: {e}"
+            registro = self._registro(filename, tempo, erro)
+            registro['espera_s'] = round(time.perf_counter() - enviado, 6)
+            self._prontos[nome] = registro
+        self._pendentes.clear()
+        return dict(self._prontos)
+
+    def export(self, tabela, graph=None,
+               artefatos: Optional[Iterable[str]] = None) -> Dict[str, Dict]:
+        """
+        Uma chamada só: gera os artefatos pedidos (todos por padrão; "grafo"
+        só se graph for dado) e espera por eles.
+        """
+        artefatos = list(artefatos) if artefatos is not None else list(ARTEFATOS)
+        if 'grafo' in artefatos:
+            if graph is None:
+                raise ValueError("O artefato 'grafo' requer o grafo")
+            self.submit(graph, ['grafo'])
+        self.submit(tabela, [a for a in artefatos if a != 'grafo'])
+        return self.wait()
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,173 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from candidate_store import CandidateStore, LazyCandidateStore
+from layered_graph import LayeredGraph
+
+
+# Passos máximos do backtracking da coloração em cada solução completa;
+# acima disso a solução é descartada (como se não houvesse salas) para
+# não prender a busca além do time_limit, e o descarte é contado em
+# RoomSymmetry.coloracoes_abandonadas
+_LIMITE_COLORACAO = 10000
+
+
+class RoomSymmetry:
+    """
+    Quebra de simetria para salas intercambiáveis.
+
+    Salas com o mesmo atributo "classe" formam uma classe de equivalência.
+    A busca enxerga só um representante por classe (a sala de menor índice)
+    e a regra 3 vira uma capacidade por (classe, horário); as salas
+    concretas são escolhidas no fim por assign():
+
+    - sem strict mode, cada horário recebe as salas livres de menor índice;
+    - com strict mode, cada disciplina precisa de uma única sala em todas
+      as suas partes, o que é uma coloração das disciplinas que dividem
+      horários, resolvida por backtracking limitado a _LIMITE_COLORACAO
+      passos (estourado o limite, a solução é descartada e contada em
+      coloracoes_abandonadas: a busca deixa de ser exaustiva).
+    """
+
+    def __init__(self,
+                 graph: LayeredGraph,
+                 candidate_info: CandidateStore,
+                 candidatos_por_parte: Dict[str, Sequence[int]],
+                 strict_mode: bool = True):
+
+        if not isinstance(candidate_info, CandidateStore):
+            raise TypeError("RoomSymmetry requer uma CandidateStore")
+
+        self.store = candidate_info
+        self.strict_mode = strict_mode
+        nodes = graph.nodes
+
+        self.classe_da_sala: Dict[int, int] = {}
+        self.salas_da_classe: List[List[int]] = []
+        indices: Dict[str, int] = {}
+        for sala, sala_node in enumerate(candidate_info.sala_nodes):
+            data = nodes[sala_node]
+            chave = data.get('classe') or data.get('nome')
+            if chave not in indices:
+                indices[chave] = len(self.salas_da_classe)
+                self.salas_da_classe.append([])
+            self.classe_da_sala[sala] = indices[chave]
+            self.salas_da_classe[indices[chave]].append(sala)
+        self.capacidade = [len(salas) for salas in self.salas_da_classe]
+        self.coloracoes_abandonadas = 0
+
+        self.disc_id = [nodes[d].get('id') for d in candidate_info.part_nodes]
+
+        # Só é seguro colapsar se cada parte aceita todas as salas de uma
+        # classe ou nenhuma delas
+        self.lookup: Dict[Tuple[int, int, int, int], int] = {}
+        store = candidate_info
+        lazy = isinstance(store, LazyCandidateStore)
+        for sub_id, cands in candidatos_por_parte.items():
+            if lazy:
+                # Domínios em produto cartesiano: basta olhar as salas da
+                # parte, e find() dispensa o índice por candidato
+                primeiro = next(iter(cands), None)
+                if primeiro is None:
+                    continue
+                salas = set(store.domains(store.parte[primeiro])[1])
+            else:
+                salas = set()
+                for cid in cands:
+                    chave = (store.parte[cid], store.prof[cid], store.sala[cid], store.slot[cid])
+                    self.lookup[chave] = cid
+                    salas.add(store.sala[cid])
+            for classe in {self.classe_da_sala[s] for s in salas}:
+                if not set(self.salas_da_classe[classe]) <= salas:
+                    raise ValueError(
+                        f"Parte {sub_id} não aceita todas as salas da classe; "
+                        "a quebra de simetria de salas não se aplica"
+                    )
+
+    def collapse(self, candidatos_por_parte: Dict[str, Sequence[int]]) -> Dict[str, List[int]]:
+        """
+        Mantém, em cada parte, apenas os candidatos cuja sala é o
+        representante (menor índice) da sua classe.
+        """
+        representantes = {salas[0] for salas in self.salas_da_classe}
+        sala = self.store.sala
+        return {
+            part: [cid for cid in cands if sala[cid] in representantes]
+            for part, cands in candidatos_por_parte.items()
+        }
+
+    def assign(self, chosen: List[int]) -> Optional[List[int]]:
+        """
+        Troca os representantes por salas concretas. Devolve None se não
+        existir atribuição (só acontece no strict mode).
+        """
+        store = self.store
+        sala_de: Dict[int, int] = {}
+
+        if not self.strict_mode:
+            usadas: Dict[Tuple[int, int], int] = {}
+            for cid in chosen:
+                classe = self.classe_da_sala[store.sala[cid]]
+                chave = (classe, store.slot[cid])
+                k = usadas.get(chave, 0)
+                usadas[chave] = k + 1
+                sala_de[cid] = self.salas_da_classe[classe][k]
+        else:
+            cor = self._color(chosen)
+            if cor is None:
+                return None
+            for cid in chosen:
+                classe = self.classe_da_sala[store.sala[cid]]
+                disc = self.disc_id[store.parte[cid]]
+                sala_de[cid] = self.salas_da_classe[classe][cor[disc]]
+
+        if isinstance(store, LazyCandidateStore):
+            buscar = lambda chave: store.find(*chave)
+        else:
+            buscar = self.lookup.__getitem__
+        return [
+            buscar((store.parte[cid], store.prof[cid], sala_de[cid], store.slot[cid]))
+            for cid in chosen
+        ]
+
+    def _color(self, chosen: List[int]) -> Optional[Dict[str, int]]:
+        store = self.store
+        classe_de: Dict[str, int] = {}
+        por_slot: Dict[int, List[str]] = {}
+        for cid in chosen:
+            disc = self.disc_id[store.parte[cid]]
+            classe_de[disc] = self.classe_da_sala[store.sala[cid]]
+            por_slot.setdefault(store.slot[cid], []).append(disc)
+
+        vizinhos: Dict[str, set] = {disc: set() for disc in classe_de}
+        for discs in por_slot.values():
+            for a in discs:
+                for b in discs:
+                    if a != b and classe_de[a] == classe_de[b]:
+                        vizinhos[a].add(b)
+
+        ordem = sorted(vizinhos, key=lambda d: len(vizinhos[d]), reverse=True)
+        cor: Dict[str, int] = {}
+        passos = [0]
+
+        def colorir(i: int) -> bool:
+            if i == len(ordem):
+                return True
+            passos[0] += 1
+            if passos[0] > _LIMITE_COLORACAO:
+                return False
+            disc = ordem[i]
+            usadas = {cor[v] for v in vizinhos[disc] if v in cor}
+            for c in range(self.capacidade[classe_de[disc]]):
+                if c in usadas:
+                    continue
+                cor[disc] = c
+                if colorir(i + 1):
+                    return True
+                del cor[disc]
+            return False
+
+        if colorir(0):
+            return cor
+        if passos[0] > _LIMITE_COLORACAO:
+            self.coloracoes_abandonadas += 1
+        return None
@@ -0,0 +1,128 @@
+from dataclasses import dataclass, fields
+from types import MappingProxyType
+from typing import Dict, Iterator, List, Mapping, Optional, Tuple
+
+from layered_graph import LayeredGraph
+
+
+@dataclass(frozen=True)
+class Aula:
+    """
+    Uma alocação da solução já decodificada: os atributos de disciplina,
+    professor, sala e horário copiados do grafo.
+    """
+
+    __slots__ = (
+        'sub_id', 'disc_id', 'sigla', 'nome', 'parte', 'carga', 'tipo',
+        'curso', 'periodo', 'prof_id', 'prof_nome', 'sala_id', 'sala_nome',
+        'sala_classe', 'slot_id', 'dia', 'hora_id', 'faixa',
+    )
+
+    sub_id: str
+    disc_id: str
+    sigla: str
+    nome: str
+    parte: int
+    carga: int
+    tipo: str
+    curso: str
+    periodo: Optional[int]
+    prof_id: str
+    prof_nome: str
+    sala_id: str
+    sala_nome: str
+    sala_classe: str
+    slot_id: str
+    dia: str
+    hora_id: int
+    faixa: str
+
+    def nos(self) -> Tuple[str, str, str, str]:
+        """
+        Nomes dos nós (disc, prof, sala, slot) no grafo multicamadas.
+        """
+        return (f"disc_{self.sub_id}", f"prof_{self.prof_id}",
+                f"sala_{self.sala_id}", f"slot_{self.slot_id}")
+
+    def __reduce__(self):
+        # Com __slots__ e frozen, o pickle padrão tentaria setattr
+        return (self.__class__, tuple(getattr(self, f.name) for f in fields(self)))
+
+
+class ScheduleTable:
+    """
+    Tabela imutável da solução, montada uma vez a partir de
+    get_solution() e usada por todos os exportadores. Os atributos de cada
+    nó do grafo são lidos uma única vez (mesmo que o nó apareça em várias
+    alocações), e as aulas já ficam agrupadas por horário (dia, faixa),
+    professor, curso e disciplina, na ordem da solução. Não guarda
+    referência ao grafo.
+    """
+
+    __slots__ = ('aulas', 'por_slot', 'por_professor', 'por_curso', 'por_disciplina')
+
+    def __init__(self, aulas: Tuple[Aula, ...]):
+        indices: Dict[str, Dict] = {
+            'por_slot': {}, 'por_professor': {}, 'por_curso': {}, 'por_disciplina': {},
+        }
+        for aula in aulas:
+            indices['por_slot'].setdefault((aula.dia, aula.faixa), []).append(aula)
+            indices['por_professor'].setdefault(aula.prof_nome, []).append(aula)
+            indices['por_curso'].setdefault(aula.curso, []).append(aula)
+            indices['por_disciplina'].setdefault((aula.nome, aula.sigla), []).append(aula)
+
+        object.__setattr__(self, 'aulas', tuple(aulas))
+        for nome, grupos in indices.items():
+            congelado = MappingProxyType({k: tuple(v) for k, v in grupos.items()})
+            object.__setattr__(self, nome, congelado)
+
+    def __setattr__(self, nome, valor):
+        raise AttributeError("ScheduleTable é imutável")
+
+    def __reduce__(self):
+        return (self.__class__, (self.aulas,))
+
+    @classmethod
+    def from_solution(cls, resultado: List[Tuple], graph: LayeredGraph) -> 'ScheduleTable':
+        """
+        Decodifica as tuplas (disc, prof, sala, slot) de get_solution().
+        """
+        nodes = graph.nodes
+        cache: Dict[str, Mapping] = {}
+
+        def info(node: str) -> Mapping:
+            data = cache.get(node)
+            if data is None:
+                data = cache[node] = nodes[node]
+            return data
+
+        aulas = []
+        for d_node, p_node, s_node, h_node in resultado:
+            d, p, s, h = info(d_node), info(p_node), info(s_node), info(h_node)
+            aulas.append(Aula(
+                sub_id=d['sub_id'],
+                disc_id=d['id'],
+                sigla=d['sigla_real'],
+                nome=d['nome'],
+                parte=d['parte'],
+                carga=d.get('carga', 2),
+                tipo=d.get('tipo'),
+                curso=d.get('curso'),
+                periodo=d.get('periodo'),
+                prof_id=p['id'],
+                prof_nome=p['nome'],
+                sala_id=s['id'],
+                sala_nome=s['nome'],
+                sala_classe=s.get('classe') or s['nome'],
+                slot_id=h['id'],
+                dia=h['dia'],
+                hora_id=h['hora_id'],
+                faixa=h['faixa'],
+            ))
+        return cls(tuple(aulas))
+
+    def __iter__(self) -> Iterator[Aula]:
+        return iter(self.aulas)
+
+    def __len__(self) -> int:
+        return len(self.aulas)
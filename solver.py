@@ -1,32 +1,217 @@
+import random
 import time
+from array import array
 import networkx as nx
-from typing import Dict, List, Set, Tuple, Optional
+from layered_graph import LayeredGraph
+from typing import Dict, List, Mapping, Sequence, Set, Tuple, Optional, Union
+from conflict_builder import ConflictOracle, ConflictBitsets
+from conflict_store import MappedConflictGraph
+from room_symmetry import RoomSymmetry
+
+
+class GapTracker:
+    """
+    Mantém o score de gaps (mesma regra de calculate_gap_score) de forma
+    incremental enquanto candidatos são empilhados e desempilhados.
+
+    lower_bound() soma apenas os grupos (curso, período) que já não têm
+    partes pendentes: nenhuma escolha futura altera esses dias, então o
+    valor é um limite inferior válido para qualquer completamento.
+    """
+
+    def __init__(self,
+                 candidatos_por_parte: Dict[str, Sequence[int]],
+                 candidate_info: Mapping[int, Tuple],
+                 original_graph: LayeredGraph):
+
+        nodes = original_graph.nodes
+        self.candidate_info = candidate_info
+        self._key_cache: Dict[Tuple[str, str], Tuple] = {}
+        self._nodes = nodes
+
+        self.pending: Dict[Tuple, int] = {}
+        for cands in candidatos_por_parte.values():
+            primeiro = next(iter(cands), None)
+            if primeiro is None:
+                continue
+            grupo = self._info(primeiro)[0]
+            if grupo is not None:
+                self.pending[grupo] = self.pending.get(grupo, 0) + 1
+
+        self.hours: Dict[Tuple, Dict[int, int]] = {}
+        self.key_score: Dict[Tuple, int] = {}
+        self.group_score: Dict[Tuple, int] = {}
+        self.total = 0
+        self.closed_total = 0
+
+    def _info(self, cid: int) -> Tuple:
+        """
+        (grupo, chave do dia, hora_id) do candidato; grupo None se a
+        disciplina não tem curso/período.
+        """
+        d_node, _, _, h_node = self.candidate_info[cid]
+        info = self._key_cache.get((d_node, h_node))
+        if info is None:
+            d_data = self._nodes[d_node]
+            h_data = self._nodes[h_node]
+            curso = d_data.get('curso')
+            periodo = d_data.get('periodo')
+            if not curso or not periodo:
+                info = (None, None, None)
+            else:
+                info = ((curso, periodo),
+                        (curso, periodo, h_data['dia']),
+                        h_data['hora_id'])
+            self._key_cache[(d_node, h_node)] = info
+        return info
+
+    @staticmethod
+    def day_score(hours: Dict[int, int]) -> int:
+        ordenadas = sorted(hours)
+        score = 0
+        for i in range(len(ordenadas) - 1):
+            gap = ordenadas[i + 1] - ordenadas[i] - 1
+            if gap > 0:
+                score += gap * gap
+        return score
+
+    def _update(self, grupo: Tuple, key: Tuple, hora: int, delta: int) -> None:
+        hours = self.hours.setdefault(key, {})
+        n = hours.get(hora, 0) + delta
+        if n:
+            hours[hora] = n
+        else:
+            del hours[hora]
+        novo = self.day_score(hours)
+        diff = novo - self.key_score.get(key, 0)
+        self.key_score[key] = novo
+        self.group_score[grupo] = self.group_score.get(grupo, 0) + diff
+        self.total += diff
+
+    def push(self, cid: int) -> None:
+        grupo, key, hora = self._info(cid)
+        if grupo is None:
+            return
+        self._update(grupo, key, hora, 1)
+        self.pending[grupo] -= 1
+        if self.pending[grupo] == 0:
+            self.closed_total += self.group_score[grupo]
+
+    def pop(self, cid: int) -> None:
+        grupo, key, hora = self._info(cid)
+        if grupo is None:
+            return
+        if self.pending[grupo] == 0:
+            self.closed_total -= self.group_score[grupo]
+        self.pending[grupo] += 1
+        self._update(grupo, key, hora, -1)
+
+    def lower_bound(self) -> int:
+        return self.closed_total
 
 
 class ConflictGraphSolver:
 
     def __init__(self,
-                 candidatos_por_parte: Dict[str, List[str]],
-                 candidate_info: Dict[str, Tuple],
-                 conflict_graph: nx.Graph,
-                 original_graph: nx.MultiGraph = None): # Adicionado para acessar dados de curso/periodo
+                 candidatos_por_parte: Dict[str, Sequence[int]],
+                 candidate_info: Mapping[int, Tuple],
+                 conflict_graph: Union[nx.Graph, MappedConflictGraph, None],
+                 original_graph: LayeredGraph = None, # Adicionado para acessar dados de curso/periodo
+                 conflict_oracle: Optional[ConflictOracle] = None,
+                 conflict_bitsets: Optional[ConflictBitsets] = None,
+                 branch_and_bound: bool = False,
+                 seed: Optional[int] = None,
+                 incumbent=None,
+                 engine: str = "iterativo",
+                 room_symmetry: Optional[RoomSymmetry] = None):
+
+        # Quebra de simetria: a busca só vê o representante de cada classe
+        # de salas; o oráculo precisa ter sido montado com o mesmo objeto
+        self.room_symmetry = room_symmetry
+        if room_symmetry is not None:
+            if conflict_oracle is None or conflict_oracle.room_symmetry is not room_symmetry:
+                raise ValueError("room_symmetry requer um ConflictOracle montado com ela")
+            candidatos_por_parte = room_symmetry.collapse(candidatos_por_parte)
+
+        # Com seed, a ordem de partes empatadas e de candidatos é embaralhada
+        # (usado pelo portfólio para diversificar a busca entre processos)
+        self.rng: Optional[random.Random] = None
+        if seed is not None:
+            self.rng = random.Random(seed)
+            embaralhados = {}
+            partes = list(candidatos_por_parte.keys())
+            self.rng.shuffle(partes)
+            for part in partes:
+                cands = list(candidatos_por_parte[part])
+                self.rng.shuffle(cands)
+                embaralhados[part] = cands
+            candidatos_por_parte = embaralhados
 
         self.candidatos_por_parte = candidatos_por_parte
         self.candidate_info = candidate_info
         self.conflict_graph = conflict_graph
         self.original_graph = original_graph
-        self.adj_sets = {cid: set(conflict_graph.neighbors(cid))
-                        for cid in conflict_graph.nodes()}
+        self.conflict_oracle = conflict_oracle
+        self.conflict_bitsets = conflict_bitsets
+        if engine not in ("iterativo", "recursivo"):
+            raise ValueError(f"Engine inválida: {engine}")
+        self.engine = engine
+
+        self.bloqueios: Optional[array] = None
+
+        # Com o oráculo os conflitos são consultados nas tabelas de ocupação
+        # e o grafo de conflitos não precisa existir.
+        if conflict_oracle is not None:
+            self.adj_sets = {}
+            self._is_compatible = conflict_oracle.compatible
+        elif conflict_bitsets is not None:
+            # Forward checking: domínios vivos como bitsets por parte
+            self.adj_sets = {}
+            self._is_compatible = None
+            self.part_masks = {
+                part: conflict_bitsets.mask_of(cands)
+                for part, cands in candidatos_por_parte.items()
+            }
+        elif isinstance(conflict_graph, MappedConflictGraph):
+            # Adjacência no arquivo mapeado: cada escolha incrementa o
+            # contador dos seus vizinhos, e um candidato é compatível se
+            # ninguém o bloqueia (4 bytes por candidato no heap)
+            self.adj_sets = {}
+            self.bloqueios = array('i', bytes(4 * conflict_graph.number_of_nodes()))
+            self._is_compatible = self._mapped_compatible
+        else:
+            if conflict_graph is None:
+                raise ValueError("Informe conflict_graph, conflict_oracle ou conflict_bitsets")
+            self.adj_sets = {cid: set(conflict_graph.neighbors(cid))
+                            for cid in conflict_graph.nodes()}
+            self._is_compatible = self._graph_compatible
 
         self.parts_sorted = sorted(
             candidatos_por_parte.keys(),
             key=lambda p: len(candidatos_por_parte[p])
         )
 
-        self.chosen: List[str] = []
-        self.best_solution: Optional[List[str]] = None
-        self.solutions_found: List[List[str]] = [] # Armazena múltiplas soluções
+        # Branch-and-bound sobre o score de gaps, mantido incrementalmente
+        self.gap_tracker: Optional[GapTracker] = None
+        if branch_and_bound:
+            if original_graph is None:
+                raise ValueError("branch_and_bound requer o grafo original")
+            self.gap_tracker = GapTracker(candidatos_por_parte, candidate_info, original_graph)
+        self.best_score: Optional[int] = None
+
+        # Incumbente compartilhado entre processos (get() / offer(score))
+        self.incumbent = incumbent
+        self._shared_score: Optional[int] = None
+
+        self.chosen: List[int] = []
+        self.best_solution: Optional[List[int]] = None
+        self.solutions_found: List[List[int]] = [] # Armazena múltiplas soluções
         self.nodes_explored = 0
+        # True se a última busca parou pelo time_limit (com ou sem solução)
+        self.timed_out = False
+        # Folhas descartadas porque a coloração de salas estourou o limite
+        # de passos: com alguma, a busca não provou o ótimo nem a inviabilidade
+        self.coloring_aborted = 0
         self.start_time = time.time()
 
     def solve(self, verbose: bool = True, time_limit: int = 15) -> bool:
@@ -36,36 +221,66 @@ class ConflictGraphSolver:
         """
         self.start_time = time.time()
         self.nodes_explored = 0
-        self.chosen = []
+        while self.chosen:
+            self._pop()
         self.solutions_found = []
+        self.best_score = None
+        self._shared_score = None
+        self.timed_out = False
+        self.coloring_aborted = 0
+        if self.room_symmetry is not None:
+            self.room_symmetry.coloracoes_abandonadas = 0
 
         if verbose:
             print(f"Iniciando busca com limite de {time_limit}s para otimização...")
 
         # Tenta encontrar soluções até o tempo acabar
         try:
-            self._backtrack_optimize(0, verbose, time_limit)
+            if self.conflict_bitsets is not None:
+                todos = 0
+                for mask in self.part_masks.values():
+                    todos |= mask
+                if self.engine == "iterativo":
+                    self._search_bitset(set(self.part_masks), todos, verbose, time_limit)
+                else:
+                    self._backtrack_bitset(set(self.part_masks), todos, verbose, time_limit)
+            elif self.engine == "iterativo":
+                self._search_iterative(verbose, time_limit)
+            else:
+                self._backtrack_optimize(0, verbose, time_limit)
         except TimeoutError:
             if verbose: print("\nTempo limite atingido.")
         except Exception as e:
             print(f"Erro durante busca: {e}")
 
+        if self.room_symmetry is not None:
+            self.coloring_aborted = self.room_symmetry.coloracoes_abandonadas
+            if verbose and self.coloring_aborted:
+                print(f"\n{self.coloring_aborted} solução(ões) descartada(s) pelo limite "
+                      "da coloração de salas; o resultado pode não ser ótimo.")
+
         # Se não encontrou nenhuma
         if not self.solutions_found:
             return False
 
         # Escolhe a melhor solução baseada nos gaps (janelas)
-        if self.original_graph:
+        if self.gap_tracker is not None:
+            # Cada solução registrada melhora a anterior; a última é a melhor
+            self.best_solution = self.solutions_found[-1]
+            if verbose:
+                print(f"\nMelhor solução escolhida (Score de Gaps: {self.best_score})")
+        elif self.original_graph:
             if verbose: 
                 print(f"\nAnalisando {len(self.solutions_found)} soluções candidatas...")
             
             # Escolhe a solução com menor pontuação de gap
-            best_sol = min(self.solutions_found, key=lambda s: self.calculate_gap_score(s))
-            self.best_solution = best_sol
+            scores = [self.calculate_gap_score(s) for s in self.solutions_found]
+            best_idx = min(range(len(scores)), key=scores.__getitem__)
+            self.best_solution = self.solutions_found[best_idx]
+            self.best_score = scores[best_idx]
             
             if verbose:
-                score = self.calculate_gap_score(best_sol)
-                print(f"Melhor solução escolhida (Score de Gaps: {score})")
+                print(f"Melhor solução escolhida (Score de Gaps: {self.best_score})")
         else:
             # Se não tiver o grafo original, pega a primeira
             self.best_solution = self.solutions_found[0]
@@ -80,12 +295,18 @@ class ConflictGraphSolver:
 
         return True
 
-    def _backtrack_optimize(self, idx: int, verbose: bool, time_limit: int):
+    def _tick(self, verbose: bool, time_limit: int) -> None:
         # Checagem periódica de tempo
         if self.nodes_explored % 1000 == 0:
             if time.time() - self.start_time > time_limit:
-                # Só lança timeout se JÁ temos pelo menos uma solução
-                if self.solutions_found:
+                # Vale também sem solução: uma instância inviável não pode
+                # prender a busca indefinidamente
+                self.timed_out = True
+                raise TimeoutError()
+            if self.incumbent is not None:
+                self._shared_score = self.incumbent.get()
+                # Outro processo já encontrou uma grade sem gaps
+                if self._shared_score == 0:
                     raise TimeoutError()
         
         self.nodes_explored += 1
@@ -94,30 +315,277 @@ class ConflictGraphSolver:
             elapsed = time.time() - self.start_time
             print(f"> Explorados: {self.nodes_explored}, Soluções: {len(self.solutions_found)}, Tempo: {elapsed:.1f}s")
 
-        if idx >= len(self.parts_sorted):
-            # Encontrou uma solução completa!
-            self.solutions_found.append(self.chosen.copy())
+    def _materialize(self) -> Optional[List[int]]:
+        """
+        Cópia da escolha atual com salas concretas (None se a quebra de
+        simetria não encontrar salas para ela).
+        """
+        if self.room_symmetry is None:
+            return self.chosen.copy()
+        return self.room_symmetry.assign(self.chosen)
+
+    def _record_solution(self, verbose: bool) -> None:
+        if self.gap_tracker is not None:
+            score = self.gap_tracker.total
+            cap = self._score_cap()
+            if cap is not None and score >= cap:
+                return
+            solucao = self._materialize()
+            if solucao is None:
+                return
+            self.best_score = score
+            self.solutions_found.append(solucao)
+            if self.incumbent is not None:
+                self.incumbent.offer(score)
             if verbose:
-                print(f"  [!] Solução #{len(self.solutions_found)} encontrada.")
-            
-            # Opcional: Se já achou muitas soluções boas, pode parar antes
-            if len(self.solutions_found) >= 50:
+                print(f"  [!] Solução #{len(self.solutions_found)} encontrada (Score de Gaps: {score}).")
+            # Score zero é ótimo: não há o que melhorar
+            if score == 0:
                 raise TimeoutError()
             return
 
+        solucao = self._materialize()
+        if solucao is None:
+            return
+
+        # Encontrou uma solução completa!
+        self.solutions_found.append(solucao)
+        if verbose:
+            print(f"  [!] Solução #{len(self.solutions_found)} encontrada.")
+        
+        # Opcional: Se já achou muitas soluções boas, pode parar antes
+        if len(self.solutions_found) >= 50:
+            raise TimeoutError()
+
+    def _backtrack_optimize(self, idx: int, verbose: bool, time_limit: int):
+        self._tick(verbose, time_limit)
+
+        if idx >= len(self.parts_sorted):
+            self._record_solution(verbose)
+            return
+
         part = self.parts_sorted[idx]
         
         # Itera sobre candidatos
         for cand in self.candidatos_por_parte[part]:
             # Verifica conflito com os já escolhidos
-            if any(c in self.adj_sets[cand] for c in self.chosen):
+            if not self._is_compatible(cand):
                 continue
             
-            self.chosen.append(cand)
-            self._backtrack_optimize(idx + 1, verbose, time_limit)
-            self.chosen.pop()
+            self._push(cand)
+            if not self._bound_exceeded():
+                self._backtrack_optimize(idx + 1, verbose, time_limit)
+            self._pop()
+
+    def _search_iterative(self, verbose: bool, time_limit: int):
+        """
+        Mesma busca de _backtrack_optimize com uma pilha explícita: cada
+        nível guarda o cursor (iterador) sobre os candidatos da sua parte.
+        Sem recursão não há limite de profundidade nem custo de chamada por
+        nível; a ordem de visita, a contagem de nós e o timeout são os mesmos.
+        """
+        parts = self.parts_sorted
+        n_parts = len(parts)
+        cands = self.candidatos_por_parte
+        is_compatible = self._is_compatible
+        bound_exceeded = self._bound_exceeded
+        push, pop, tick = self._push, self._pop, self._tick
+
+        tick(verbose, time_limit)
+        if n_parts == 0:
+            self._record_solution(verbose)
+            return
+
+        stack = [iter(cands[parts[0]])]
+        while stack:
+            descended = False
+            for cand in stack[-1]:
+                if not is_compatible(cand):
+                    continue
+                push(cand)
+                if bound_exceeded():
+                    pop()
+                    continue
+
+                # Visita o filho
+                tick(verbose, time_limit)
+                depth = len(stack)
+                if depth == n_parts:
+                    self._record_solution(verbose)
+                    pop()
+                    continue
+                stack.append(iter(cands[parts[depth]]))
+                descended = True
+                break
+
+            if not descended:
+                # Cursor esgotado: volta um nível e desfaz a escolha dele
+                stack.pop()
+                if stack:
+                    pop()
+
+    def _backtrack_bitset(self, restantes: Set[str], live: int,
+                          verbose: bool, time_limit: int):
+        """
+        Busca com forward checking: live contém os candidatos ainda
+        compatíveis com as escolhas feitas. Escolher um candidato remove a
+        sua linha de conflitos de live; se o domínio de alguma parte
+        restante esvaziar, o ramo é podado. A próxima parte é escolhida
+        dinamicamente pelo menor domínio vivo (MRV).
+        """
+        self._tick(verbose, time_limit)
+
+        if not restantes:
+            self._record_solution(verbose)
+            return
+
+        escolha = self._mrv_bitset(restantes, live)
+        if escolha is None:
+            return
+        part, domain = escolha
+
+        restantes.remove(part)
+        row = self.conflict_bitsets.row
+        for cand in self._iter_bits(domain):
+            self._push(cand)
+            if not self._bound_exceeded():
+                self._backtrack_bitset(restantes, live & ~row(cand), verbose, time_limit)
+            self._pop()
+        restantes.add(part)
+
+    def _search_bitset(self, restantes: Set[str], live: int,
+                       verbose: bool, time_limit: int):
+        """
+        Mesma busca de _backtrack_bitset com uma pilha explícita: cada
+        nível guarda a parte escolhida, o cursor sobre o seu domínio e o
+        live de quando ela foi escolhida.
+        """
+        row = self.conflict_bitsets.row
+        bound_exceeded = self._bound_exceeded
+        push, pop, tick = self._push, self._pop, self._tick
+
+        tick(verbose, time_limit)
+        if not restantes:
+            self._record_solution(verbose)
+            return
+        escolha = self._mrv_bitset(restantes, live)
+        if escolha is None:
+            return
+        restantes.remove(escolha[0])
+
+        stack = [(escolha[0], self._iter_bits(escolha[1]), live)]
+        while stack:
+            part, cursor, live = stack[-1]
+            descended = False
+            for cand in cursor:
+                push(cand)
+                if bound_exceeded():
+                    pop()
+                    continue
+
+                # Visita o filho
+                tick(verbose, time_limit)
+                if not restantes:
+                    self._record_solution(verbose)
+                    pop()
+                    continue
+                filho = live & ~row(cand)
+                escolha = self._mrv_bitset(restantes, filho)
+                if escolha is None:
+                    pop()
+                    continue
+                restantes.remove(escolha[0])
+                stack.append((escolha[0], self._iter_bits(escolha[1]), filho))
+                descended = True
+                break
+
+            if not descended:
+                # Domínio esgotado: devolve a parte e desfaz a escolha do pai
+                stack.pop()
+                restantes.add(part)
+                if stack:
+                    pop()
+
+    def _mrv_bitset(self, restantes: Set[str], live: int) -> Optional[Tuple[str, int]]:
+        """
+        (parte, domínio vivo) da parte restante com menor domínio, ou None
+        se alguma ficou sem candidatos.
+        """
+        part = None
+        domain = 0
+        menor = None
+        for p in self.parts_sorted:
+            if p not in restantes:
+                continue
+            d = live & self.part_masks[p]
+            n = d.bit_count()
+            if n == 0:
+                return None
+            if menor is None or n < menor:
+                part, domain, menor = p, d, n
+        return part, domain
+
+    def _iter_bits(self, domain: int):
+        if self.rng is None:
+            while domain:
+                low = domain & -domain
+                domain ^= low
+                yield low.bit_length() - 1
+            return
+        cands = []
+        while domain:
+            low = domain & -domain
+            domain ^= low
+            cands.append(low.bit_length() - 1)
+        self.rng.shuffle(cands)
+        yield from cands
+
+    def _graph_compatible(self, cand: int) -> bool:
+        adj = self.adj_sets[cand]
+        return not any(c in adj for c in self.chosen)
+
+    def _mapped_compatible(self, cand: int) -> bool:
+        return self.bloqueios[cand] == 0
+
+    def _bound_exceeded(self) -> bool:
+        """
+        Poda do branch-and-bound: o ramo não pode superar a melhor solução.
+        """
+        if self.gap_tracker is None:
+            return False
+        cap = self._score_cap()
+        return cap is not None and self.gap_tracker.lower_bound() >= cap
+
+    def _score_cap(self) -> Optional[int]:
+        """
+        Melhor score conhecido: o próprio ou o do incumbente compartilhado.
+        """
+        scores = [s for s in (self.best_score, self._shared_score) if s is not None]
+        return min(scores) if scores else None
+
+    def _push(self, cand: int) -> None:
+        self.chosen.append(cand)
+        if self.conflict_oracle is not None:
+            self.conflict_oracle.push(cand)
+        elif self.bloqueios is not None:
+            bloqueios = self.bloqueios
+            for viz in self.conflict_graph.neighbors(cand):
+                bloqueios[viz] += 1
+        if self.gap_tracker is not None:
+            self.gap_tracker.push(cand)
+
+    def _pop(self) -> None:
+        cand = self.chosen.pop()
+        if self.conflict_oracle is not None:
+            self.conflict_oracle.pop(cand)
+        elif self.bloqueios is not None:
+            bloqueios = self.bloqueios
+            for viz in self.conflict_graph.neighbors(cand):
+                bloqueios[viz] -= 1
+        if self.gap_tracker is not None:
+            self.gap_tracker.pop(cand)
 
-    def calculate_gap_score(self, solution_candidates: List[str]) -> int:
+    def calculate_gap_score(self, solution_candidates: List[int]) -> int:
         """
         Calcula penalidade para janelas (gaps) na grade de cada período/curso.
         """
@@ -0,0 +1,62 @@
+import os
+import sys
+from typing import Sequence
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmark import generate_instance
+from config import SEMANA
+from conflict_builder import ConflictBuilder
+from data_processor import DataProcessor
+from graph_builder import GraphBuilder
+
+
+def build_instance(dias: int = 1, strict_mode: bool = True, seed: int = 0,
+                   streaming: bool = False, bloqueados: Sequence[str] = (),
+                   **parametros) -> GraphBuilder:
+    """
+    Instância sintética pequena passando por DataProcessor → GraphBuilder,
+    com os horários dos primeiros dias da semana menos os bloqueados.
+    """
+    geracao = dict(cursos=1, periodos=2, disciplinas_por_periodo=2,
+                   professores=3, salas=2, optativas=1, densidade=0.5)
+    geracao.update(parametros)
+    materias, profs_raw, salas_raw = generate_instance(seed=seed, **geracao)
+
+    disciplinas = DataProcessor.build_disciplinas(materias)
+    salas = DataProcessor.build_salas(salas_raw)
+    dias_validos = list(SEMANA.values())[:dias]
+    slots = [s for s in DataProcessor.build_slots() if s.dia in dias_validos]
+    professores = DataProcessor.build_professores(profs_raw, disciplinas)
+    partes = DataProcessor.split_disciplinas_em_partes(disciplinas)
+
+    graph_builder = GraphBuilder(streaming=streaming)
+    graph_builder.add_nodes(partes, professores, salas, slots)
+    graph_builder.add_edges(partes, professores, salas, slots)
+    graph_builder.generate_candidates(partes, strict_mode=strict_mode)
+    for slot_id in bloqueados:
+        graph_builder.block_slot(slot_id)
+    return graph_builder
+
+
+def arestas(grafo) -> set:
+    return {tuple(sorted(e)) for e in grafo.edges()}
+
+
+def assert_sem_conflitos(solucao, store, grafo, strict_mode: bool = True) -> None:
+    """
+    Uma escolha por parte e nenhum par da solução em conflito, conferido
+    par a par com as regras de referência (ConflictBuilder._has_conflict).
+    """
+    builder = ConflictBuilder(grafo, store)
+    assert len({store.parte[c] for c in solucao}) == len(solucao)
+    for i, a in enumerate(solucao):
+        for b in solucao[i + 1:]:
+            assert not builder._has_conflict(a, b, strict_mode), (a, b)
+
+
+@pytest.fixture
+def make_instance():
+    return build_instance
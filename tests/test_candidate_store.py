@@ -0,0 +1,44 @@
+from array import array
+
+import pytest
+
+from candidate_store import LazyCandidateStore
+
+
+@pytest.mark.parametrize("parametros", [
+    dict(dias=2),
+    dict(dias=1, salas=3, seed=1),
+])
+def test_lazy_store_matches_eager(make_instance, parametros):
+    ansioso = make_instance(streaming=False, **parametros)
+    preguicoso = make_instance(streaming=True, **parametros)
+    eager, lazy = ansioso.candidate_info, preguicoso.candidate_info
+    assert isinstance(lazy, LazyCandidateStore)
+
+    assert preguicoso.candidatos_por_parte == ansioso.candidatos_por_parte
+    assert len(lazy) == len(eager)
+    assert list(lazy) == list(eager)
+    assert list(lazy.rows()) == list(eager.rows())
+
+    for cid, linha in enumerate(eager.rows()):
+        assert lazy.decode(cid) == linha
+        assert lazy[cid] == eager[cid]
+        assert lazy.cand_id(cid) == eager.cand_id(cid)
+        assert (lazy.parte[cid], lazy.prof[cid], lazy.sala[cid], lazy.slot[cid]) == linha
+        assert lazy.find(*linha) == cid
+
+    for parte in range(len(eager.part_nodes)):
+        linhas = [linha for linha in eager.rows() if linha[0] == parte]
+        profs, salas, slots = lazy.domains(parte)
+        assert set(profs) == {linha[1] for linha in linhas}
+        assert set(salas) == {linha[2] for linha in linhas}
+        assert set(slots) == {linha[3] for linha in linhas}
+        # Combinação fora do domínio da parte não existe
+        fora = next((s for s in range(len(eager.slot_nodes)) if s not in slots),
+                    len(eager.slot_nodes))
+        assert lazy.find(parte, profs[0], salas[0], fora) is None
+
+    assert lazy.domains(len(eager.part_nodes)) == (array('i'), array('i'), array('i'))
+    assert lazy.find(len(eager.part_nodes), 0, 0, 0) is None
+    with pytest.raises(KeyError):
+        lazy.decode(len(eager))
@@ -0,0 +1,121 @@
+import random
+
+import pytest
+
+from conflict_builder import ConflictBitsets, ConflictBuilder, ConflictOracle
+from conftest import arestas
+
+
+@pytest.mark.parametrize("strict_mode", [True, False])
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_build_equals_pairwise(make_instance, strict_mode, seed):
+    gb = make_instance(dias=2, strict_mode=strict_mode, seed=seed)
+    builder = ConflictBuilder(gb.get_graph(), gb.candidate_info)
+
+    esperado = builder.build_pairwise(strict_mode=strict_mode)
+    obtido = builder.build(strict_mode=strict_mode)
+
+    assert esperado.number_of_edges() > 0
+    assert set(obtido.nodes()) == set(esperado.nodes())
+    assert arestas(obtido) == arestas(esperado)
+
+
+@pytest.mark.parametrize("strict_mode", [True, False])
+@pytest.mark.parametrize("seed", [0, 1])
+def test_numpy_build_equals_buckets(make_instance, strict_mode, seed):
+    pytest.importorskip("numpy")
+    gb = make_instance(dias=2, strict_mode=strict_mode, seed=seed)
+    builder = ConflictBuilder(gb.get_graph(), gb.candidate_info)
+
+    baldes = builder.build(strict_mode=strict_mode, metodo="baldes")
+    vetorizado = builder.build(strict_mode=strict_mode, metodo="numpy")
+
+    assert baldes.number_of_edges() > 0
+    assert arestas(vetorizado) == arestas(baldes)
+
+
+@pytest.mark.parametrize("strict_mode", [True, False])
+def test_mapped_numpy_equals_mapped_buckets(make_instance, tmp_path, strict_mode):
+    pytest.importorskip("numpy")
+    gb = make_instance(dias=2, strict_mode=strict_mode)
+    builder = ConflictBuilder(gb.get_graph(), gb.candidate_info)
+
+    por_baldes = builder.build_mapped(str(tmp_path / "baldes.csr"),
+                                      strict_mode=strict_mode, metodo="baldes")
+    por_blocos = builder.build_mapped(str(tmp_path / "numpy.csr"),
+                                      strict_mode=strict_mode, metodo="numpy")
+    try:
+        assert por_blocos.number_of_nodes() == por_baldes.number_of_nodes()
+        assert por_blocos.number_of_edges() == por_baldes.number_of_edges() > 0
+        for cid in por_baldes.nodes():
+            assert sorted(por_blocos.neighbors(cid)) == sorted(por_baldes.neighbors(cid))
+    finally:
+        por_baldes.close()
+        por_blocos.close()
+
+
+@pytest.mark.parametrize("strict_mode", [True, False])
+@pytest.mark.parametrize("seed", [0, 1])
+def test_oracle_matches_graph_adjacency(make_instance, strict_mode, seed):
+    gb = make_instance(dias=2, strict_mode=strict_mode, seed=seed)
+    grafo = gb.get_graph()
+    store = gb.candidate_info
+    conflitos = ConflictBuilder(grafo, store).build(strict_mode=strict_mode)
+    oraculo = ConflictOracle(grafo, store, strict_mode=strict_mode)
+
+    for a in store:
+        oraculo.push(a)
+        vizinhos = set(conflitos.neighbors(a))
+        for b in store:
+            if b != a:
+                assert oraculo.compatible(b) == (b not in vizinhos), (a, b)
+        oraculo.pop(a)
+    assert not oraculo.ocupacao
+
+    # Vários escolhidos ao mesmo tempo: um conjunto independente guloso
+    rng = random.Random(seed)
+    escolhidos = []
+    ordem = list(store)
+    rng.shuffle(ordem)
+    for c in ordem:
+        if oraculo.compatible(c):
+            oraculo.push(c)
+            escolhidos.append(c)
+    for b in store:
+        if b not in escolhidos:
+            livre = not any(conflitos.has_edge(a, b) for a in escolhidos)
+            assert oraculo.compatible(b) == livre
+
+
+@pytest.mark.parametrize("metodo", ["baldes", "numpy"])
+def test_long_slots_keep_daily_limit(make_instance, metodo):
+    if metodo == "numpy":
+        pytest.importorskip("numpy")
+    gb = make_instance(dias=2)
+    grafo = gb.get_graph()
+    # Horários de 5h: dois no mesmo dia passam das 8h do professor (regra 5)
+    for k, node in enumerate(grafo.layer_nodes("horario")):
+        if k % 2 == 0:
+            grafo.nodes[node]['duracao'] = 5
+    builder = ConflictBuilder(grafo, gb.candidate_info)
+
+    esperado = builder.build_pairwise()
+    obtido = builder.build(metodo=metodo)
+    attrs = builder._candidate_attrs(list(gb.candidate_info))
+    assert any(builder._first_rule(attrs[a], attrs[b], True) == 5
+               for a, b in esperado.edges())
+    assert arestas(obtido) == arestas(esperado)
+
+
+@pytest.mark.parametrize("strict_mode", [True, False])
+@pytest.mark.parametrize("seed", [0, 1])
+def test_bitset_rows_match_graph_neighbors(make_instance, strict_mode, seed):
+    gb = make_instance(dias=2, strict_mode=strict_mode, seed=seed)
+    grafo = gb.get_graph()
+    store = gb.candidate_info
+    conflitos = ConflictBuilder(grafo, store).build(strict_mode=strict_mode)
+    bitsets = ConflictBitsets(grafo, store, strict_mode=strict_mode)
+
+    for c in store:
+        # A linha inclui o próprio candidato (regra 1)
+        assert bitsets.row(c) == bitsets.mask_of(set(conflitos.neighbors(c)) | {c}), c
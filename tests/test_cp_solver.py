@@ -0,0 +1,55 @@
+import pytest
+
+from conflict_builder import ConflictBuilder
+from conftest import assert_sem_conflitos
+from solver import ConflictGraphSolver
+
+pytest.importorskip("ortools")
+from cp_solver import CPSatSolver
+
+
+def _resolve(gb, strict_mode, time_limit=60):
+    grafo = gb.get_graph()
+    store = gb.candidate_info
+    conflitos = ConflictBuilder(grafo, store).build_pairwise(strict_mode=strict_mode)
+
+    busca = ConflictGraphSolver(gb.candidatos_por_parte, store, conflitos, grafo,
+                                branch_and_bound=True)
+    encontrou_busca = busca.solve(verbose=False, time_limit=time_limit)
+
+    cpsat = CPSatSolver(gb.candidatos_por_parte, store, grafo,
+                        strict_mode=strict_mode, workers=1)
+    encontrou_cpsat = cpsat.solve(verbose=False, time_limit=time_limit)
+    return conflitos, busca, encontrou_busca, cpsat, encontrou_cpsat
+
+
+@pytest.mark.parametrize("strict_mode", [True, False])
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_cpsat_matches_backtracking(make_instance, strict_mode, seed):
+    gb = make_instance(dias=1, strict_mode=strict_mode, seed=seed)
+    _, busca, encontrou_busca, cpsat, encontrou_cpsat = _resolve(gb, strict_mode)
+
+    # Busca exaustiva concluída: o score é o ótimo
+    assert not busca.timed_out
+    assert encontrou_cpsat == encontrou_busca
+    if not encontrou_busca:
+        return
+    assert cpsat.best_score == busca.best_score
+
+    escolhidos = cpsat.best_solution
+    assert cpsat.get_solution() == [gb.candidate_info[c] for c in escolhidos]
+    assert len(escolhidos) == len(gb.candidatos_por_parte)
+    assert_sem_conflitos(escolhidos, gb.candidate_info, gb.get_graph(), strict_mode)
+
+
+def test_cpsat_detects_infeasible(make_instance):
+    # Uma turma com mais partes (8) do que horários no dia (7). O
+    # backtracking demora para esgotar a árvore, então só se confere que
+    # não acha nada enquanto o CP-SAT prova a inviabilidade
+    gb = make_instance(dias=1, periodos=1, disciplinas_por_periodo=4,
+                       optativas=0, salas=1, seed=1)
+    _, busca, encontrou_busca, cpsat, encontrou_cpsat = _resolve(gb, True, time_limit=2)
+
+    assert encontrou_busca is False
+    assert encontrou_cpsat is False
+    assert cpsat.status == "INFEASIBLE"
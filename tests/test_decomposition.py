@@ -0,0 +1,107 @@
+import networkx as nx
+import pytest
+
+import decomposition
+from conflict_builder import ConflictOracle
+from conftest import assert_sem_conflitos
+from decomposition import DecomposedSolver, find_clusters
+from solver import ConflictGraphSolver
+
+# Cada disciplina só com o professor responsável: mais de um grupo
+GRUPOS = dict(cursos=2, periodos=1, disciplinas_por_periodo=3,
+              professores=6, densidade=0, salas=2, optativas=0)
+
+
+def _chaves(gb, part):
+    store = gb.candidate_info
+    cands = gb.candidatos_por_parte[part]
+    data = gb.get_graph().nodes[f"disc_{part}"]
+    chaves = {('disc', data['id']), ('turma', data['curso'], data['periodo'])}
+    return chaves | {('prof', store.prof[c]) for c in cands}
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_find_clusters_are_components(make_instance, seed):
+    gb = make_instance(dias=1, seed=seed, **GRUPOS)
+    grupos = find_clusters(gb.candidatos_por_parte, gb.candidate_info, gb.get_graph())
+
+    # Referência: componentes do grafo "divide disciplina, turma ou professor"
+    partes = list(gb.candidatos_por_parte)
+    chaves = {part: _chaves(gb, part) for part in partes}
+    G = nx.Graph()
+    G.add_nodes_from(partes)
+    for i, a in enumerate(partes):
+        for b in partes[i + 1:]:
+            if chaves[a] & chaves[b]:
+                G.add_edge(a, b)
+
+    assert len(grupos) > 1
+    assert [len(g) for g in grupos] == sorted((len(g) for g in grupos), reverse=True)
+    assert sorted(map(sorted, grupos)) == sorted(map(sorted, nx.connected_components(G)))
+
+
+def _inteira(gb):
+    grafo = gb.get_graph()
+    oraculo = ConflictOracle(grafo, gb.candidate_info, strict_mode=True)
+    solver = ConflictGraphSolver(gb.candidatos_por_parte, gb.candidate_info, None,
+                                 grafo, conflict_oracle=oraculo, branch_and_bound=True)
+    encontrou = solver.solve(verbose=False, time_limit=30)
+    assert not solver.timed_out
+    return encontrou, solver
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_decomposed_matches_whole(make_instance, seed, workers):
+    gb = make_instance(dias=1, seed=seed, **GRUPOS)
+    encontrou, inteira = _inteira(gb)
+
+    decomposto = DecomposedSolver(gb.candidatos_por_parte, gb.candidate_info,
+                                  gb.get_graph(), workers=workers)
+    assert decomposto.solve(verbose=False, time_limit=30) == encontrou
+    assert decomposto.best_score == inteira.best_score
+    assert len(decomposto.best_solution) == len(gb.candidatos_por_parte)
+    assert_sem_conflitos(decomposto.best_solution, gb.candidate_info, gb.get_graph())
+
+
+def test_reconcile_rooms_separates_colliding_rooms(make_instance):
+    gb = make_instance(dias=1, **GRUPOS)
+    store = gb.candidate_info
+    _, inteira = _inteira(gb)
+    solucao = inteira.best_solution
+
+    decomposto = DecomposedSolver(gb.candidatos_por_parte, store, gb.get_graph())
+    assert decomposto.reconcile_rooms(solucao) == solucao
+
+    # Todas as aulas na primeira sala: colide sempre que dois horários coincidem
+    def na_sala_zero(cid):
+        chave = (store.parte[cid], store.prof[cid], 0, store.slot[cid])
+        return next(c for c in gb.candidatos_por_parte[store.part_sub_ids[chave[0]]]
+                    if (store.parte[c], store.prof[c], store.sala[c], store.slot[c]) == chave)
+
+    colidindo = [na_sala_zero(c) for c in solucao]
+    assert len({(store.sala[c], store.slot[c]) for c in colidindo}) < len(colidindo)
+
+    reconciliada = decomposto.reconcile_rooms(colidindo)
+    assert reconciliada is not None
+    assert [(store.parte[c], store.prof[c], store.slot[c]) for c in reconciliada] == \
+        [(store.parte[c], store.prof[c], store.slot[c]) for c in solucao]
+    assert_sem_conflitos(reconciliada, store, gb.get_graph())
+
+
+def test_cluster_failure_falls_back_to_whole(make_instance, monkeypatch):
+    gb = make_instance(dias=1, **GRUPOS)
+    original = decomposition._solve_cluster
+
+    def falha_com_fixos(indice, partes, time_limit, fixos=()):
+        # Qualquer grupo com salas fixadas "não tem solução"
+        if fixos:
+            return indice, None, None, 0, False
+        return original(indice, partes, time_limit, fixos)
+
+    monkeypatch.setattr(decomposition, "_solve_cluster", falha_com_fixos)
+    decomposto = DecomposedSolver(gb.candidatos_por_parte, gb.candidate_info,
+                                  gb.get_graph(), workers=1)
+    assert decomposto.solve(verbose=False, time_limit=30)
+    assert len(decomposto.best_solution) == len(gb.candidatos_por_parte)
+    assert_sem_conflitos(decomposto.best_solution, gb.candidate_info, gb.get_graph())
@@ -0,0 +1,60 @@
+import pytest
+
+from feasibility import FeasibilityChecker
+
+
+def _relatorio(gb):
+    return FeasibilityChecker(gb.candidatos_por_parte, gb.candidate_info,
+                              gb.get_graph()).check()
+
+
+@pytest.mark.parametrize("dias", [1, 2])
+def test_feasible_instance(make_instance, dias):
+    relatorio = _relatorio(make_instance(dias=dias))
+    assert relatorio.viavel
+    assert relatorio.summary() == []
+
+
+@pytest.mark.parametrize("parametros, regras", [
+    # Uma turma com 7 partes e só 3 horários livres
+    (dict(periodos=1, disciplinas_por_periodo=4, bloqueados=("2_1", "2_2", "2_3", "2_4")),
+     {"turma", "salas"}),
+    # Um único professor para todas as disciplinas
+    (dict(periodos=3, professores=1, densidade=0, salas=3, optativas=0),
+     {"professor"}),
+    # Turmas distintas, mas uma sala e dois horários para 11 partes
+    (dict(cursos=3, periodos=2, disciplinas_por_periodo=1, professores=6, densidade=0,
+          salas=1, optativas=0, bloqueados=("2_1", "2_2", "2_3", "2_4", "2_5")),
+     {"salas"}),
+])
+def test_infeasible_instances(make_instance, parametros, regras):
+    relatorio = _relatorio(make_instance(dias=1, **parametros))
+    assert not relatorio.viavel
+    assert {v.regra for v in relatorio.violacoes} == regras
+    for v in relatorio.violacoes:
+        assert v.demanda > v.oferta
+
+
+def test_match_needs_augmenting_paths():
+    # A contagem passa (3 partes, 3 horários), mas a e b só cabem no 1
+    slots = {"a": {1}, "b": {1}, "c": {1, 2, 3}}
+    assert FeasibilityChecker._match(list(slots), slots) == ["b"]
+    assert FeasibilityChecker._match(list(slots), slots, capacidade=2) == []
+
+    # c pega o 1 primeiro e precisa ser deslocada para o 2
+    slots = {"c": {1, 2}, "a": {1}}
+    assert FeasibilityChecker._match(["c", "a"], slots) == []
+
+
+def test_match_long_augmenting_path():
+    # p_i só cabe em i ou i+1 e fica com i; z só cabe em 0 ou n+1 e
+    # desloca a cadeia inteira, bem além do limite de recursão
+    n = 5000
+    slots = {f"p{i}": {i, i + 1} for i in range(n)}
+    slots["z"] = {0, n + 1}
+    assert FeasibilityChecker._match(list(slots), slots) == []
+
+    # Com n ocupado por y a cadeia chega ao fim sem vaga e volta inteira
+    slots["y"] = {n}
+    slots["z"] = {0, n}
+    assert FeasibilityChecker._match(list(slots), slots) == ["z"]
@@ -0,0 +1,86 @@
+import pytest
+
+from benchmark import generate_instance
+from conflict_builder import ConflictOracle
+from data_processor import DataProcessor
+from graph_builder import GraphBuilder
+from solver import ConflictGraphSolver
+
+
+def _instancia(seed: int, podar: bool) -> GraphBuilder:
+    """
+    Um dia com os horários 1, 2, 3 e 5. A primeira disciplina vira
+    obrigatória de SIN (só horário noturno) com uma parte e um professor:
+    fica fixa e a poda propaga o horário 5 para as outras partes.
+    """
+    materias, profs_raw, salas_raw = generate_instance(
+        cursos=1, periodos=2, disciplinas_por_periodo=2, professores=2,
+        salas=2, optativas=0, densidade=0, seed=seed
+    )
+    materias[0].update(curso='SIN', ch=2)
+
+    disciplinas = DataProcessor.build_disciplinas(materias)
+    salas = DataProcessor.build_salas(salas_raw)
+    slots = [s for s in DataProcessor.build_slots()
+             if s.dia == 'Segunda' and s.hora_id in (1, 2, 3, 5)]
+    professores = DataProcessor.build_professores(profs_raw, disciplinas)
+    partes = DataProcessor.split_disciplinas_em_partes(disciplinas)
+
+    gb = GraphBuilder()
+    gb.add_nodes(partes, professores, salas, slots)
+    gb.add_edges(partes, professores, salas, slots)
+    gb.generate_candidates(partes, strict_mode=True, podar=podar)
+    return gb
+
+
+def _todas_as_solucoes(gb):
+    """
+    Todas as soluções viáveis, como tuplas de nomes (disc, prof, sala, slot).
+    """
+    grafo = gb.get_graph()
+    store = gb.candidate_info
+    oraculo = ConflictOracle(grafo, store, strict_mode=True)
+    partes = list(gb.candidatos_por_parte.values())
+    escolhidos, solucoes = [], []
+
+    def visita(i):
+        if i == len(partes):
+            solucoes.append([store[c] for c in escolhidos])
+            return
+        for c in partes[i]:
+            if oraculo.compatible(c):
+                oraculo.push(c)
+                escolhidos.append(c)
+                visita(i + 1)
+                escolhidos.pop()
+                oraculo.pop(c)
+
+    visita(0)
+    return solucoes
+
+
+def _otimo(gb):
+    grafo = gb.get_graph()
+    oraculo = ConflictOracle(grafo, gb.candidate_info, strict_mode=True)
+    solver = ConflictGraphSolver(gb.candidatos_por_parte, gb.candidate_info, None,
+                                 grafo, conflict_oracle=oraculo, branch_and_bound=True)
+    encontrou = solver.solve(verbose=False, time_limit=30)
+    assert not solver.timed_out
+    return encontrou, solver.best_score
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_pruning_is_sound(seed):
+    podado = _instancia(seed, podar=True)
+    completo = _instancia(seed, podar=False)
+    assert podado.podados > 0
+    assert len(podado.candidate_info) < len(completo.candidate_info)
+
+    assert _otimo(podado) == _otimo(completo)
+
+    # Nenhuma solução viável perde candidatos com a poda
+    restantes = {podado.candidate_info[c] for c in podado.candidate_info}
+    solucoes = _todas_as_solucoes(completo)
+    assert solucoes
+    for solucao in solucoes:
+        assert set(solucao) <= restantes
@@ -0,0 +1,69 @@
+import pytest
+
+from conflict_builder import ConflictBuilder
+from conftest import arestas
+from incremental import IncrementalScheduler
+from models import Sala
+
+
+def _reconstruido(gb, strict_mode):
+    """
+    Grafo de conflitos montado do zero sobre os candidatos atuais.
+    """
+    atuais = {c for cands in gb.candidatos_por_parte.values() for c in cands}
+    completo = ConflictBuilder(gb.get_graph(), gb.candidate_info).build(strict_mode)
+    return completo.subgraph(atuais)
+
+
+@pytest.mark.parametrize("strict_mode", [True, False])
+def test_deltas_match_full_rebuild(make_instance, strict_mode):
+    gb = make_instance(dias=2, salas=3, strict_mode=strict_mode)
+    inc = IncrementalScheduler(gb, strict_mode=strict_mode, conflict_mode="grafo")
+
+    deltas = [
+        lambda: inc.remove_room("S002"),
+        lambda: inc.add_room(Sala(id="S900", nome="Sala de Aula S900",
+                                  classe="Sala de Aula")),
+        lambda: inc.block_slot("2_3"),
+        lambda: inc.remove_professor("3"),
+        lambda: inc.remove_room("S900"),
+    ]
+    for delta in deltas:
+        delta()
+        esperado = _reconstruido(gb, strict_mode)
+        assert set(inc.conflict_graph.nodes()) == set(esperado.nodes())
+        assert arestas(inc.conflict_graph) == arestas(esperado)
+
+
+def test_update_only_reads_new_candidates(make_instance, monkeypatch):
+    gb = make_instance(dias=2, salas=3)
+    inc = IncrementalScheduler(gb, conflict_mode="grafo")
+    inc.remove_room("S003")
+
+    lidos = []
+    original = ConflictBuilder._candidate_attrs
+
+    def espiao(self, cids):
+        lidos.append(list(cids))
+        return original(self, cids)
+
+    monkeypatch.setattr(ConflictBuilder, "_candidate_attrs", espiao)
+    antes = len(gb.candidate_info)
+    inc.add_room(Sala(id="S901", nome="Sala de Aula S901", classe="Sala de Aula"))
+
+    # O índice de baldes já existe: só os candidatos da sala nova são lidos
+    assert lidos == [list(range(antes, len(gb.candidate_info)))]
+
+
+def test_remove_room_resolve(make_instance):
+    gb = make_instance(dias=2, salas=3)
+    inc = IncrementalScheduler(gb)
+    assert inc.solve(verbose=False, time_limit=10)
+
+    usadas = {gb.candidate_info.sala[c] for c in inc.best_solution}
+    sala = gb.candidate_info.sala_nodes[next(iter(usadas))]
+    inc.remove_room(sala[len("sala_"):])
+    assert inc.solve(verbose=False, time_limit=10)
+    indice = gb.candidate_info._sala_idx[sala]
+    assert all(gb.candidate_info.sala[c] != indice for c in inc.best_solution)
+    assert len(inc.best_solution) == len(gb.candidatos_por_parte)
@@ -0,0 +1,61 @@
+import pytest
+
+from conflict_builder import ConflictOracle
+from conftest import assert_sem_conflitos
+from local_search import LocalSearchImprover
+from solver import ConflictGraphSolver
+
+
+def _primeira_solucao(gb):
+    """
+    Primeira solução do backtracking com a ordem embaralhada, sem otimizar
+    os gaps (costuma ter várias janelas).
+    """
+    grafo = gb.get_graph()
+    oraculo = ConflictOracle(grafo, gb.candidate_info, strict_mode=True)
+    solver = ConflictGraphSolver(gb.candidatos_por_parte, gb.candidate_info, None,
+                                 grafo, conflict_oracle=oraculo, seed=3)
+    assert solver.solve(verbose=False, time_limit=10)
+    return solver, solver.solutions_found[0]
+
+
+def _melhora(gb, solucao, seed):
+    improver = LocalSearchImprover(gb.candidatos_por_parte, gb.candidate_info,
+                                   gb.get_graph(), strict_mode=True, seed=seed)
+    return improver, improver.improve(solucao, time_limit=60, verbose=False,
+                                      max_moves=3000)
+
+
+INSTANCIAS = [
+    dict(dias=1, seed=0),
+    dict(dias=2, seed=0),
+    dict(dias=2, seed=2, salas=3),
+    # Ótimo 2 com horários bloqueados: os 3000 movimentos são usados
+    dict(dias=1, seed=1, periodos=1, bloqueados=("2_3", "2_5")),
+]
+
+
+@pytest.mark.parametrize("parametros", INSTANCIAS)
+def test_improve_keeps_feasibility_and_never_worsens(make_instance, parametros):
+    gb = make_instance(**parametros)
+    solver, inicial = _primeira_solucao(gb)
+
+    improver, melhor = _melhora(gb, inicial, seed=0)
+    assert improver.moves_accepted > 0
+    assert sorted(gb.candidate_info.parte[c] for c in melhor) == \
+        sorted(gb.candidate_info.parte[c] for c in inicial)
+    assert_sem_conflitos(melhor, gb.candidate_info, gb.get_graph())
+    assert solver.calculate_gap_score(melhor) <= solver.calculate_gap_score(inicial)
+    assert solver.calculate_gap_score(melhor) == improver.best_score
+
+
+@pytest.mark.parametrize("parametros", [INSTANCIAS[0], INSTANCIAS[3]])
+def test_improve_is_deterministic_for_a_seed(make_instance, parametros):
+    gb = make_instance(**parametros)
+    _, inicial = _primeira_solucao(gb)
+
+    primeiro, a = _melhora(gb, inicial, seed=7)
+    segundo, b = _melhora(gb, inicial, seed=7)
+    assert a == b
+    assert (primeiro.moves_tried, primeiro.moves_accepted) == \
+        (segundo.moves_tried, segundo.moves_accepted)
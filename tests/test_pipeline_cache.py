@@ -0,0 +1,69 @@
+import pickle
+
+import pytest
+
+import config
+from pipeline_cache import PipelineCache
+
+
+def _dominios(builder):
+    return {part: list(cands) for part, cands in builder.candidatos_por_parte.items()}
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_roundtrip(make_instance, tmp_path, streaming):
+    gb = make_instance(dias=2, streaming=streaming)
+    cache = PipelineCache(str(tmp_path))
+    cache.save("k", gb)
+    carregado = cache.load("k")
+
+    assert _dominios(carregado) == _dominios(gb)
+    for cands in carregado.candidatos_por_parte.values():
+        assert isinstance(cands, range)
+        for cid in cands:
+            assert carregado.candidate_info[cid] == gb.candidate_info[cid]
+
+
+def test_roundtrip_pruned_domains(make_instance, tmp_path):
+    gb = make_instance(dias=2, salas=3)
+    gb.remove_room("S001")
+    assert any(not isinstance(c, range) for c in gb.candidatos_por_parte.values())
+
+    cache = PipelineCache(str(tmp_path))
+    cache.save("k", gb)
+    carregado = cache.load("k")
+
+    assert _dominios(carregado) == _dominios(gb)
+
+
+def test_key_ignores_solver_options(make_instance, tmp_path, monkeypatch):
+    gb = make_instance(dias=2)
+    cache = PipelineCache(str(tmp_path))
+    chave = PipelineCache.key(None, None, None)
+    cache.save(chave, gb)
+
+    monkeypatch.setattr(config, "BRANCH_AND_BOUND", not config.BRANCH_AND_BOUND)
+    monkeypatch.setattr(config, "SOLVER_WORKERS", 4)
+    monkeypatch.setattr(config, "SEARCH_ENGINE", "recursivo")
+    assert PipelineCache.key(None, None, None) == chave
+    assert cache.load(chave) is not None
+
+    monkeypatch.setattr(config, "HORARIOS_NOTURNOS", [6, 7])
+    assert PipelineCache.key(None, None, None) != chave
+
+
+def test_load_conflicts_rejects_bad_entries(make_instance, tmp_path):
+    gb = make_instance(dias=2)
+    cache = PipelineCache(str(tmp_path))
+    cache.save("k", gb)
+    assert cache.load_conflicts("k") is None
+
+    with open(tmp_path / "k" / "conflitos.pkl", "wb") as f:
+        pickle.dump((10,), f)
+    with open(tmp_path / "k" / "conflitos.bin", "wb") as f:
+        f.write(b"\0" * 8)
+    assert cache.load_conflicts("k") is None
+
+    with open(tmp_path / "k" / "conflitos.pkl", "wb") as f:
+        pickle.dump((10, 100), f)
+    assert cache.load_conflicts("k") is None
@@ -0,0 +1,35 @@
+import pytest
+
+from conftest import assert_sem_conflitos
+from portfolio import PortfolioSolver
+
+
+@pytest.mark.parametrize("modo", ["grafo", "mmap"])
+def test_portfolio_rejects_unsupported_modes(make_instance, modo):
+    gb = make_instance()
+    with pytest.raises(ValueError):
+        PortfolioSolver(gb.candidatos_por_parte, gb.candidate_info,
+                        gb.get_graph(), modo=modo, workers=2)
+
+
+@pytest.mark.parametrize("modo", ["oraculo", "bitset"])
+@pytest.mark.parametrize("branch_and_bound,engine",
+                         [(True, "iterativo"), (False, "recursivo")])
+def test_portfolio_forwards_options(make_instance, modo, branch_and_bound, engine):
+    gb = make_instance()
+    solver = PortfolioSolver(gb.candidatos_por_parte, gb.candidate_info,
+                             gb.get_graph(), modo=modo, workers=2,
+                             branch_and_bound=branch_and_bound, engine=engine)
+    assert solver.solve(verbose=False, time_limit=5)
+
+    escolhidos = solver.best_solution
+    assert len(escolhidos) == len(gb.candidatos_por_parte)
+    assert_sem_conflitos(escolhidos, gb.candidate_info, gb.get_graph())
+
+
+def test_portfolio_engine_reaches_workers(make_instance):
+    gb = make_instance()
+    solver = PortfolioSolver(gb.candidatos_por_parte, gb.candidate_info,
+                             gb.get_graph(), workers=2, engine="inexistente")
+    with pytest.raises(ValueError):
+        solver.solve(verbose=False, time_limit=5)
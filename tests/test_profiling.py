@@ -0,0 +1,63 @@
+import json
+import time
+import tracemalloc
+
+import pytest
+
+from profiling import RunProfiler
+
+
+@pytest.fixture
+def sem_tracemalloc():
+    ativo = tracemalloc.is_tracing()
+    yield
+    if not ativo and tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def test_stage_records_counters_and_rates(sem_tracemalloc):
+    profiler = RunProfiler(ativo=True, memoria=True)
+    with profiler.stage("busca") as etapa:
+        dados = [0] * 100000
+        time.sleep(0.01)
+        etapa['nos_explorados'] = 500
+        etapa['candidatos'] = 20
+        etapa['modo'] = "oraculo"
+    with profiler.stage("vazia"):
+        pass
+
+    busca, vazia = profiler.etapas
+    assert busca['etapa'] == "busca" and vazia['etapa'] == "vazia"
+    assert busca['tempo_s'] >= 0.01
+    assert busca['nos_explorados'] == 500 and busca['modo'] == "oraculo"
+    assert 0 < busca['nos_por_segundo'] <= 500 / 0.01
+    assert 0 < busca['candidatos_por_segundo'] <= 20 / 0.01
+    assert 'arestas_por_segundo' not in busca
+    assert busca['pico_memoria_mb'] > 0.5
+    assert len(dados) == 100000
+
+    relatorio = profiler.report()
+    assert [e['etapa'] for e in relatorio['etapas']] == ["busca", "vazia"]
+    assert relatorio['tempo_total_s'] == pytest.approx(busca['tempo_s'] + vazia['tempo_s'])
+    assert len(profiler.summary()) == 2
+
+
+def test_stage_records_on_error(sem_tracemalloc):
+    profiler = RunProfiler(ativo=True, memoria=False)
+    with pytest.raises(RuntimeError):
+        with profiler.stage("falha") as etapa:
+            etapa['arestas'] = 3
+            raise RuntimeError
+    assert profiler.etapas[0]['arestas'] == 3
+    assert 'pico_memoria_mb' not in profiler.etapas[0]
+
+
+def test_inactive_profiler_measures_nothing(tmp_path, sem_tracemalloc):
+    profiler = RunProfiler(ativo=False)
+    with profiler.stage("busca") as etapa:
+        etapa['nos_explorados'] = 10
+    assert profiler.etapas == []
+
+    caminho = tmp_path / "perfil" / "run.json"
+    profiler.save(str(caminho))
+    assert json.loads(caminho.read_text(encoding="utf-8"))['etapas'] == []
@@ -0,0 +1,48 @@
+import pytest
+
+pytest.importorskip("matplotlib")
+pytest.importorskip("reportlab")
+
+import report_exporter
+from conflict_builder import ConflictOracle
+from report_exporter import ARTEFATOS, ReportExporter
+from schedule import ScheduleTable
+from solver import ConflictGraphSolver
+
+
+@pytest.fixture
+def tabela_e_grafo(make_instance):
+    gb = make_instance(dias=2)
+    grafo = gb.get_graph()
+    oraculo = ConflictOracle(grafo, gb.candidate_info, strict_mode=True)
+    solver = ConflictGraphSolver(gb.candidatos_por_parte, gb.candidate_info, None,
+                                 grafo, conflict_oracle=oraculo, branch_and_bound=True)
+    assert solver.solve(verbose=False, time_limit=10)
+    return ScheduleTable.from_solution(solver.get_solution(), grafo), grafo
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_export_writes_every_artifact(tabela_e_grafo, tmp_path, monkeypatch, workers):
+    tabela, grafo = tabela_e_grafo
+    monkeypatch.chdir(tmp_path)
+    exportador = ReportExporter(workers=workers)
+    try:
+        relatorio = exportador.export(tabela, grafo)
+    finally:
+        exportador.close()
+
+    assert set(relatorio) == set(ARTEFATOS)
+    for nome, registro in relatorio.items():
+        assert 'erro' not in registro, registro
+        assert registro['arquivo'] == ARTEFATOS[nome][1]
+        assert registro['tempo_s'] >= 0
+        assert (tmp_path / registro['arquivo']).stat().st_size > 0
+
+
+def test_in_process_export_does_not_pickle(tabela_e_grafo, tmp_path, monkeypatch):
+    tabela, _ = tabela_e_grafo
+    monkeypatch.chdir(tmp_path)
+    # Qualquer uso do pickle falharia
+    monkeypatch.setattr(report_exporter, "pickle", None)
+    relatorio = ReportExporter(workers=1).export(tabela, artefatos=['carga'])
+    assert 'erro' not in relatorio['carga']
@@ -0,0 +1,63 @@
+import time
+
+import pytest
+
+import room_symmetry
+from conflict_builder import ConflictOracle
+from conftest import assert_sem_conflitos
+from room_symmetry import RoomSymmetry
+from solver import ConflictGraphSolver
+
+
+def _solver(gb, simetria):
+    grafo = gb.get_graph()
+    store = gb.candidate_info
+    oraculo = ConflictOracle(grafo, store, strict_mode=True, room_symmetry=simetria)
+    return ConflictGraphSolver(gb.candidatos_por_parte, store, None, grafo,
+                               conflict_oracle=oraculo, branch_and_bound=True,
+                               room_symmetry=simetria)
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_room_symmetry_keeps_optimum(make_instance, seed):
+    gb = make_instance(dias=1, seed=seed, salas=3)
+    grafo = gb.get_graph()
+    store = gb.candidate_info
+
+    simples = _solver(gb, None)
+    encontrou = simples.solve(verbose=False, time_limit=30)
+    assert not simples.timed_out
+
+    simetria = RoomSymmetry(grafo, store, gb.candidatos_por_parte, strict_mode=True)
+    assert len(simetria.salas_da_classe) == 1
+    colapsado = _solver(gb, simetria)
+    assert colapsado.solve(verbose=False, time_limit=30) == encontrou
+    assert colapsado.coloring_aborted == 0
+    if not encontrou:
+        return
+    assert colapsado.best_score == simples.best_score
+
+    escolhidos = colapsado.solutions_found[-1]
+    assert sorted(store.parte[c] for c in escolhidos) == sorted(
+        store.parte[c] for c in simples.solutions_found[-1])
+    assert_sem_conflitos(escolhidos, store, grafo)
+
+
+def test_coloring_step_limit_rejects_leaf(make_instance, monkeypatch):
+    monkeypatch.setattr(room_symmetry, "_LIMITE_COLORACAO", 0)
+    gb = make_instance(dias=1, salas=3)
+    simetria = RoomSymmetry(gb.get_graph(), gb.candidate_info,
+                            gb.candidatos_por_parte, strict_mode=True)
+    solver = _solver(gb, simetria)
+
+    inicio = time.perf_counter()
+    assert solver.solve(verbose=False, time_limit=2) is False
+    assert time.perf_counter() - inicio < 5
+    # O descarte fica registrado: a busca não provou a inviabilidade
+    assert solver.coloring_aborted > 0
+    assert solver.coloring_aborted == simetria.coloracoes_abandonadas
+
+    # Uma nova busca zera a contagem
+    monkeypatch.setattr(room_symmetry, "_LIMITE_COLORACAO", 10000)
+    assert solver.solve(verbose=False, time_limit=30)
+    assert solver.coloring_aborted == 0
@@ -0,0 +1,62 @@
+import pickle
+
+import pytest
+
+from conflict_builder import ConflictOracle
+from schedule import Aula, ScheduleTable
+from solver import ConflictGraphSolver
+
+
+def _tabela(gb):
+    grafo = gb.get_graph()
+    oraculo = ConflictOracle(grafo, gb.candidate_info, strict_mode=True)
+    solver = ConflictGraphSolver(gb.candidatos_por_parte, gb.candidate_info, None,
+                                 grafo, conflict_oracle=oraculo)
+    assert solver.solve(verbose=False, time_limit=30)
+    resultado = solver.get_solution()
+    return resultado, ScheduleTable.from_solution(resultado, grafo)
+
+
+def test_table_follows_solution(make_instance):
+    gb = make_instance(dias=2)
+    resultado, tabela = _tabela(gb)
+    nodes = gb.get_graph().nodes
+
+    assert len(tabela) == len(resultado)
+    assert [aula.nos() for aula in tabela] == [tuple(linha) for linha in resultado]
+
+    esperado = {'por_slot': {}, 'por_professor': {}, 'por_curso': {}, 'por_disciplina': {}}
+    for d, p, s, h in resultado:
+        disc, prof, slot = nodes[d], nodes[p], nodes[h]
+        linha = (d, p, s, h)
+        esperado['por_slot'].setdefault((slot['dia'], slot['faixa']), []).append(linha)
+        esperado['por_professor'].setdefault(prof['nome'], []).append(linha)
+        esperado['por_curso'].setdefault(disc.get('curso'), []).append(linha)
+        esperado['por_disciplina'].setdefault((disc['nome'], disc['sigla_real']), []).append(linha)
+
+    for indice, grupos in esperado.items():
+        obtido = getattr(tabela, indice)
+        assert {k: [a.nos() for a in v] for k, v in obtido.items()} == grupos
+
+
+def test_table_is_immutable(make_instance):
+    _, tabela = _tabela(make_instance(dias=1))
+    with pytest.raises(AttributeError):
+        tabela.aulas = ()
+    with pytest.raises(TypeError):
+        tabela.por_slot[("Segunda", "x")] = ()
+    with pytest.raises(AttributeError):
+        tabela.aulas[0].sala_id = "S999"
+    assert isinstance(tabela.aulas, tuple)
+    assert all(isinstance(grupo, tuple) for grupo in tabela.por_professor.values())
+
+
+def test_table_pickle_roundtrip(make_instance):
+    _, tabela = _tabela(make_instance(dias=2))
+    copia = pickle.loads(pickle.dumps(tabela))
+
+    assert isinstance(copia, ScheduleTable)
+    assert copia.aulas == tabela.aulas
+    assert all(isinstance(aula, Aula) for aula in copia)
+    for indice in ('por_slot', 'por_professor', 'por_curso', 'por_disciplina'):
+        assert dict(getattr(copia, indice)) == dict(getattr(tabela, indice))
@@ -0,0 +1,151 @@
+import random
+
+import pytest
+
+from conflict_builder import ConflictBitsets, ConflictBuilder, ConflictOracle
+from conftest import assert_sem_conflitos
+from solver import ConflictGraphSolver, GapTracker
+
+
+def _solver(gb, modo, **opcoes):
+    grafo = gb.get_graph()
+    store = gb.candidate_info
+    conflitos = oraculo = bitsets = None
+    if modo == "grafo":
+        conflitos = ConflictBuilder(grafo, store).build()
+    elif modo == "oraculo":
+        oraculo = ConflictOracle(grafo, store, strict_mode=True)
+    else:
+        bitsets = ConflictBitsets(grafo, store, strict_mode=True)
+    return ConflictGraphSolver(gb.candidatos_por_parte, store, conflitos, grafo,
+                               conflict_oracle=oraculo, conflict_bitsets=bitsets,
+                               **opcoes)
+
+
+# Instâncias de 1 dia: fáceis, com árvore de alguns milhares de nós,
+# inviável (a árvore inteira é percorrida) e, com horários bloqueados no
+# meio do dia, com ótimo de gaps maior que zero
+INSTANCIAS = [
+    dict(seed=0),
+    dict(seed=1),
+    dict(seed=0, periodos=1, disciplinas_por_periodo=3, salas=1),
+    dict(seed=0, disciplinas_por_periodo=3, salas=1, professores=2),
+    dict(seed=0, periodos=1, bloqueados=("2_2", "2_5")),
+    dict(seed=1, periodos=1, bloqueados=("2_3", "2_5")),
+]
+
+
+@pytest.mark.parametrize("modo", ["grafo", "oraculo", "bitset"])
+@pytest.mark.parametrize("branch_and_bound", [True, False])
+@pytest.mark.parametrize("parametros", INSTANCIAS)
+def test_engines_visit_the_same_tree(make_instance, modo, branch_and_bound, parametros):
+    gb = make_instance(dias=1, **parametros)
+    resultados = []
+    for engine in ("iterativo", "recursivo"):
+        solver = _solver(gb, modo, branch_and_bound=branch_and_bound, engine=engine)
+        encontrou = solver.solve(verbose=False, time_limit=30)
+        assert not solver.timed_out
+        resultados.append((encontrou, solver.best_score, solver.best_solution,
+                           solver.solutions_found, solver.nodes_explored))
+
+    assert resultados[0] == resultados[1]
+    if resultados[0][0]:
+        assert_sem_conflitos(resultados[0][2], gb.candidate_info, gb.get_graph())
+
+
+
+@pytest.mark.parametrize("branch_and_bound", [True, False])
+@pytest.mark.parametrize("parametros", INSTANCIAS)
+def test_oracle_matches_conflict_graph(make_instance, branch_and_bound, parametros):
+    gb = make_instance(dias=1, **parametros)
+    resultados = []
+    for modo in ("grafo", "oraculo"):
+        solver = _solver(gb, modo, branch_and_bound=branch_and_bound)
+        encontrou = solver.solve(verbose=False, time_limit=30)
+        assert not solver.timed_out
+        resultados.append((encontrou, solver.best_score, solver.best_solution,
+                           solver.nodes_explored,
+                           solver.get_solution() if encontrou else None))
+
+    assert resultados[0] == resultados[1]
+
+
+@pytest.mark.parametrize("parametros", INSTANCIAS)
+def test_bitset_matches_oracle_optimum(make_instance, parametros):
+    gb = make_instance(dias=1, **parametros)
+    resultados = []
+    for modo in ("oraculo", "bitset"):
+        solver = _solver(gb, modo, branch_and_bound=True)
+        encontrou = solver.solve(verbose=False, time_limit=30)
+        assert not solver.timed_out
+        resultados.append((encontrou, solver.best_score))
+        if encontrou:
+            assert_sem_conflitos(solver.best_solution, gb.candidate_info, gb.get_graph())
+
+    assert resultados[0] == resultados[1]
+
+
+def _exaustivo(gb):
+    """
+    Menor score de gaps entre todas as soluções, por enumeração completa.
+    """
+    grafo = gb.get_graph()
+    oraculo = ConflictOracle(grafo, gb.candidate_info, strict_mode=True)
+    referencia = _solver(gb, "oraculo")
+    partes = list(gb.candidatos_por_parte.values())
+    escolhidos = []
+    melhor = [None]
+
+    def visita(i):
+        if i == len(partes):
+            score = referencia.calculate_gap_score(escolhidos)
+            if melhor[0] is None or score < melhor[0]:
+                melhor[0] = score
+            return
+        for c in partes[i]:
+            if oraculo.compatible(c):
+                oraculo.push(c)
+                escolhidos.append(c)
+                visita(i + 1)
+                escolhidos.pop()
+                oraculo.pop(c)
+
+    visita(0)
+    return melhor[0]
+
+
+@pytest.mark.parametrize("parametros", [
+    dict(seed=0, periodos=1, salas=1, professores=2),
+    dict(seed=0, periodos=1, salas=1, bloqueados=("2_2", "2_5")),
+    INSTANCIAS[4],
+])
+def test_branch_and_bound_reaches_exhaustive_optimum(make_instance, parametros):
+    gb = make_instance(dias=1, **parametros)
+    solver = _solver(gb, "oraculo", branch_and_bound=True)
+    assert solver.solve(verbose=False, time_limit=30)
+    assert not solver.timed_out
+    assert solver.best_score == _exaustivo(gb)
+    assert solver.calculate_gap_score(solver.best_solution) == solver.best_score
+
+
+@pytest.mark.parametrize("parametros", [INSTANCIAS[1], INSTANCIAS[5]])
+def test_gap_tracker_matches_gap_score(make_instance, parametros):
+    gb = make_instance(dias=1, **parametros)
+    solver = _solver(gb, "oraculo", branch_and_bound=False)
+    assert solver.solve(verbose=False, time_limit=30)
+
+    tracker = GapTracker(gb.candidatos_por_parte, gb.candidate_info, gb.get_graph())
+    for solucao in solver.solutions_found:
+        rng = random.Random(len(solucao))
+        ordem = list(solucao)
+        rng.shuffle(ordem)
+        for k, cid in enumerate(ordem, start=1):
+            tracker.push(cid)
+            assert tracker.total == solver.calculate_gap_score(ordem[:k])
+            assert tracker.lower_bound() <= tracker.total
+        # Todos os grupos fechados: o limite inferior é o próprio score
+        assert tracker.lower_bound() == tracker.total
+        for k in range(len(ordem), 0, -1):
+            tracker.pop(ordem[k - 1])
+            assert tracker.total == solver.calculate_gap_score(ordem[:k - 1])
+        assert tracker.total == tracker.closed_total == 0